@@ -1,15 +1,19 @@
+import time
+
+import pandas as pd
 import streamlit as st
 
-from src.data_loader import load_all_data
-from src.filters import filter_by_date_range, filter_by_departments, filter_by_roles
-from src.kpi_calculations import (
-    compute_ai_adoption_index,
-    compute_learning_impact,
-    compute_readiness_matrix,
-    compute_reflection_sentiment,
-    compute_training_coverage,
-    compute_workshop_engagement,
+from src.config import KPI_APPROXIMATE, KPI_BACKEND, KPI_JOB_EXECUTOR
+from src.jobs import JobTimeoutError, StaleDatasetError, get_job_pool, session_job
+from src.kpi_bundle import (
+    ROLE_OPTIONS,
+    FilterSelection,
+    get_kpi_bundle,
+    map_roles_to_audiences,
+    prepare_role_filters,
 )
+from src.text_index import build_reflection_index, reflection_index
+from src.warmup import ensure_warmup
 from src.layout_components import (
     render_adoption_section,
     render_department_focus,
@@ -30,33 +34,44 @@ from src.data_sources import (
     get_available_data_sources,
     load_data_for_source,
     process_uploads,
+    reference_snapshot,
 )
+from src.derived import table_stats
+from src.partitions import get_partitioned_dataset
+from src.refresh import get_refresher
+
+
+@st.cache_resource(show_spinner=False)
+def _partition_reflection_index(reflections):
+    # Partition loads assemble a new frame on every run, so their index is cached by content.
+    return build_reflection_index(reflections)
+
 
+@st.cache_resource
+def _sql_backend():
+    from src.sql_backend import SqlKpiBackend
 
-@st.cache_data
-def _load_data():
-    return load_all_data()
+    return SqlKpiBackend()
 
 
-def _prepare_role_filters(selected_roles):
-    if not selected_roles:
-        return []
-    cleaned = [r for r in selected_roles if r != "mixed"]
-    if not cleaned and "mixed" in selected_roles:
-        return ["faculty", "staff", "graduate student"]
-    return cleaned
+def _await_bundle(job):
+    status = st.empty()
+    try:
+        while not job.wait(0.25) and not job.expired:
+            # Each update yields to Streamlit, which ends this run here if the user has changed a filter since.
+            status.caption(f"Computing indicators for this selection... {job.elapsed_seconds:.0f}s")
+    finally:
+        status.empty()
+    return job.result()
 
 
-def _map_roles_to_audiences(selected_roles):
-    if not selected_roles:
-        return []
-    mapping = {
-        "faculty": "faculty",
-        "staff": "staff",
-        "graduate student": "graduate students",
-        "mixed": "mixed",
-    }
-    return [mapping[r] for r in selected_roles if r in mapping]
+def _render_warmup_status(progress):
+    if progress.running:
+        st.sidebar.caption(f"Warming caches: {progress.completed}/{progress.total} common views ready.")
+    else:
+        st.sidebar.caption(
+            f"Cache warm-up covered {progress.coverage:.0%} of common views in {progress.elapsed_seconds:.1f}s."
+        )
 
 
 from src.views import (
@@ -94,6 +109,9 @@ def main():
             st.session_state["active_source"] = SYNTHETIC
             st.session_state["upload_status"] = f"Validation failed: {e}"
             st.error(f"Validation failed: {e}")
+            for issue in getattr(e, "issues", []):
+                st.caption(issue.describe())
+                st.dataframe(issue.sample, use_container_width=True, hide_index=True)
         finally:
             st.session_state["trigger_validation"] = False
 
@@ -111,17 +129,27 @@ def main():
     if st.session_state.get("upload_status"):
         st.sidebar.info(st.session_state["upload_status"])
 
-    data = load_data_for_source(selected_source)
-    workshops = data["workshops"]
-    participants = data["participants"]
-    conf_pre = data["confidence_pre"]
-    conf_post = data["confidence_post"]
-    reflections = data["reflections"]
+    partitioned = get_partitioned_dataset() if selected_source == SYNTHETIC else None
+    snapshot = None
+    if partitioned is not None:
+        # Only the dimension tables are read up front; fact partitions follow the sidebar date range.
+        data = partitioned.dimensions()
+        first_date, last_date = partitioned.bounds()
+    else:
+        data = load_data_for_source(selected_source)
+        snapshot = reference_snapshot() if selected_source == SYNTHETIC else None
+        if snapshot is not None:
+            loaded_at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot.loaded_at))
+            st.sidebar.caption(f"Reference data loaded {loaded_at} (refresh took {snapshot.load_seconds:.2f}s).")
+            refresh_error = get_refresher().last_error
+            if refresh_error:
+                st.sidebar.warning(f"Latest data refresh failed; still serving the previous snapshot. {refresh_error}")
+        # The reference snapshot carries its date bounds; session uploads are scanned once per run.
+        bounds = snapshot.stats["workshops"] if snapshot is not None else table_stats({"workshops": data["workshops"]})["workshops"]
+        first_date, last_date = bounds.min_date, bounds.max_date
     departments = data["departments"]
 
-    last_refreshed = (
-        workshops["date"].max().strftime("%Y-%m-%d") if not workshops.empty else "N/A"
-    )
+    last_refreshed = last_date.strftime("%Y-%m-%d") if not pd.isna(last_date) else "N/A"
     source_label = "Reference Synthetic Data (Non-Production)" if selected_source == SYNTHETIC else "Session Upload (Local Memory Only)"
     render_header(source_label, last_refreshed, view=st.session_state["view"])
 
@@ -129,58 +157,80 @@ def main():
         render_data_management_panel()
         return
 
-    all_roles = ["faculty", "staff", "graduate student", "mixed"]
+    all_roles = list(ROLE_OPTIONS)
     date_range = (
-        workshops["date"].min().date(),
-        workshops["date"].max().date(),
+        first_date.date(),
+        last_date.date(),
     )
 
     selected_dates, selected_depts, selected_roles = render_sidebar_filters(departments, all_roles, date_range)
     start_date, end_date = selected_dates
-    role_filter = _prepare_role_filters(selected_roles)
-    audience_filter = _map_roles_to_audiences(selected_roles)
+    role_filter = prepare_role_filters(selected_roles)
+    audience_filter = map_roles_to_audiences(selected_roles)
 
-    filtered_workshops = filter_by_departments(
-        filter_by_date_range(workshops, "date", start_date, end_date),
-        "department_id",
-        selected_depts,
-    )
-    filtered_participants = filter_by_departments(participants, "department_id", selected_depts)
-    filtered_participants = filter_by_roles(filtered_participants, "role", role_filter)
+    if partitioned is not None:
+        data = {**data, **partitioned.load(start_date, end_date)}
+        st.sidebar.caption(
+            f"Using {partitioned.partition_count(start_date, end_date)} of {partitioned.partition_count()} "
+            f"{partitioned.freq} partitions for the selected dates."
+        )
+    workshops = data["workshops"]
+    participants = data["participants"]
+    reflections = data["reflections"]
 
-    adoption_df, adoption_overall = compute_ai_adoption_index(departments, filtered_participants, selected_depts)
-    coverage_df, coverage_overall = compute_training_coverage(departments, selected_depts)
-    coverage_rate = coverage_overall
+    selection = FilterSelection.from_sidebar(selected_depts, selected_roles, start_date, end_date)
+    backend = _sql_backend() if KPI_BACKEND == "duckdb" and selected_source == SYNTHETIC else None
+    fingerprint = snapshot.fingerprint if snapshot is not None else None
+    if partitioned is not None:
+        fingerprint = f"partitioned:{partitioned.version_dir.name}"
+    elif fingerprint is not None:
+        warmer = ensure_warmup(data, fingerprint, backend)
+        if warmer is not None:
+            _render_warmup_status(warmer.progress())
+    if KPI_JOB_EXECUTOR == "off":
+        bundle = get_kpi_bundle(data, selection, fingerprint, backend)
+    else:
+        # A rerun for another selection releases this session's previous job, cancelling it if nobody else waits.
+        job = session_job(
+            st.session_state, data, selection, fingerprint, backend, reference=snapshot is not None and partitioned is None
+        )
+        try:
+            bundle = _await_bundle(job)
+        except StaleDatasetError:
+            # The reference files changed under the worker; this run still serves its own snapshot.
+            bundle = get_kpi_bundle(data, selection, fingerprint, backend)
+        except JobTimeoutError:
+            get_job_pool().release(job)
+            st.session_state.pop("kpi_job", None)
+            st.error(
+                f"Indicators for this selection are taking longer than {job.elapsed_seconds:.0f}s. "
+                "Narrow the filters, or reload shortly to pick up the result once it finishes."
+            )
+            st.stop()
+    filtered_workshops = bundle["filtered_workshops"]
+    filtered_reflections = bundle["filtered_reflections"]
+    adoption_df, adoption_overall = bundle["adoption"], bundle["adoption_overall"]
+    coverage_overall = bundle["coverage_overall"]
+    learning_impact = bundle["learning_impact"]
+    engagement = bundle["engagement"]
+    sentiment_theme = bundle["sentiment_theme"]
+    readiness_df = bundle["readiness"]
+    retention = bundle["retention"]
 
-    learning_impact = compute_learning_impact(
-        filter_by_date_range(conf_pre, "date", start_date, end_date),
-        filter_by_date_range(conf_post, "date", start_date, end_date),
-        filtered_participants,
-        filtered_department_ids=selected_depts,
-        filtered_roles=role_filter,
-    )
+    coverage_rate = coverage_overall
     impact_summary_df = learning_impact["summary"]
 
-    engagement = compute_workshop_engagement(filtered_workshops, selected_depts, audience_filter)
     timeseries_df = engagement["timeseries"]
     by_format_df = engagement["by_format"]
     by_audience_df = engagement["by_audience"]
     completion_df = engagement["completion"]
 
-    sentiment_theme = compute_reflection_sentiment(
-        filter_by_date_range(reflections, "date", start_date, end_date),
-        participants,
-        filtered_department_ids=selected_depts,
-        filtered_roles=role_filter,
-    )
     sentiment_df = sentiment_theme["sentiment"]
     theme_df = sentiment_theme["themes"]
 
-    readiness_df = compute_readiness_matrix(departments, selected_depts)
-
     avg_completion = completion_df["value"].iloc[0] if not completion_df.empty else 0
     total_attendance = int(timeseries_df["attendances"].sum()) if not timeseries_df.empty else 0
-    last_refreshed_date = workshops["date"].max()
+    last_refreshed_date = last_date if partitioned is None else workshops["date"].max()
 
     tabs = st.tabs(
         [
@@ -204,13 +254,40 @@ def main():
             last_refreshed_date,
         )
     with tabs[1]:
-        render_adoption_tab(adoption_df, readiness_df)
+        render_adoption_tab(adoption_df, readiness_df, bundle["adoption_history"])
     with tabs[2]:
-        render_learning_impact_tab(impact_summary_df)
+        render_learning_impact_tab(
+            impact_summary_df,
+            learning_impact["intervals"],
+            departments,
+            bundle["survey_pairing"],
+            bundle["score_quantiles"],
+            KPI_APPROXIMATE,
+        )
     with tabs[3]:
-        render_engagement_tab(timeseries_df, by_format_df, by_audience_df, completion_df)
+        render_engagement_tab(
+            timeseries_df,
+            by_format_df,
+            by_audience_df,
+            completion_df,
+            bundle["funnel"],
+            bundle["participation"],
+            retention,
+            departments,
+            KPI_APPROXIMATE,
+        )
     with tabs[4]:
-        render_reflections_tab(sentiment_df, theme_df)
+        render_reflections_tab(
+            sentiment_df,
+            theme_df,
+            bundle["reflection_trends"],
+            filtered_reflections,
+            participants,
+            departments,
+            reflection_index(reflections) if partitioned is None else _partition_reflection_index(reflections),
+            selected_depts,
+            role_filter,
+        )
     with tabs[5]:
         render_department_focus_tab(
             departments,
@@ -226,4 +303,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    # Cache warm-up waits while any session is mid-run, so it never competes with drawing a page.
+    with get_job_pool().session_running():
+        main()
@@ -0,0 +1,78 @@
+"""Requests per second of the local KPI API: cold (computed), warm (cached response) and revalidated (304).
+
+Usage: python benchmarks/api_throughput.py [--requests 400] [--clients 8]
+"""
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
+from pathlib import Path
+from urllib.parse import urlencode
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.api import KpiApi, make_server  # noqa: E402
+from src.data_loader import dataset_fingerprint, load_all_data  # noqa: E402
+from src.kpi_bundle import ROLE_OPTIONS, BundleCache  # noqa: E402
+
+
+def _paths(data, count):
+    departments = list(data["departments"]["department_id"])
+    paths = []
+    for index in range(count):
+        dept = departments[index % len(departments)]
+        role = ROLE_OPTIONS[(index // len(departments)) % len(ROLE_OPTIONS)]
+        paths.append("/kpis/engagement/timeseries?" + urlencode({"departments": dept, "roles": role}))
+    return paths
+
+
+def _run(port, paths, clients, etags=None):
+    local = threading.local()
+
+    def fetch(path):
+        if not hasattr(local, "conn"):
+            local.conn = HTTPConnection("127.0.0.1", port)
+        headers = {"If-None-Match": etags[path]} if etags else {}
+        local.conn.request("GET", path, headers=headers)
+        response = local.conn.getresponse()
+        response.read()
+        return path, response.status, response.getheader("ETag")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        results = list(pool.map(fetch, paths))
+    return time.perf_counter() - start, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--clients", type=int, default=8)
+    args = parser.parse_args()
+
+    data, fingerprint = load_all_data(), dataset_fingerprint()
+    unique = _paths(data, len(data["departments"]) * len(ROLE_OPTIONS))
+    api = KpiApi(lambda: (data, fingerprint), cache_size=len(unique), bundle_cache=BundleCache(len(unique)))
+    server = make_server(api, "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        repeated = [unique[i % len(unique)] for i in range(args.requests)]
+        elapsed, results = _run(server.server_port, unique, args.clients)
+        print(f"cold: {len(unique)} requests in {elapsed:.2f}s -> {len(unique) / elapsed:,.0f} req/s")
+        etags = {path: etag for path, _, etag in results}
+        for label, tags in (("warm", None), ("revalidated", etags)):
+            elapsed, results = _run(server.server_port, repeated, args.clients, tags)
+            statuses = sorted({status for _, status, _ in results})
+            print(f"{label}: {len(repeated)} requests in {elapsed:.2f}s -> {len(repeated) / elapsed:,.0f} req/s (status {statuses})")
+        print(f"response cache: hits {api.responses.hits:,}, misses {api.responses.misses:,}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Time to take in a monthly batch: full reload of the grown dataset versus an incremental delta upsert.
+
+Usage: python benchmarks/delta_ingestion.py [--scales 1,10,50] [--batch-share 0.02] [--repeat 3]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from session_load import scale_dataset  # noqa: E402
+from src.data_loader import DATA_DIR  # noqa: E402
+from src.delta import apply_delta, persist_delta  # noqa: E402
+from src.derived import table_stats  # noqa: E402
+from src.ingestion import TABLES, finalize, ingest  # noqa: E402
+
+# Tables a monthly batch adds rows to, and the id columns its new rows get fresh values for.
+BATCH_IDS = {
+    "workshops": ["workshop_id"],
+    "confidence_pre": ["survey_id", "workshop_id"],
+    "confidence_post": ["survey_id", "workshop_id"],
+    "reflections": ["reflection_id", "workshop_id"],
+}
+
+
+def _write(tables, folder: Path) -> None:
+    for name, df in tables.items():
+        df.to_csv(folder / TABLES[name].filename, index=False)
+
+
+def _batch(tables, share: float):
+    """New rows for each batch table: the first rows again, under new ids, about ``share`` of each table."""
+    workshops = tables["workshops"].head(max(1, int(len(tables["workshops"]) * share)))
+    batch = {}
+    for name, columns in BATCH_IDS.items():
+        rows = workshops if name == "workshops" else tables[name][tables[name]["workshop_id"].isin(workshops["workshop_id"])]
+        batch[name] = rows.assign(**{column: rows[column].astype(str) + "-new" for column in columns})
+    return batch
+
+
+def _best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scales", default="1,10,50", help="comma-separated data scale factors")
+    parser.add_argument("--batch-share", type=float, default=0.02, help="new workshops per batch, as a share of all")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    raw = {name: pd.read_csv(DATA_DIR / spec.filename) for name, spec in TABLES.items()}
+    for factor in (int(f) for f in args.scales.split(",")):
+        tables = scale_dataset(raw, factor)
+        batch = _batch(tables, args.batch_share)
+        with tempfile.TemporaryDirectory() as tmp:
+            base_dir, batch_dir, grown_dir = (Path(tmp) / part for part in ("base", "batch", "grown"))
+            for folder in (base_dir, batch_dir, grown_dir):
+                folder.mkdir()
+            _write(tables, base_dir)
+            _write(batch, batch_dir)
+            _write({name: pd.concat([df, batch[name]]) if name in batch else df for name, df in tables.items()}, grown_dir)
+
+            base = finalize(ingest({name: base_dir / spec.filename for name, spec in TABLES.items()}))
+            stats = table_stats(base)
+            sources = {name: batch_dir / TABLES[name].filename for name in batch}
+            full = _best_of(lambda: finalize(ingest({name: grown_dir / spec.filename for name, spec in TABLES.items()})), args.repeat)
+            delta = _best_of(lambda: apply_delta(base, sources, stats), args.repeat)
+            persist = _best_of(lambda: persist_delta(base_dir, apply_delta(base, sources, stats)), 1)
+        rows = sum(len(df) for df in tables.values())
+        new_rows = sum(len(df) for df in batch.values())
+        print(
+            f"x{factor} ({rows:,} rows, batch of {new_rows:,}): full reload {full * 1000:.0f}ms, "
+            f"delta {delta * 1000:.0f}ms ({full / delta:.1f}x), delta + append to files {persist * 1000:.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
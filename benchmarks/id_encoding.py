@@ -0,0 +1,82 @@
+"""Memory and join/groupby time of string id keys versus the shared dictionary encoding.
+
+Usage: python benchmarks/id_encoding.py [--scales 1,10,100] [--repeat 5]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from session_load import scale_dataset  # noqa: E402
+from src.data_loader import load_all_data  # noqa: E402
+from src.encoding import ID_COLUMNS, decode_ids, encode_ids  # noqa: E402
+from src.filters import FilterContext  # noqa: E402
+from src.survey_pairing import SurveyPairIndex  # noqa: E402
+
+OPERATIONS = {
+    "merge reflections-participants": lambda t: t["reflections"].merge(
+        t["participants"][["participant_id", "department_id", "role"]], on="participant_id", how="left"
+    ),
+    "isin departments": lambda t: t["workshops"]["department_id"].isin(t["_departments"]),
+    "groupby department": lambda t: t["workshops"].groupby("department_id", observed=True)["attendances"].sum(),
+    "filter context": lambda t: FilterContext(t, t["_departments"], ["faculty"]).rows("reflections_by_participant"),
+    "survey pair index": lambda t: SurveyPairIndex(t["confidence_pre"], t["confidence_post"], t["participants"]),
+}
+
+
+def _id_bytes(tables) -> int:
+    """Bytes held by id columns; a shared dictionary is counted once per domain, not once per column."""
+    total = 0
+    dictionaries = {}
+    for df in tables.values():
+        for column in ID_COLUMNS:
+            if column not in df.columns:
+                continue
+            values = df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                total += values.cat.codes.nbytes
+                dictionaries[column] = values.dtype.categories
+            else:
+                total += int(values.memory_usage(deep=True, index=False))
+    return total + sum(int(categories.memory_usage(deep=True)) for categories in dictionaries.values())
+
+
+def _best_of(fn, tables, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(tables)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scales", default="1,10,100", help="comma-separated data scale factors")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    base = {name: decode_ids(df) for name, df in load_all_data().items()}
+    for factor in (int(f) for f in args.scales.split(",")):
+        strings = scale_dataset(base, factor)
+        encoded = encode_ids(strings)
+        departments = list(base["departments"]["department_id"][::2])
+        rows = sum(len(df) for df in strings.values())
+        print(
+            f"x{factor} ({rows:,} rows): id columns {_id_bytes(strings) / 2**20:.2f} MB as strings, "
+            f"{_id_bytes(encoded) / 2**20:.2f} MB encoded"
+        )
+        for name, fn in OPERATIONS.items():
+            plain = _best_of(fn, {**strings, "_departments": departments}, args.repeat)
+            coded = _best_of(fn, {**encoded, "_departments": departments}, args.repeat)
+            print(f"  {name}: {plain * 1000:.2f}ms strings, {coded * 1000:.2f}ms encoded ({plain / coded:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
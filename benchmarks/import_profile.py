@@ -0,0 +1,88 @@
+"""Cold-start import profile of the dashboard, from ``python -X importtime``.
+
+Each run imports ``app`` in a fresh interpreter and reports the wall time, the
+slowest modules by cumulative import time, and whether the deferred plotting
+and validation dependencies stayed unloaded. ``--json`` prints one record for
+tracking cold-start time as a metric.
+
+Usage: python benchmarks/import_profile.py [--runs 5] [--top 15] [--json]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Imported at first use rather than at startup (see src/lazy_imports.py and src/data_loader.py).
+DEFERRED_MODULES = ["plotly.express", "jsonschema"]
+
+_PROBE = "import sys, app; print(','.join(m for m in {deferred!r} if m in sys.modules))"
+
+
+def _profile_once() -> Tuple[float, List[Tuple[str, int, int]], List[str]]:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(deferred=DEFERRED_MODULES)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - start
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:") :].split("|"))
+        if self_us.isdigit():
+            modules.append((name, int(self_us), int(cumulative_us)))
+    output = result.stdout.strip().splitlines()
+    loaded = [m for m in output[-1].split(",") if m] if output else []
+    return wall, modules, loaded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="print a single JSON record")
+    args = parser.parse_args()
+
+    walls, app_import_us = [], []
+    cumulative: Dict[str, List[int]] = {}
+    loaded_deferred = set()
+    for _ in range(args.runs):
+        wall, modules, loaded = _profile_once()
+        walls.append(wall)
+        loaded_deferred.update(loaded)
+        for name, _, cum in modules:
+            cumulative.setdefault(name, []).append(cum)
+        app_import_us.append(next((cum for name, _, cum in modules if name == "app"), 0))
+
+    slowest = sorted(((statistics.median(v), k) for k, v in cumulative.items()), reverse=True)[: args.top]
+    record = {
+        "runs": args.runs,
+        "wall_seconds_median": round(statistics.median(walls), 4),
+        "app_import_seconds_median": round(statistics.median(app_import_us) / 1e6, 4),
+        "deferred_loaded_at_startup": sorted(loaded_deferred),
+    }
+    if args.json:
+        print(json.dumps(record))
+        return
+    print(f"interpreter + import app: {record['wall_seconds_median']:.3f}s median over {args.runs} runs")
+    print(f"import app (importtime): {record['app_import_seconds_median']:.3f}s")
+    print(f"{'cumulative ms':>14}  module")
+    for cum_us, name in slowest:
+        print(f"{cum_us / 1000:>14.1f}  {name}")
+    for module in DEFERRED_MODULES:
+        status = "loaded at startup" if module in loaded_deferred else "deferred"
+        print(f"{module}: {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Distinct participants and score quantiles per filter selection: merged sketches versus exact counting.
+
+Usage: python benchmarks/kpi_sketches.py [--events 100000,1000000] [--participants 50000] [--repeat 3]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.data_loader import load_all_data  # noqa: E402
+from src.filters import FilterContext, filter_by_date_range  # noqa: E402
+from src.ingestion import finalize  # noqa: E402
+from src.kpi_calculations import compute_distinct_participants, compute_score_quantiles  # noqa: E402
+from src.sketches import SCORE_METRICS, KpiSketchIndex  # noqa: E402
+
+
+def _dataset(base, participants: int, events: int, seed: int = 0):
+    """``participants`` resampled people with ``events`` activity rows and as many survey responses, over three years."""
+    rng = np.random.default_rng(seed)
+    people = base["participants"].iloc[rng.integers(0, len(base["participants"]), participants)].reset_index(drop=True)
+    people = people.assign(participant_id=[f"P{i:07d}" for i in range(participants)])
+    ids = people["participant_id"]
+
+    def facts(rows: int) -> pd.DataFrame:
+        days = pd.to_timedelta(rng.integers(0, 3 * 365, rows), unit="D")
+        return pd.DataFrame({"participant_id": ids.iloc[rng.integers(0, participants, rows)].to_numpy(), "date": pd.Timestamp("2022-01-01") + days})
+
+    surveys = [facts(events // 2).assign(**{metric: rng.integers(1, 6, events // 2) for metric in SCORE_METRICS}) for _ in range(2)]
+    return {**base, "participants": people}, facts(events), surveys
+
+
+def _exact(data, events, surveys, selection):
+    participants = FilterContext(data, *selection).rows("participants")
+    start_date, end_date = selection[2], selection[3]
+    compute_distinct_participants(filter_by_date_range(events, "date", start_date, end_date), participants)
+    compute_score_quantiles(*(filter_by_date_range(df, "date", start_date, end_date) for df in surveys), participants)
+
+
+def _sketched(index, selection):
+    index.distinct_participants(*selection)
+    index.score_quantiles(*selection)
+
+
+def _best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", default="100000,1000000", help="comma-separated activity row counts")
+    parser.add_argument("--participants", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    base = finalize(load_all_data())
+    departments = list(base["departments"]["department_id"])
+    selections = [
+        ([], [], None, None),
+        (departments[::2], ["faculty", "staff"], "2023-01-10", "2023-12-20"),
+        (departments[:1], ["graduate student"], "2022-06-01", "2022-08-31"),
+    ]
+    for rows in (int(n) for n in args.events.split(",")):
+        data, events, surveys = _dataset(base, args.participants, rows)
+        start = time.perf_counter()
+        index = KpiSketchIndex(events, surveys[0], surveys[1], data["participants"])
+        build = time.perf_counter() - start
+        sketched = sum(_best_of(lambda s=s: _sketched(index, s), args.repeat) for s in selections) / len(selections)
+        exact = sum(_best_of(lambda s=s: _exact(data, events, surveys, s), args.repeat) for s in selections) / len(selections)
+        print(
+            f"{rows:,} events: sketches of {len(index.registers):,} cells built in {build:.1f}s; per selection "
+            f"{sketched * 1000:.1f}ms merged vs {exact * 1000:.1f}ms exact ({exact / sketched:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
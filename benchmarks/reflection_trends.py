@@ -0,0 +1,78 @@
+"""Sentiment/theme crosstabs per filter selection: prebuilt code index versus merge + filter + groupby.
+
+Usage: python benchmarks/reflection_trends.py [--rows 100000,1000000] [--repeat 5]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.data_loader import load_all_data  # noqa: E402
+from src.filters import FilterContext  # noqa: E402
+from src.ingestion import finalize  # noqa: E402
+from src.reflection_trends import TRENDS, ReflectionTrendIndex  # noqa: E402
+
+
+def _reflections(base: pd.DataFrame, rows: int, seed: int = 0) -> pd.DataFrame:
+    """``rows`` reflections resampled from ``base``, with dates spread over three years."""
+    rng = np.random.default_rng(seed)
+    sample = base.iloc[rng.integers(0, len(base), rows)].reset_index(drop=True)
+    days = pd.to_timedelta(rng.integers(0, 3 * 365, rows), unit="D")
+    return sample.assign(date=pd.Timestamp("2022-01-01") + days).drop(columns=["month"], errors="ignore")
+
+
+def _groupby(data, selection):
+    reflections = FilterContext(data, *selection).rows("reflections_by_participant")
+    with_department = reflections.merge(data["participants"][["participant_id", "department_id"]], on="participant_id")
+    month = reflections["date"].dt.to_period("M").dt.to_timestamp()
+    return {
+        "sentiment_by_month": reflections.groupby([month, "sentiment"], observed=True).size(),
+        "theme_by_month": reflections.groupby([month, "theme"], observed=True).size(),
+        "theme_by_department": with_department.groupby(["department_id", "theme"], observed=True).size(),
+    }
+
+
+def _best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", default="100000,1000000", help="comma-separated reflection counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    base = finalize(load_all_data())
+    departments = list(base["departments"]["department_id"])
+    selections = [
+        ([], [], None, None),
+        (departments[::2], ["faculty", "staff"], "2023-01-01", "2023-12-31"),
+        (departments[:1], ["graduate student"], "2022-06-01", "2022-08-31"),
+    ]
+    for rows in (int(n) for n in args.rows.split(",")):
+        data = {**base, "reflections": _reflections(base["reflections"], rows)}
+        start = time.perf_counter()
+        index = ReflectionTrendIndex(data["reflections"], data["participants"])
+        build = time.perf_counter() - start
+        indexed = sum(_best_of(lambda s=s: index.crosstabs(*s), args.repeat) for s in selections) / len(selections)
+        grouped = sum(_best_of(lambda s=s: _groupby(data, s), args.repeat) for s in selections) / len(selections)
+        print(
+            f"{rows:,} reflections: index built in {build * 1000:.0f}ms; {len(TRENDS)} crosstabs per selection "
+            f"{indexed * 1000:.2f}ms indexed vs {grouped * 1000:.1f}ms groupby ({grouped / indexed:.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
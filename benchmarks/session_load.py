@@ -0,0 +1,237 @@
+"""Concurrent-session load test of dashboard reruns.
+
+Simulates ``--sessions`` Streamlit sessions with ``AppTest``, each running on
+its own thread as it would on one server. Every session runs ``app.py`` once,
+then makes ``--steps`` scripted interactions: department, role and date filter
+changes, a department-focus selection, a widget change inside a tab (the
+adoption history granularity, a reflection search), and a validated upload of
+the dataset. The report gives rerun latency percentiles, reruns per second,
+and resident memory per session.
+
+Each ``--scales`` factor replicates participants, workshops, surveys and
+reflections that many times under new ids, and runs in a fresh process with
+``AIRE_DATA_DIR`` pointing at the scaled copy.
+
+Usage: python benchmarks/session_load.py [--sessions 8] [--steps 12] [--scales 1,4] [--json]
+"""
+import argparse
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+ACTIONS = ("departments", "roles", "dates", "focus", "granularity", "search", "upload")
+SEARCH_TERMS = ("assessment", "ethics", "workflow", "students", "")
+
+# Id columns suffixed per replica, by table; departments are shared by every replica.
+_REPLICATED_IDS = {
+    "participants": ["participant_id"],
+    "workshops": ["workshop_id"],
+    "confidence_pre": ["survey_id", "participant_id", "workshop_id"],
+    "confidence_post": ["survey_id", "participant_id", "workshop_id"],
+    "reflections": ["reflection_id", "participant_id", "workshop_id"],
+}
+
+
+def scale_dataset(tables: Dict[str, pd.DataFrame], factor: int) -> Dict[str, pd.DataFrame]:
+    """``factor`` copies of every fact and participant row under fresh ids; referential integrity is kept."""
+    scaled = {"departments": tables["departments"]}
+    for name, columns in _REPLICATED_IDS.items():
+        copies = []
+        for replica in range(factor):
+            copy = tables[name].copy()
+            if replica:
+                for column in columns:
+                    copy[column] = copy[column].astype(str) + f"-{replica}"
+            copies.append(copy)
+        scaled[name] = pd.concat(copies, ignore_index=True)
+    return scaled
+
+
+def write_scaled_dataset(factor: int, out_dir: Path) -> Path:
+    from src.data_loader import DATA_DIR
+    from src.data_sources import REQUIRED_FILES
+
+    raw = {key: pd.read_csv(DATA_DIR / filename) for key, (filename, _) in REQUIRED_FILES.items()}
+    for key, df in scale_dataset(raw, factor).items():
+        df.to_csv(out_dir / REQUIRED_FILES[key][0], index=False)
+    return out_dir
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _widget(elements, label):
+    return next(element for element in elements if element.label == label)
+
+
+def _upload_files(data_dir: Path) -> Dict[str, io.BytesIO]:
+    from src.data_sources import REQUIRED_FILES
+
+    return {filename: io.BytesIO((data_dir / filename).read_bytes()) for filename, _ in REQUIRED_FILES.values()}
+
+
+class SimulatedSession:
+    def __init__(self, index: int, steps: int, data_dir: Path, timeout: float):
+        from streamlit.testing.v1 import AppTest
+
+        self.app = AppTest.from_file(str(ROOT / "app.py"), default_timeout=timeout)
+        self.rng = random.Random(index)
+        self.steps = steps
+        self.data_dir = data_dir
+        self.latencies: List[float] = []
+        self.errors: List[str] = []
+
+    def _rerun(self, interact=None) -> None:
+        start = time.perf_counter()
+        if interact is None:
+            self.app.run()
+        else:
+            interact().run()
+        self.latencies.append(time.perf_counter() - start)
+        self.errors.extend(str(e.value) for e in self.app.exception)
+
+    def _interaction(self, action: str):
+        app, rng = self.app, self.rng
+        if action == "departments":
+            widget = _widget(app.multiselect, "Departments to analyze")
+            return lambda: widget.set_value(rng.sample(list(widget.options), rng.randint(1, len(widget.options))))
+        if action == "roles":
+            widget = _widget(app.multiselect, "Faculty, staff, and graduate student segments")
+            return lambda: widget.set_value(rng.sample(list(widget.options), rng.randint(1, len(widget.options))))
+        if action == "dates":
+            widget = _widget(app.date_input, "Workshop date window")
+            start, end = widget.value
+            days = max((end - start).days, 1)
+            new_start = start + pd.Timedelta(days=rng.randint(0, days // 2))
+            return lambda: widget.set_value((new_start, end))
+        if action == "focus":
+            widget = _widget(app.selectbox, "Department in focus")
+            return lambda: widget.select(rng.choice(list(widget.options)))
+        if action == "granularity":
+            widget = app.radio(key="adoption_history_freq")
+            return lambda: widget.set_value(rng.choice(list(widget.options)))
+        if action == "search":
+            widget = app.text_input(key="reflection_query")
+            return lambda: widget.input(rng.choice(SEARCH_TERMS))
+
+        def upload():
+            app.session_state["uploaded_raw"] = _upload_files(self.data_dir)
+            app.session_state["trigger_validation"] = True
+            return app
+
+        return upload
+
+    def run(self) -> None:
+        try:
+            self._rerun()
+            for _ in range(self.steps):
+                action = self.rng.choice(ACTIONS)
+                try:
+                    interact = self._interaction(action)
+                except (StopIteration, KeyError):
+                    # The widget is not on the page in this state (e.g. no departments selected).
+                    continue
+                self._rerun(interact)
+        except Exception as exc:
+            self.errors.append(f"{type(exc).__name__}: {exc}")
+
+
+def run_load(sessions: int, steps: int, data_dir: Path, timeout: float) -> Dict[str, object]:
+    baseline = _rss_bytes()
+    simulated = [SimulatedSession(index, steps, data_dir, timeout) for index in range(sessions)]
+    threads = [threading.Thread(target=session.run, name=f"session-{i}") for i, session in enumerate(simulated)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies = np.array([value for session in simulated for value in session.latencies]) * 1000
+    errors = [error for session in simulated for error in session.errors]
+    return {
+        "sessions": sessions,
+        "reruns": int(latencies.size),
+        "p50_ms": float(np.percentile(latencies, 50)) if latencies.size else 0.0,
+        "p95_ms": float(np.percentile(latencies, 95)) if latencies.size else 0.0,
+        "p99_ms": float(np.percentile(latencies, 99)) if latencies.size else 0.0,
+        "reruns_per_second": latencies.size / elapsed if elapsed else 0.0,
+        "rss_per_session_mb": (_rss_bytes() - baseline) / sessions / 2**20,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else "",
+    }
+
+
+def _run_scale(args, factor: int) -> Dict[str, object]:
+    """Measure one scale in a child process, so the scaled data directory is read at import time."""
+    with tempfile.TemporaryDirectory(prefix=f"aire-load-x{factor}-") as tmp:
+        data_dir = write_scaled_dataset(factor, Path(tmp))
+        env = {**os.environ, "AIRE_DATA_DIR": str(data_dir)}
+        command = [
+            sys.executable,
+            __file__,
+            "--worker",
+            "--sessions", str(args.sessions),
+            "--steps", str(args.steps),
+            "--timeout", str(args.timeout),
+        ]
+        output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["scale"] = factor
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=12)
+    parser.add_argument("--scales", default="1", help="comma-separated data scale factors")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds allowed per rerun")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        from src.data_loader import DATA_DIR
+
+        print(json.dumps(run_load(args.sessions, args.steps, DATA_DIR, args.timeout)))
+        return
+
+    results = [_run_scale(args, int(factor)) for factor in args.scales.split(",")]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for result in results:
+        print(
+            f"x{result['scale']}: {result['sessions']} sessions, {result['reruns']} reruns, "
+            f"p50 {result['p50_ms']:.0f}ms, p95 {result['p95_ms']:.0f}ms, p99 {result['p99_ms']:.0f}ms, "
+            f"{result['reruns_per_second']:.1f} reruns/s, {result['rss_per_session_mb']:.1f} MB/session, "
+            f"{result['errors']} errors"
+        )
+        if result["first_error"]:
+            print(f"  first error: {result['first_error']}")
+
+
+if __name__ == "__main__":
+    main()
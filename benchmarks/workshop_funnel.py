@@ -0,0 +1,78 @@
+"""Workshop funnel per filter selection: prebuilt aggregation cube versus filter + groupby over the workshops.
+
+Usage: python benchmarks/workshop_funnel.py [--rows 100000,1000000] [--repeat 5]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.data_loader import load_all_data  # noqa: E402
+from src.filters import FilterContext  # noqa: E402
+from src.funnel import BREAKDOWNS, STAGES, WorkshopFunnel  # noqa: E402
+from src.ingestion import finalize  # noqa: E402
+
+
+def _workshops(base: pd.DataFrame, rows: int, seed: int = 0) -> pd.DataFrame:
+    """``rows`` workshops resampled from ``base``, with dates spread over three years."""
+    rng = np.random.default_rng(seed)
+    sample = base.iloc[rng.integers(0, len(base), rows)].reset_index(drop=True)
+    days = pd.to_timedelta(rng.integers(0, 3 * 365, rows), unit="D")
+    return sample.assign(date=pd.Timestamp("2022-01-01") + days).drop(columns=["month"], errors="ignore")
+
+
+def _groupby(data, department_ids, audiences, start_date, end_date):
+    workshops = FilterContext(data, department_ids, [], start_date, end_date).rows("workshops")
+    if audiences:
+        workshops = workshops[workshops["audience"].isin(audiences)]
+    workshops = workshops.assign(
+        completions=workshops["attendances"] * workshops["completion_rate"],
+        month=workshops["date"].dt.to_period("M").dt.to_timestamp(),
+    )
+    return {name: workshops.groupby(column, observed=True)[list(STAGES)].sum() for name, column in BREAKDOWNS.items()}
+
+
+def _best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", default="100000,1000000", help="comma-separated workshop counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    base = finalize(load_all_data())
+    departments = list(base["departments"]["department_id"])
+    selections = [
+        ([], [], None, None),
+        (departments[::2], ["faculty", "staff"], "2023-01-01", "2023-12-31"),
+        (departments[:1], ["graduate students"], "2022-06-01", "2022-08-31"),
+    ]
+    for rows in (int(n) for n in args.rows.split(",")):
+        data = {**base, "workshops": _workshops(base["workshops"], rows)}
+        start = time.perf_counter()
+        funnel = WorkshopFunnel(data["workshops"])
+        build = time.perf_counter() - start
+        cubed = sum(_best_of(lambda s=s: funnel.compute(*s), args.repeat) for s in selections) / len(selections)
+        grouped = sum(_best_of(lambda s=s: _groupby(data, *s), args.repeat) for s in selections) / len(selections)
+        print(
+            f"{rows:,} workshops: cube of {len(funnel.cube):,} cells built in {build * 1000:.0f}ms; funnel per selection "
+            f"{cubed * 1000:.1f}ms from the cube vs {grouped * 1000:.1f}ms groupby ({grouped / cubed:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Local HTTP API for the dashboard KPIs.
+
+Every indicator in a KPI bundle is served as JSON, and table-shaped results
+can also be requested as Arrow IPC streams, for other AIRE components that
+need the numbers without scraping the dashboard::
+
+    python -m src.api --port 8502
+    curl 'http://127.0.0.1:8502/kpis/engagement/timeseries?departments=D01,D02&start=2024-01-01'
+
+Filters mirror the sidebar: ``departments`` and ``roles`` (comma-separated,
+default all), ``start`` and ``end`` (ISO dates, default the full workshop
+range) and ``format`` (``json`` or ``arrow``). Bundles come from the same
+cache as the dashboard. The ETag is derived from the dataset fingerprint and
+the normalized request, so ``If-None-Match`` revalidation is answered without
+computing anything, and encoded responses are kept in a bounded LRU.
+"""
+import argparse
+import hashlib
+import io
+import json
+import math
+from datetime import date, datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from .config import API_CACHE_SIZE, API_HOST, API_PORT, KPI_BACKEND
+from .kpi_bundle import ROLE_OPTIONS, BundleCache, FilterSelection, get_kpi_bundle
+
+# Bundle entries exposed as resources; the filtered raw tables stay private to the dashboard.
+KPI_NAMES = (
+    "adoption",
+    "adoption_overall",
+    "coverage",
+    "coverage_overall",
+    "learning_impact",
+    "engagement",
+    "funnel",
+    "sentiment_theme",
+    "reflection_trends",
+    "readiness",
+    "retention",
+    "participation",
+    "score_quantiles",
+    "survey_pairing",
+)
+FORMATS = {"json": "application/json", "arrow": "application/vnd.apache.arrow.stream"}
+
+Dataset = Tuple[Mapping[str, pd.DataFrame], str]
+
+
+class ApiError(ValueError):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def reference_dataset() -> Dataset:
+    """Reference tables and their fingerprint, from the process-wide snapshot."""
+    from .refresh import get_refresher
+
+    snapshot = get_refresher().current()
+    return snapshot.tables, snapshot.fingerprint
+
+
+def _split(values: List[str]) -> List[str]:
+    return [item.strip() for value in values for item in value.split(",") if item.strip()]
+
+
+def parse_selection(query: Dict[str, List[str]], data: Mapping[str, pd.DataFrame]) -> FilterSelection:
+    all_departments = list(data["departments"]["department_id"])
+    departments = _split(query.get("departments", [])) or all_departments
+    roles = _split(query.get("roles", [])) or ROLE_OPTIONS
+    for label, values, known in (("departments", departments, all_departments), ("roles", roles, ROLE_OPTIONS)):
+        unknown = sorted(set(values) - set(known))
+        if unknown:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Unknown {label}: {', '.join(unknown)}")
+    dates = data["workshops"]["date"]
+    try:
+        start = pd.Timestamp(query["start"][-1]) if "start" in query else dates.min()
+        end = pd.Timestamp(query["end"][-1]) if "end" in query else dates.max()
+    except ValueError as exc:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Invalid date: {exc}") from None
+    if pd.isna(start) or pd.isna(end):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "No workshop dates to default the range to; pass start and end.")
+    return FilterSelection.from_sidebar(departments, roles, start, end)
+
+
+def resolve_resource(bundle: Dict[str, object], name: str, part: Optional[str]) -> object:
+    value = bundle[name]
+    if part is None:
+        return value
+    if not isinstance(value, dict) or part not in value:
+        raise ApiError(HTTPStatus.NOT_FOUND, f"Unknown part of {name}: {part}")
+    return value[part]
+
+
+def _jsonable(value):
+    if isinstance(value, pd.DataFrame):
+        return json.loads(value.to_json(orient="records", date_format="iso"))
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def encode(value: object, fmt: str) -> bytes:
+    if fmt == "json":
+        return json.dumps(_jsonable(value), separators=(",", ":")).encode("utf-8")
+    if isinstance(value, dict):
+        raise ApiError(HTTPStatus.NOT_ACCEPTABLE, f"Arrow output needs a single table; request one of: {', '.join(value)}")
+    import pyarrow as pa
+
+    frame = value if isinstance(value, pd.DataFrame) else pd.DataFrame({"value": [value]})
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def response_etag(fingerprint: str, selection: FilterSelection, path: str, fmt: str, backend: str) -> str:
+    digest = hashlib.sha1(repr((fingerprint, backend, selection, path, fmt)).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+class KpiApi:
+    """Request handling independent of the HTTP transport; shared by all server threads."""
+
+    def __init__(
+        self,
+        dataset: Callable[[], Dataset] = reference_dataset,
+        backend=None,
+        cache_size: int = API_CACHE_SIZE,
+        bundle_cache: Optional[BundleCache] = None,
+    ):
+        self.dataset = dataset
+        self.backend = backend
+        self.responses = BundleCache(cache_size)
+        self.bundle_cache = bundle_cache
+
+    def handle(self, url: str, if_none_match: Optional[str] = None) -> Tuple[HTTPStatus, Dict[str, str], bytes]:
+        parts = urlsplit(url)
+        segments = [s for s in parts.path.split("/") if s]
+        query = parse_qs(parts.query)
+        if segments == ["health"]:
+            return HTTPStatus.OK, {"Content-Type": FORMATS["json"]}, b'{"status":"ok"}'
+        if segments == ["kpis"]:
+            return HTTPStatus.OK, {"Content-Type": FORMATS["json"]}, json.dumps({"kpis": list(KPI_NAMES)}).encode("utf-8")
+        if len(segments) not in (2, 3) or segments[0] != "kpis":
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Unknown path: {parts.path}")
+        name, part = segments[1], segments[2] if len(segments) == 3 else None
+        if name not in KPI_NAMES:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Unknown KPI: {name}")
+        fmt = query.get("format", ["json"])[-1]
+        if fmt not in FORMATS:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Unsupported format: {fmt}")
+
+        data, fingerprint = self.dataset()
+        selection = parse_selection(query, data)
+        engine = "duckdb" if self.backend is not None else "pandas"
+        etag = response_etag(fingerprint, selection, "/".join(segments), fmt, engine)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return HTTPStatus.NOT_MODIFIED, headers, b""
+
+        def build() -> bytes:
+            bundle = get_kpi_bundle(data, selection, fingerprint, self.backend, self.bundle_cache)
+            return encode(resolve_resource(bundle, name, part), fmt)
+
+        body = self.responses.get_or_compute(etag, build)
+        return HTTPStatus.OK, {**headers, "Content-Type": FORMATS[fmt]}, body
+
+
+def _handler_for(api: KpiApi):
+    class KpiRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately; don't let Nagle hold the body back on keep-alive connections.
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:
+            try:
+                status, headers, body = api.handle(self.path, self.headers.get("If-None-Match"))
+            except ApiError as exc:
+                status, headers = exc.status, {"Content-Type": FORMATS["json"]}
+                body = json.dumps({"error": str(exc)}).encode("utf-8")
+            except Exception as exc:
+                status, headers = HTTPStatus.INTERNAL_SERVER_ERROR, {"Content-Type": FORMATS["json"]}
+                body = json.dumps({"error": f"{type(exc).__name__}: {exc}"}).encode("utf-8")
+            self.send_response(status)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if status != HTTPStatus.NOT_MODIFIED:
+                self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    return KpiRequestHandler
+
+
+def make_server(api: Optional[KpiApi] = None, host: str = API_HOST, port: int = API_PORT) -> ThreadingHTTPServer:
+    """Threaded server (one thread per connection); ``port=0`` picks a free port."""
+    server = ThreadingHTTPServer((host, port), _handler_for(api or KpiApi()))
+    server.daemon_threads = True
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the dashboard KPIs as JSON or Arrow over local HTTP.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    args = parser.parse_args()
+    backend = None
+    if KPI_BACKEND == "duckdb":
+        from .sql_backend import SqlKpiBackend
+
+        backend = SqlKpiBackend()
+    server = make_server(KpiApi(backend=backend), args.host, args.port)
+    print(f"Serving KPIs on http://{args.host}:{server.server_port}/kpis")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Arrow IPC store for validated dataset tables.
+
+The first process to load a dataset writes each validated table to an
+``<table>.arrow`` file; every process then memory-maps those files
+read-only. Numeric and date columns become zero-copy views over the mapped
+pages and string columns stay Arrow-backed, so the operating system shares
+the dataset between Streamlit worker processes instead of each one holding
+its own parsed copy.
+
+Each write goes to its own generation directory and the manifest, which names
+that directory, is replaced last: a reader opens every table from the
+generation its manifest points to, never a mix of two writes. The store
+fingerprint covers the source files, the settings that change the derived
+columns and ``STORE_FORMAT_VERSION``, which is bumped whenever ingestion
+produces different tables from the same files.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+MANIFEST_NAME = "manifest.json"
+STORE_FORMAT_VERSION = 2
+GENERATION_PREFIX = "generation-"
+
+
+def store_fingerprint(source_fingerprint: str, enrich_reflections: bool) -> str:
+    """Fingerprint of a materialized store: the source files plus what shapes the tables written from them."""
+    return f"format{STORE_FORMAT_VERSION}:enrich{int(enrich_reflections)}:{source_fingerprint}"
+
+
+def _types_mapper() -> Optional[Callable]:
+    # With pandas' Arrow-backed default string dtype the conversion is already zero-copy.
+    if pd.get_option("future.infer_string"):
+        return None
+    return {pa.string(): pd.StringDtype("pyarrow"), pa.large_string(): pd.StringDtype("pyarrow")}.get
+
+
+def _replace_atomically(path: Path, write: Callable[[Path], None]) -> None:
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _read_manifest(store_dir: Path) -> Optional[dict]:
+    try:
+        return json.loads((store_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _prune(store_dir: Path, keep: set) -> None:
+    """Remove generations other than ``keep``; files still mapped by a reader stay valid until unmapped."""
+    for path in store_dir.glob(f"{GENERATION_PREFIX}*"):
+        if path.name not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def materialize(tables: Dict[str, pd.DataFrame], store_dir: Path, fingerprint: str) -> None:
+    """Write tables to a new generation directory, then point the manifest at it."""
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:12]
+    generation = f"{GENERATION_PREFIX}{digest}-{os.getpid()}-{time.time_ns()}"
+    generation_dir = store_dir / generation
+    generation_dir.mkdir()
+    for name, df in tables.items():
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.OSFile(str(generation_dir / f"{name}.arrow"), "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    previous = _read_manifest(store_dir)
+    manifest = {"fingerprint": fingerprint, "generation": generation, "tables": sorted(tables)}
+    _replace_atomically(
+        store_dir / MANIFEST_NAME,
+        lambda tmp_path: tmp_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8"),
+    )
+    # The generation just replaced may still be opening in another process; older ones are unreachable.
+    _prune(store_dir, {generation, (previous or {}).get("generation")})
+
+
+def read_store(store_dir: Path, fingerprint: str) -> Optional[Dict[str, pd.DataFrame]]:
+    """Memory-map a materialized store; returns None when it is missing or stale."""
+    store_dir = Path(store_dir)
+    manifest = _read_manifest(store_dir)
+    if manifest is None or manifest.get("fingerprint") != fingerprint or "generation" not in manifest:
+        return None
+    generation_dir = store_dir / manifest["generation"]
+    tables: Dict[str, pd.DataFrame] = {}
+    for name in manifest["tables"]:
+        path = generation_dir / f"{name}.arrow"
+        if not path.exists():
+            return None
+        # The mapped buffers keep the mapping alive for as long as the DataFrame references them.
+        table = ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        tables[name] = table.to_pandas(split_blocks=True, types_mapper=_types_mapper())
+    return tables
+
+
+def load_or_materialize(
+    store_dir: Path, fingerprint: str, loader: Callable[[], Dict[str, pd.DataFrame]]
+) -> Dict[str, pd.DataFrame]:
+    tables = read_store(store_dir, fingerprint)
+    if tables is None:
+        loaded = loader()
+        materialize(loaded, store_dir, fingerprint)
+        # Another process may have replaced the store in between; fall back to our own copy.
+        tables = read_store(store_dir, fingerprint) or loaded
+    return tables
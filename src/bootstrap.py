@@ -0,0 +1,180 @@
+"""
+Bootstrap confidence intervals for pre/post learning-impact deltas.
+
+Each (group, metric) cell draws its resamples as an index matrix of shape
+``(resamples, n)`` in bounded batches, so means and pooled standard
+deviations for all resamples come from a handful of NumPy reductions. Every
+cell seeds its own generator from the configured seed and the cell's
+identity, so results do not depend on batching or on how cells are split
+across worker processes. Parallel runs share one process pool for the life
+of the process rather than starting a pool per call.
+"""
+import multiprocessing
+import multiprocessing.util
+import os
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import BOOTSTRAP_PARALLEL_MIN_GROUPS, BOOTSTRAP_RESAMPLES, BOOTSTRAP_SEED, BOOTSTRAP_WORKERS
+
+IMPACT_METRICS = ["confidence_score", "understanding_responsible_ai"]
+INTERVAL_COLUMNS = [
+    "group_field",
+    "group",
+    "metric",
+    "n",
+    "delta",
+    "delta_ci_low",
+    "delta_ci_high",
+    "effect_size",
+    "effect_size_ci_low",
+    "effect_size_ci_high",
+]
+
+# Upper bound on resample-matrix cells held in memory at once.
+_MAX_BATCH_CELLS = 2_000_000
+
+
+def _delta_and_effect(pre: np.ndarray, post: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Delta and Cohen's d (pooled SD, as in ``_impact_summary``) along the last axis."""
+    delta = post.mean(axis=-1) - pre.mean(axis=-1)
+    pooled_std = np.sqrt((pre.var(axis=-1, ddof=1) + post.var(axis=-1, ddof=1)) / 2)
+    effect = np.divide(delta, pooled_std, out=np.zeros_like(delta), where=pooled_std > 0)
+    return delta, effect
+
+
+def bootstrap_paired(
+    pre: np.ndarray,
+    post: np.ndarray,
+    n_resamples: int,
+    seed,
+    confidence: float = 0.95,
+) -> Dict[str, float]:
+    pre = np.asarray(pre, dtype=float)
+    post = np.asarray(post, dtype=float)
+    n = len(pre)
+    result = {
+        "n": n,
+        "delta": float(post.mean() - pre.mean()) if n else np.nan,
+        "delta_ci_low": np.nan,
+        "delta_ci_high": np.nan,
+        "effect_size": 0.0 if n else np.nan,
+        "effect_size_ci_low": np.nan,
+        "effect_size_ci_high": np.nan,
+    }
+    if n < 2:
+        # A single pair has no spread to resample.
+        return result
+
+    point_delta, point_effect = _delta_and_effect(pre, post)
+    rng = np.random.default_rng(seed)
+    batch = max(1, _MAX_BATCH_CELLS // n)
+    deltas, effects = [], []
+    for start in range(0, n_resamples, batch):
+        indices = rng.integers(0, n, size=(min(batch, n_resamples - start), n))
+        batch_delta, batch_effect = _delta_and_effect(pre[indices], post[indices])
+        deltas.append(batch_delta)
+        effects.append(batch_effect)
+    tail = (1 - confidence) / 2 * 100
+    delta_low, delta_high = np.percentile(np.concatenate(deltas), [tail, 100 - tail])
+    effect_low, effect_high = np.percentile(np.concatenate(effects), [tail, 100 - tail])
+    return {
+        **result,
+        "delta": float(point_delta),
+        "delta_ci_low": float(delta_low),
+        "delta_ci_high": float(delta_high),
+        "effect_size": float(point_effect),
+        "effect_size_ci_low": float(effect_low),
+        "effect_size_ci_high": float(effect_high),
+    }
+
+
+_EXECUTOR: Optional[ProcessPoolExecutor] = None
+_EXECUTOR_WORKERS = 0
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _executor(workers: int) -> ProcessPoolExecutor:
+    """The shared resampling pool, recreated only when a different worker count is asked for."""
+    global _EXECUTOR, _EXECUTOR_WORKERS
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None or _EXECUTOR_WORKERS != workers:
+            if _EXECUTOR is not None:
+                _EXECUTOR.shutdown(wait=False)
+            # Spawned, not forked: the callers are threaded servers and job workers a fork would copy mid-flight.
+            context = multiprocessing.get_context("spawn")
+            _EXECUTOR, _EXECUTOR_WORKERS = ProcessPoolExecutor(max_workers=workers, mp_context=context), workers
+            # A job worker exits only once its children do: shut the pool down first, ahead of the
+            # call queue's own exit hook (priority 10), which would otherwise drop the stop signals.
+            multiprocessing.util.Finalize(_EXECUTOR, _EXECUTOR.shutdown, exitpriority=20)
+        return _EXECUTOR
+
+
+def _cell_seed(seed: int, group_field: str, group, metric: str) -> np.random.SeedSequence:
+    return np.random.SeedSequence([seed, zlib.crc32(f"{group_field}|{group}|{metric}".encode("utf-8"))])
+
+
+def _run_cell(task) -> Dict[str, object]:
+    group_field, group, metric, pre, post, n_resamples, seed, confidence = task
+    stats = bootstrap_paired(pre, post, n_resamples, _cell_seed(seed, group_field, group, metric), confidence)
+    return {"group_field": group_field, "group": group, "metric": metric, **stats}
+
+
+def bootstrap_learning_impact(
+    paired_df: pd.DataFrame,
+    group_fields: Iterable[str] = ("department_id", "role"),
+    n_resamples: Optional[int] = None,
+    seed: Optional[int] = None,
+    confidence: float = 0.95,
+    max_workers: Optional[int] = None,
+    parallel_min_groups: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Bootstrap intervals for the overall delta/effect size and for each group in ``group_fields``.
+    ``paired_df`` holds one row per matched response with ``<metric>_pre``/``<metric>_post`` columns.
+    """
+    n_resamples = BOOTSTRAP_RESAMPLES if n_resamples is None else n_resamples
+    seed = BOOTSTRAP_SEED if seed is None else seed
+    max_workers = BOOTSTRAP_WORKERS if max_workers is None else max_workers
+    parallel_min_groups = BOOTSTRAP_PARALLEL_MIN_GROUPS if parallel_min_groups is None else parallel_min_groups
+    if paired_df.empty or n_resamples <= 0:
+        return pd.DataFrame(columns=INTERVAL_COLUMNS)
+    # Resampled indices refer to row positions, so fix the row order independently of how pairs were built.
+    sort_keys = [col for col in ("participant_id", "workshop_id") if col in paired_df.columns]
+    if sort_keys:
+        paired_df = paired_df.sort_values(sort_keys, kind="stable")
+
+    groups: List[Tuple[str, object, pd.DataFrame]] = [("overall", "overall", paired_df)]
+    for field in group_fields:
+        if field in paired_df.columns:
+            groups.extend((field, value, group_df) for value, group_df in paired_df.groupby(field, observed=True))
+    tasks = [
+        (
+            field,
+            value,
+            metric,
+            group_df[f"{metric}_pre"].to_numpy(dtype=float),
+            group_df[f"{metric}_post"].to_numpy(dtype=float),
+            n_resamples,
+            seed,
+            confidence,
+        )
+        for field, value, group_df in groups
+        for metric in IMPACT_METRICS
+    ]
+
+    workers = max_workers or os.cpu_count() or 1
+    if workers > 1 and len(tasks) >= parallel_min_groups:
+        rows = list(_executor(workers).map(_run_cell, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+    else:
+        rows = [_run_cell(task) for task in tasks]
+
+    intervals = pd.DataFrame(rows, columns=INTERVAL_COLUMNS)
+    value_columns = INTERVAL_COLUMNS[4:]
+    intervals[value_columns] = intervals[value_columns].round(2)
+    return intervals
@@ -1,6 +1,15 @@
+from __future__ import annotations
+
+import functools
+
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+
+from .frame_cache import FrameCache
+from .lazy_imports import lazy_module
+
+# Plotly is imported when the first figure is built, not when the app starts.
+px = lazy_module("plotly.express")
+go = lazy_module("plotly.graph_objects")
 
 PALETTE = {
     "primary": "#09728B",
@@ -12,6 +21,23 @@ PALETTE = {
 }
 
 COLORWAY = [PALETTE["primary"], PALETTE["accent"], "#0A4D64", "#7C3F87", "#4A4A4A"]
+SENTIMENT_COLORS = {"positive": PALETTE["primary"], "neutral": PALETTE["muted"], "negative": PALETTE["warning"]}
+
+
+# Figures built from long-lived frames (cached KPI bundles), dropped with their frame.
+_FIGURE_CACHE = FrameCache()
+
+
+def _cached_figure(make):
+    @functools.wraps(make)
+    def wrapper(df: pd.DataFrame, *args):
+        return _FIGURE_CACHE.get_or_build((df,), lambda: make(df, *args), make.__name__, args)
+
+    return wrapper
+
+
+def cached_figure_count() -> int:
+    return len(_FIGURE_CACHE)
 
 
 def _apply_layout_defaults(fig: go.Figure, title: str) -> go.Figure:
@@ -40,6 +66,7 @@ def make_overview_kpi_cards(adoption_index: float, coverage_rate: float, avg_com
     ]
 
 
+@_cached_figure
 def make_adoption_radar_chart(dept_adoption_df: pd.DataFrame):
     if dept_adoption_df.empty:
         fig = go.Figure()
@@ -50,6 +77,19 @@ def make_adoption_radar_chart(dept_adoption_df: pd.DataFrame):
     return _apply_layout_defaults(fig, "Figure 2: Comparative Departmental Readiness Profile")
 
 
+@_cached_figure
+def make_adoption_history_chart(history_df: pd.DataFrame):
+    if history_df.empty:
+        fig = go.Figure()
+        fig.add_annotation(text="No adoption history available for the current filters.", showarrow=False)
+        return _apply_layout_defaults(fig, "Adoption Index Over Time")
+    fig = px.line(history_df, x="period", y="adoption_index", color="department_name", markers=True)
+    fig.update_traces(hovertemplate="%{fullData.name}<br>%{x|%b %Y}: %{y:.1f}<extra></extra>")
+    fig.update_layout(xaxis_title="Period start", yaxis_title="Adoption Index")
+    return _apply_layout_defaults(fig, "Adoption Trajectory by Department")
+
+
+@_cached_figure
 def make_confidence_change_chart(impact_df: pd.DataFrame):
     if impact_df.empty:
         fig = go.Figure()
@@ -62,6 +102,52 @@ def make_confidence_change_chart(impact_df: pd.DataFrame):
     return _apply_layout_defaults(fig, "Figure 3: Pre- vs. Post-Intervention Competency Shift")
 
 
+@_cached_figure
+def make_delta_interval_chart(intervals_df: pd.DataFrame, title: str):
+    if intervals_df.empty:
+        fig = go.Figure()
+        fig.add_annotation(text="Not enough matched pre/post responses for the current filters.", showarrow=False)
+        return _apply_layout_defaults(fig, title)
+    fig = px.scatter(
+        intervals_df,
+        x="delta",
+        y="label",
+        color="metric",
+        error_x=intervals_df["delta_ci_high"] - intervals_df["delta"],
+        error_x_minus=intervals_df["delta"] - intervals_df["delta_ci_low"],
+        hover_data={"n": True, "delta_ci_low": True, "delta_ci_high": True, "label": False},
+        color_discrete_sequence=[PALETTE["primary"], PALETTE["accent"]],
+    )
+    fig.add_vline(x=0, line_dash="dot", line_color=PALETTE["muted"])
+    fig.update_layout(xaxis_title="Post - Pre (95% bootstrap interval)", yaxis_title="")
+    return _apply_layout_defaults(fig, title)
+
+
+@_cached_figure
+def make_score_quantile_chart(quantiles_df: pd.DataFrame, metric: str):
+    title = f"{metric.replace('_', ' ').title()} by Department"
+    rows = quantiles_df[quantiles_df["metric"] == metric]
+    if rows.empty:
+        fig = go.Figure()
+        fig.add_annotation(text="No survey responses available for the current filters.", showarrow=False)
+        return _apply_layout_defaults(fig, title)
+    fig = px.scatter(
+        rows,
+        x="department_name",
+        y="median",
+        color="stage",
+        error_y=rows["p75"] - rows["median"],
+        error_y_minus=rows["median"] - rows["p25"],
+        hover_data={"responses": True, "p25": True, "p75": True},
+        category_orders={"stage": ["pre", "post"]},
+        color_discrete_sequence=[PALETTE["muted"], PALETTE["primary"]],
+    )
+    fig.update_traces(marker_size=10)
+    fig.update_layout(xaxis_title="Department", yaxis_title="Median score (bars: 25th-75th percentile)", yaxis_range=[0.5, 5.5])
+    return _apply_layout_defaults(fig, title)
+
+
+@_cached_figure
 def make_workshop_engagement_timeseries(engagement_df: pd.DataFrame):
     if engagement_df.empty:
         fig = go.Figure()
@@ -73,17 +159,115 @@ def make_workshop_engagement_timeseries(engagement_df: pd.DataFrame):
     return _apply_layout_defaults(fig, "Figure 4: Monthly Engagement Velocity")
 
 
+@_cached_figure
+def make_cohort_retention_heatmap(cohorts_df: pd.DataFrame):
+    if cohorts_df.empty:
+        fig = go.Figure()
+        fig.add_annotation(text="No attendance history available for the current filters.", showarrow=False)
+        return _apply_layout_defaults(fig, "Cohort Retention")
+    matrix = cohorts_df.assign(cohort=cohorts_df["cohort_month"].dt.strftime("%Y-%m")).pivot(
+        index="cohort", columns="months_since", values="retention_rate"
+    )
+    fig = px.imshow(
+        matrix,
+        color_continuous_scale=[PALETTE["soft"], PALETTE["accent"], PALETTE["primary_dark"]],
+        zmin=0,
+        zmax=1,
+        aspect="auto",
+        labels={"x": "Months since first attendance", "y": "First-attendance month", "color": "Retention"},
+    )
+    fig.update_traces(hovertemplate="Cohort %{y}, month +%{x}: %{z:.0%}<extra></extra>")
+    fig = _apply_layout_defaults(fig, "Cohort Retention (share of cohort active)")
+    fig.update_yaxes(autorange="reversed", showgrid=False)
+    return fig
+
+
+@_cached_figure
+def make_repeat_rate_bar(repeat_df: pd.DataFrame, category: str, title: str):
+    if repeat_df.empty:
+        fig = go.Figure()
+        fig.add_annotation(text="No participants available for the current filters.", showarrow=False)
+        return _apply_layout_defaults(fig, title)
+    fig = px.bar(repeat_df, x=category, y="repeat_rate", color_discrete_sequence=[PALETTE["primary"]], hover_data=["participants", "avg_workshops"])
+    fig.update_layout(xaxis_title=category.replace("_", " ").title(), yaxis_title="Repeat attendance", yaxis_tickformat=".0%")
+    fig.update_traces(marker_line_color="#ffffff", marker_line_width=0.5)
+    return _apply_layout_defaults(fig, title)
+
+
+@_cached_figure
+def make_active_participants_bar(by_department_df: pd.DataFrame):
+    if by_department_df.empty:
+        fig = go.Figure()
+        fig.add_annotation(text="No participant activity available for the current filters.", showarrow=False)
+        return _apply_layout_defaults(fig, "Active Participants by Department")
+    fig = px.bar(
+        by_department_df,
+        x="department_name",
+        y="participants",
+        error_y="error" if by_department_df["error"].any() else None,
+        color_discrete_sequence=[PALETTE["accent"]],
+    )
+    fig.update_layout(xaxis_title="Department", yaxis_title="Distinct participants")
+    fig.update_traces(marker_line_color="#ffffff", marker_line_width=0.5)
+    return _apply_layout_defaults(fig, "Active Participants by Department")
+
+
+@_cached_figure
+def make_attendance_bar(attendance_df: pd.DataFrame, category: str, title: str, color: str):
+    return px.bar(attendance_df, x=category, y="attendances", title=title, color_discrete_sequence=[color])
+
+
+@_cached_figure
+def make_workshop_funnel_chart(stages_df: pd.DataFrame):
+    if stages_df.empty or stages_df["count"].iloc[0] == 0:
+        fig = go.Figure()
+        fig.add_annotation(text="No registrations available for the current filters.", showarrow=False)
+        return _apply_layout_defaults(fig, "Registration to Completion")
+    fig = go.Figure(
+        go.Funnel(
+            y=stages_df["stage"].str.title(),
+            x=stages_df["count"],
+            customdata=stages_df[["step_rate", "overall_rate"]],
+            texttemplate="%{x:,.0f} (%{customdata[1]:.0%})",
+            hovertemplate="%{y}: %{x:,.0f}<br>%{customdata[0]:.0%} of previous stage<extra></extra>",
+            marker_color=COLORWAY[: len(stages_df)],
+        )
+    )
+    return _apply_layout_defaults(fig, "Registration to Completion")
+
+
+@_cached_figure
+def make_conversion_rate_bar(funnel_df: pd.DataFrame, category: str, title: str):
+    if funnel_df.empty:
+        fig = go.Figure()
+        fig.add_annotation(text="No registrations available for the current filters.", showarrow=False)
+        return _apply_layout_defaults(fig, title)
+    rates = funnel_df.melt(
+        id_vars=[category],
+        value_vars=["attendance_rate", "completion_rate"],
+        var_name="stage",
+        value_name="rate",
+    )
+    rates["stage"] = rates["stage"].map({"attendance_rate": "Attended", "completion_rate": "Completed"})
+    fig = px.bar(rates, x=category, y="rate", color="stage", barmode="group", color_discrete_sequence=COLORWAY)
+    fig.update_layout(xaxis_title=category.replace("_", " ").title(), yaxis_title="Conversion", yaxis_tickformat=".0%")
+    fig.update_traces(hovertemplate="%{x}: %{y:.0%}", marker_line_color="#ffffff", marker_line_width=0.5)
+    return _apply_layout_defaults(fig, title)
+
+
+@_cached_figure
 def make_reflection_sentiment_bar(sentiment_df: pd.DataFrame):
     if sentiment_df.empty:
         fig = go.Figure()
         fig.add_annotation(text="No reflections available for the current filters.", showarrow=False)
         return _apply_layout_defaults(fig, "Reflection Sentiment")
-    fig = px.bar(sentiment_df, x="sentiment", y="count", color="sentiment", color_discrete_map={"positive": PALETTE["primary"], "neutral": PALETTE["muted"], "negative": PALETTE["warning"]})
+    fig = px.bar(sentiment_df, x="sentiment", y="count", color="sentiment", color_discrete_map=SENTIMENT_COLORS)
     fig.update_layout(xaxis_title="Sentiment", yaxis_title="Count")
     fig.update_traces(hovertemplate="%{x}: %{y}", marker_line_color="#ffffff", marker_line_width=0.5)
     return _apply_layout_defaults(fig, "Figure 5: Participant Sentiment Distribution")
 
 
+@_cached_figure
 def make_theme_distribution_bar(theme_df: pd.DataFrame):
     if theme_df.empty:
         fig = go.Figure()
@@ -95,6 +279,74 @@ def make_theme_distribution_bar(theme_df: pd.DataFrame):
     return _apply_layout_defaults(fig, "Figure 6: Emerging Themes & Risk Signals")
 
 
+@_cached_figure
+def make_sentiment_trend_chart(sentiment_by_month: pd.DataFrame):
+    if sentiment_by_month.empty:
+        fig = go.Figure()
+        fig.add_annotation(text="No dated reflections available for the current filters.", showarrow=False)
+        return _apply_layout_defaults(fig, "Sentiment Over Time")
+    fig = px.bar(sentiment_by_month, x="month", y="count", color="sentiment", color_discrete_map=SENTIMENT_COLORS)
+    fig.update_layout(barmode="stack", xaxis_title="Month", yaxis_title="Reflections")
+    fig.update_traces(hovertemplate="%{x|%b %Y}: %{y}", marker_line_color="#ffffff", marker_line_width=0.5)
+    return _apply_layout_defaults(fig, "Sentiment Over Time")
+
+
+@_cached_figure
+def make_theme_trend_chart(theme_by_month: pd.DataFrame):
+    if theme_by_month.empty:
+        fig = go.Figure()
+        fig.add_annotation(text="No dated reflections available for the current filters.", showarrow=False)
+        return _apply_layout_defaults(fig, "Themes Over Time")
+    fig = px.line(theme_by_month, x="month", y="count", color="theme", markers=True)
+    fig.update_traces(hovertemplate="%{x|%b %Y}: %{y}")
+    fig.update_layout(xaxis_title="Month", yaxis_title="Reflections")
+    return _apply_layout_defaults(fig, "Themes Over Time")
+
+
+@_cached_figure
+def make_theme_department_heatmap(theme_by_department: pd.DataFrame):
+    if theme_by_department.empty:
+        fig = go.Figure()
+        fig.add_annotation(text="No reflections available for the current filters.", showarrow=False)
+        return _apply_layout_defaults(fig, "Themes by Department")
+    matrix = theme_by_department.pivot(index="department_name", columns="theme", values="count").fillna(0)
+    fig = px.imshow(
+        matrix,
+        color_continuous_scale=[PALETTE["soft"], PALETTE["accent"], PALETTE["primary_dark"]],
+        aspect="auto",
+        labels={"x": "Theme", "y": "Department", "color": "Reflections"},
+    )
+    fig.update_traces(hovertemplate="%{y}, %{x}: %{z}<extra></extra>")
+    fig = _apply_layout_defaults(fig, "Themes by Department")
+    fig.update_yaxes(showgrid=False)
+    return fig
+
+
+@_cached_figure
+def make_reflection_mentions_bar(counts_df: pd.DataFrame, category: str, title: str):
+    if counts_df.empty:
+        fig = go.Figure()
+        fig.add_annotation(text="No matching reflections for the current filters.", showarrow=False)
+        return _apply_layout_defaults(fig, title)
+    fig = px.bar(counts_df, x=category, y="count", color_discrete_sequence=[PALETTE["accent"]])
+    fig.update_layout(xaxis_title=category.replace("_", " ").title(), yaxis_title="Matching reflections")
+    fig.update_traces(hovertemplate="%{x}: %{y}", marker_line_color="#ffffff", marker_line_width=0.5)
+    return _apply_layout_defaults(fig, title)
+
+
+@_cached_figure
+def make_reflection_mentions_timeseries(by_month_df: pd.DataFrame):
+    if by_month_df.empty:
+        fig = go.Figure()
+        fig.add_annotation(text="No matching reflections for the current filters.", showarrow=False)
+        return _apply_layout_defaults(fig, "Mentions Over Time")
+    fig = px.line(by_month_df, x="month", y="count", markers=True, color_discrete_sequence=[PALETTE["primary"]])
+    fig.update_traces(hovertemplate="%{x|%b %Y}: %{y} reflections")
+    fig.update_layout(xaxis_title="Month", yaxis_title="Matching reflections")
+    return _apply_layout_defaults(fig, "Mentions Over Time")
+
+
+@_cached_figure
 def make_department_readiness_scatter(readiness_df: pd.DataFrame):
     if readiness_df.empty:
         fig = go.Figure()
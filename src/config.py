@@ -0,0 +1,75 @@
+import os
+
+# Directory holding the reference dataset CSVs; defaults to data/synthetic.
+# Point it at a drop folder to have new extracts picked up while running.
+DATA_DIR_OVERRIDE = os.environ.get("AIRE_DATA_DIR", "").strip()
+
+# Seconds between background checks of the data directory for changed files
+# (see src/refresh.py). 0 disables polling: the snapshot is loaded once and
+# kept until it is invalidated (e.g. the Reload reference dataset button).
+REFRESH_INTERVAL_SECONDS = float(os.environ.get("AIRE_REFRESH_INTERVAL", "30"))
+
+# Date-partitioned copy of the fact tables (see src/partitions.py). When set
+# and a layout has been written there, only the partitions overlapping the
+# sidebar date range are read. PARTITION_FREQ is the default for new layouts.
+PARTITION_DIR = os.environ.get("AIRE_PARTITION_DIR", "").strip()
+PARTITION_FREQ = os.environ.get("AIRE_PARTITION_FREQ", "term").strip().lower()
+
+# First calendar month of the institution's fiscal year, for the derived
+# fiscal_year key (see src/derived.py).
+FISCAL_YEAR_START_MONTH = int(os.environ.get("AIRE_FISCAL_YEAR_START_MONTH", "7"))
+
+# KPI engine used by the dashboard: "pandas" (in-memory, default) or "duckdb"
+# (SQL over the on-disk dataset files, see src/sql_backend.py).
+KPI_BACKEND = os.environ.get("AIRE_KPI_BACKEND", "pandas").strip().lower()
+
+# Approximate KPI mode (see src/sketches.py): distinct participants come from
+# HyperLogLog sketches with HLL_PRECISION bits of register index (2**p
+# registers per cell, about 1.04/sqrt(2**p) relative error), and score
+# quantiles from per-cell histograms, merged for each filter selection.
+KPI_APPROXIMATE = os.environ.get("AIRE_KPI_APPROXIMATE", "0").strip().lower() in ("1", "true", "yes")
+HLL_PRECISION = int(os.environ.get("AIRE_HLL_PRECISION", "12"))
+
+# Directory for the shared Arrow IPC copy of the reference dataset. When set,
+# validated tables are written there once and memory-mapped by every process.
+ARROW_STORE_DIR = os.environ.get("AIRE_ARROW_STORE_DIR", "").strip()
+
+# Label reflections that arrive without sentiment/theme (see src/enrichment.py).
+ENRICH_REFLECTIONS = os.environ.get("AIRE_ENRICH_REFLECTIONS", "1").strip().lower() in ("1", "true", "yes")
+# Most reflection texts whose labels are kept in memory; the oldest are dropped first.
+LABEL_CACHE_SIZE = int(os.environ.get("AIRE_LABEL_CACHE_SIZE", "1000000"))
+
+# How repeated pre or post responses for one (participant, workshop) are
+# resolved before pairing: "first", "last" or "mean" (see src/survey_pairing.py).
+SURVEY_DUPLICATE_POLICY = os.environ.get("AIRE_SURVEY_DUPLICATE_POLICY", "first").strip().lower()
+
+# Bootstrap confidence intervals for learning impact (see src/bootstrap.py).
+# BOOTSTRAP_WORKERS=0 uses one process per CPU once at least
+# BOOTSTRAP_PARALLEL_MIN_GROUPS (group, metric) cells need resampling.
+BOOTSTRAP_RESAMPLES = int(os.environ.get("AIRE_BOOTSTRAP_RESAMPLES", "2000"))
+BOOTSTRAP_SEED = int(os.environ.get("AIRE_BOOTSTRAP_SEED", "20240801"))
+BOOTSTRAP_WORKERS = int(os.environ.get("AIRE_BOOTSTRAP_WORKERS", "0"))
+BOOTSTRAP_PARALLEL_MIN_GROUPS = int(os.environ.get("AIRE_BOOTSTRAP_PARALLEL_MIN_GROUPS", "64"))
+
+# KPI bundles cached per dataset version and filter selection (see src/kpi_bundle.py).
+BUNDLE_CACHE_SIZE = int(os.environ.get("AIRE_BUNDLE_CACHE_SIZE", "64"))
+
+# KPI bundles are computed off the Streamlit script thread (see src/jobs.py):
+# "process" runs reference-dataset jobs in KPI_JOB_WORKERS worker processes
+# (other jobs on as many threads), "thread" uses threads only, and "off"
+# computes on the script thread. A session stops waiting for a job after
+# KPI_JOB_TIMEOUT_SECONDS.
+KPI_JOB_EXECUTOR = os.environ.get("AIRE_KPI_JOBS", "process").strip().lower()
+KPI_JOB_WORKERS = int(os.environ.get("AIRE_KPI_JOB_WORKERS", "2"))
+KPI_JOB_TIMEOUT_SECONDS = float(os.environ.get("AIRE_KPI_JOB_TIMEOUT", "120"))
+
+# Precompute bundles for common filter presets at startup (see src/warmup.py)
+# in the KPI job pool, at most WARMUP_WORKERS at a time.
+WARMUP_ENABLED = os.environ.get("AIRE_WARMUP", "1").strip().lower() in ("1", "true", "yes")
+WARMUP_WORKERS = int(os.environ.get("AIRE_WARMUP_WORKERS", "2"))
+
+# Local KPI API (see src/api.py): bind address and the number of encoded
+# responses kept for repeated queries.
+API_HOST = os.environ.get("AIRE_API_HOST", "127.0.0.1").strip()
+API_PORT = int(os.environ.get("AIRE_API_PORT", "8502"))
+API_CACHE_SIZE = int(os.environ.get("AIRE_API_CACHE_SIZE", "256"))
@@ -1,110 +1,67 @@
-import json
+import hashlib
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable
 
 import pandas as pd
-from jsonschema import Draft7Validator
-
-BASE_DIR = Path(__file__).resolve().parent.parent
-DATA_DIR = BASE_DIR / "data" / "synthetic"
-SCHEMA_DIR = BASE_DIR / "schemas"
 
+from .config import ARROW_STORE_DIR, DATA_DIR_OVERRIDE, ENRICH_REFLECTIONS
+# prepare_reflections and validate_dataframe are re-exported for existing callers.
+from .ingestion import SCHEMA_DIR, TABLES, ingest, ingest_table, prepare_reflections, validate_dataframe  # noqa: F401
 
-def _read_schema(schema_name: str) -> Draft7Validator:
-    schema_path = SCHEMA_DIR / schema_name
-    with open(schema_path, "r", encoding="utf-8") as f:
-        schema = json.load(f)
-    return Draft7Validator(schema)
+BASE_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = Path(DATA_DIR_OVERRIDE) if DATA_DIR_OVERRIDE else BASE_DIR / "data" / "synthetic"
 
 
-def _load_and_validate(csv_name: str, schema_name: str, date_cols=None) -> pd.DataFrame:
-    csv_path = DATA_DIR / csv_name
-    df = pd.read_csv(csv_path)
-    validator = _read_schema(schema_name)
+def source_fingerprint(paths: Iterable[Path]) -> str:
+    """Cheap fingerprint of the source files (name, size, modification time)."""
+    digest = hashlib.sha1()
+    for path in sorted(Path(p) for p in paths):
+        stat = path.stat()
+        digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns};".encode("utf-8"))
+    return digest.hexdigest()
 
-    records = df.to_dict(orient="records")
-    for idx, record in enumerate(records):
-        errors = sorted(validator.iter_errors(record), key=lambda e: e.path)
-        if errors:
-            messages = "; ".join([f"{'.'.join(map(str, e.path))}: {e.message}" for e in errors])
-            raise ValueError(f"Validation failed for {csv_name} at row {idx}: {messages}")
 
-    if date_cols:
-        for col in date_cols:
-            df[col] = pd.to_datetime(df[col])
-    return df
+def dataset_fingerprint() -> str:
+    return source_fingerprint([*DATA_DIR.glob("*.csv"), *SCHEMA_DIR.glob("*.json")])
 
 
-def validate_dataframe(df: pd.DataFrame, schema_name: str) -> None:
-    """
-    Validate an in-memory DataFrame against a JSON schema.
-    Raises ValueError with details if validation fails.
-    """
-    validator = _read_schema(schema_name)
-    records = df.to_dict(orient="records")
-    for idx, record in enumerate(records):
-        errors = sorted(validator.iter_errors(record), key=lambda e: e.path)
-        if errors:
-            messages = "; ".join([f"{'.'.join(map(str, e.path))}: {e.message}" for e in errors])
-            raise ValueError(f"Validation failed for {schema_name} at row {idx}: {messages}")
+def _load_table(name: str) -> pd.DataFrame:
+    spec = TABLES[name]
+    return ingest_table(DATA_DIR / spec.filename, spec)
 
 
 def load_workshops() -> pd.DataFrame:
-    return _load_and_validate(
-        "workshops.csv",
-        "workshops_schema.json",
-        date_cols=["date"],
-    )
+    return _load_table("workshops")
 
 
 def load_participants() -> pd.DataFrame:
-    return _load_and_validate(
-        "participants.csv",
-        "participants_schema.json",
-        date_cols=["last_attended_date"],
-    )
+    return _load_table("participants")
 
 
 def load_confidence_surveys_pre() -> pd.DataFrame:
-    return _load_and_validate(
-        "confidence_surveys_pre.csv",
-        "confidence_surveys_schema.json",
-        date_cols=["date"],
-    )
+    return _load_table("confidence_pre")
 
 
 def load_confidence_surveys_post() -> pd.DataFrame:
-    return _load_and_validate(
-        "confidence_surveys_post.csv",
-        "confidence_surveys_schema.json",
-        date_cols=["date"],
-    )
+    return _load_table("confidence_post")
 
 
 def load_reflections() -> pd.DataFrame:
-    return _load_and_validate(
-        "reflections.csv",
-        "reflections_schema.json",
-        date_cols=["date"],
-    )
+    return _load_table("reflections")
 
 
 def load_departments() -> pd.DataFrame:
-    return _load_and_validate("departments.csv", "departments_schema.json")
+    return _load_table("departments")
+
+
+def _read_all_data() -> Dict[str, pd.DataFrame]:
+    return ingest({name: DATA_DIR / spec.filename for name, spec in TABLES.items()})
 
 
 def load_all_data() -> Dict[str, pd.DataFrame]:
-    workshops = load_workshops()
-    participants = load_participants()
-    conf_pre = load_confidence_surveys_pre()
-    conf_post = load_confidence_surveys_post()
-    reflections = load_reflections()
-    departments = load_departments()
-    return {
-        "workshops": workshops,
-        "participants": participants,
-        "confidence_pre": conf_pre,
-        "confidence_post": conf_post,
-        "reflections": reflections,
-        "departments": departments,
-    }
+    if not ARROW_STORE_DIR:
+        return _read_all_data()
+    from . import arrow_store
+
+    fingerprint = arrow_store.store_fingerprint(dataset_fingerprint(), ENRICH_REFLECTIONS)
+    return arrow_store.load_or_materialize(Path(ARROW_STORE_DIR), fingerprint, _read_all_data)
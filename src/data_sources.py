@@ -1,23 +1,17 @@
-from typing import Dict, List
+from typing import Dict, List, Mapping
 
 import pandas as pd
-import io
 import streamlit as st
 
-from .data_loader import load_all_data, validate_dataframe  # type: ignore
+from .ingestion import TABLES, finalize, ingest
+from .refresh import DatasetSnapshot, get_refresher
 
 
 SYNTHETIC = "synthetic"
 UPLOADED = "uploaded"
 
-REQUIRED_FILES = {
-    "workshops": ("workshops.csv", "workshops_schema.json"),
-    "participants": ("participants.csv", "participants_schema.json"),
-    "confidence_pre": ("confidence_surveys_pre.csv", "confidence_surveys_schema.json"),
-    "confidence_post": ("confidence_surveys_post.csv", "confidence_surveys_schema.json"),
-    "reflections": ("reflections.csv", "reflections_schema.json"),
-    "departments": ("departments.csv", "departments_schema.json"),
-}
+# Upload file name and schema of each table.
+REQUIRED_FILES = {key: (spec.filename, spec.schema_name) for key, spec in TABLES.items()}
 
 
 def get_available_data_sources() -> List[str]:
@@ -27,33 +21,37 @@ def get_available_data_sources() -> List[str]:
     return sources
 
 
-def _validate_uploaded(df: pd.DataFrame, schema_name: str) -> pd.DataFrame:
-    validate_dataframe(df, schema_name)
-    return df
+def reference_snapshot() -> DatasetSnapshot:
+    """Current reference dataset snapshot, shared read-only by every session."""
+    return get_refresher().current()
 
 
-def load_data_for_source(source: str) -> Dict[str, pd.DataFrame]:
+def invalidate_reference_snapshot() -> None:
+    """Reload the reference dataset from disk on next access."""
+    get_refresher().invalidate()
+
+
+def _reference_data() -> Mapping[str, pd.DataFrame]:
+    return reference_snapshot().tables
+
+
+def load_data_for_source(source: str) -> Mapping[str, pd.DataFrame]:
     if source == SYNTHETIC:
-        return load_all_data()
+        return _reference_data()
 
     uploaded = st.session_state.get("uploaded_data")
     if source == UPLOADED and uploaded:
         return uploaded
 
     st.info("Uploaded dataset not available; reverting to synthetic data.")
-    return load_all_data()
+    return _reference_data()
 
 
 def process_uploads(uploaded_files: Dict[str, bytes]) -> Dict[str, pd.DataFrame]:
-    """Parse and validate uploaded CSV content into DataFrames."""
-    dataframes: Dict[str, pd.DataFrame] = {}
-    for key, (filename, schema_name) in REQUIRED_FILES.items():
-        if filename not in uploaded_files:
-            raise ValueError(f"{filename} is required.")
-        uploaded_obj = uploaded_files[filename]
-        # st.file_uploader returns UploadedFile; getvalue gives bytes for pandas
-        file_bytes = uploaded_obj.getvalue()
-        df = pd.read_csv(io.BytesIO(file_bytes))
-        _validate_uploaded(df, schema_name)
-        dataframes[key] = df
-    return dataframes
+    """Run uploaded CSV files through the same ingestion pipeline as the reference dataset."""
+    sources = {}
+    for key, spec in TABLES.items():
+        if spec.filename in uploaded_files:
+            # st.file_uploader returns UploadedFile; getvalue gives bytes for pandas
+            sources[key] = uploaded_files[spec.filename].getvalue()
+    return finalize(ingest(sources))
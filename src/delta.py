@@ -0,0 +1,207 @@
+"""
+Append-only delta ingestion with primary-key upserts.
+
+A batch holds new or corrected rows for some tables, as CSV files named like
+the dataset's own (``workshops.csv``, ``reflections.csv``, ...). Batch rows
+are ingested like any table (typed and schema-validated) and deduplicated on
+the table's primary key, the last row winning. They are then upserted: a row
+whose key already exists replaces that row in place, any other row is
+appended. Only the batch rows are validated and integrity-checked, against
+the updated dataset.
+
+Id dictionaries are extended, derived time keys are computed for the batch
+rows only, the reflection text index tokenizes only new and replaced
+reflections, and table statistics are widened unless rows were replaced.
+The other per-dataset indexes are rebuilt in full whenever one of the
+tables they read changed: the survey pair index (surveys, participants), the
+workshop funnel cube (workshops), the reflection trend index (reflections,
+participants) and, with ``AIRE_KPI_APPROXIMATE``, the KPI sketch index. A
+table counts as changed when the batch holds its rows or adds ids to a
+column it carries, since that column is recoded.
+``persist_delta`` appends new rows to the dataset's CSV files, rewriting a
+file only when some of its rows were replaced. It refuses to run while a
+Parquet copy of a batch table (which the SQL backend reads instead of the
+CSV) or a partition layout exists, since those would keep serving the
+pre-delta rows; regenerate them after the delta instead.
+
+Usage: python -m src.delta <batch_dir>
+"""
+import argparse
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .derived import TableStats, add_derived_columns, combine_stats, table_stats
+from .encoding import decode_ids, extend_ids, lookup_positions
+from .ingestion import TABLES, Source, build_indexes, ingest_table
+from .integrity import PRIMARY_KEYS, validate_integrity
+from .partitions import MANIFEST_NAME
+from .text_index import reflection_index, store_reflection_index
+
+# Date format of the dataset's CSV files.
+CSV_DATE_FORMAT = "%Y-%m-%d"
+
+
+@dataclass(frozen=True)
+class DeltaResult:
+    tables: Dict[str, pd.DataFrame]
+    stats: Dict[str, TableStats]
+    batch: Dict[str, pd.DataFrame]
+    replaced: Dict[str, np.ndarray]
+
+    def counts(self) -> Dict[str, Tuple[int, int]]:
+        """(inserted, replaced) rows per batch table."""
+        return {name: (len(rows) - len(self.replaced[name]), len(self.replaced[name])) for name, rows in self.batch.items()}
+
+
+def batch_sources(batch_dir: Path) -> Dict[str, Path]:
+    """Tables with a CSV file in ``batch_dir``."""
+    batch_dir = Path(batch_dir)
+    return {name: batch_dir / spec.filename for name, spec in TABLES.items() if (batch_dir / spec.filename).exists()}
+
+
+def read_batch(sources: Mapping[str, Source]) -> Dict[str, pd.DataFrame]:
+    """Batch tables ingested (typed, validated) and deduplicated on their primary key, keeping the last row."""
+    unknown = set(sources) - set(TABLES)
+    if unknown:
+        raise ValueError(f"Unknown tables in batch: {', '.join(sorted(unknown))}")
+    batch = {}
+    for name, source in sources.items():
+        df = ingest_table(source, TABLES[name])
+        batch[name] = df.drop_duplicates(PRIMARY_KEYS[name], keep="last", ignore_index=True)
+    return batch
+
+
+def upsert(base: pd.DataFrame, rows: pd.DataFrame, key: str) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    ``base`` with ``rows`` replacing the rows of the same ``key`` in place and the others appended.
+
+    Also returns the positions of the replaced rows. ``rows`` must have unique keys.
+    """
+    positions = lookup_positions(base[key], rows[key])
+    replaced = positions >= 0
+    combined = pd.concat([base, rows[base.columns]], ignore_index=True)
+    if replaced.any():
+        order = np.concatenate([np.arange(len(base)), len(base) + np.flatnonzero(~replaced)])
+        order[positions[replaced]] = len(base) + np.flatnonzero(replaced)
+        combined = combined.take(order).reset_index(drop=True)
+    return combined, positions[replaced]
+
+
+def apply_delta(
+    tables: Mapping[str, pd.DataFrame], sources: Mapping[str, Source], stats: Optional[Mapping[str, TableStats]] = None
+) -> DeltaResult:
+    """Upsert a batch into finalized ``tables`` (see ``src/ingestion.py``); inputs are not modified."""
+    batch = read_batch(sources)
+    encoded, batch = extend_ids(tables, batch)
+    batch = add_derived_columns(batch)
+    updated, replaced = dict(encoded), {}
+    for name, rows in batch.items():
+        updated[name], replaced[name] = upsert(encoded[name], rows, PRIMARY_KEYS[name])
+    validate_integrity(batch, parents=updated)
+
+    # Only the text index is updated in place; build_indexes rebuilds the others over changed tables.
+    if "reflections" in batch:
+        previous = reflection_index(tables["reflections"])
+        texts = updated["reflections"]["reflection_text"]
+        store_reflection_index(updated["reflections"], previous.updated(texts, replaced["reflections"]))
+    build_indexes(updated)
+
+    new_stats = dict(table_stats(updated) if stats is None else stats)
+    for name, rows in batch.items():
+        if len(replaced[name]) or name not in new_stats:
+            new_stats.update(table_stats({name: updated[name]}))
+        else:
+            new_stats[name] = combine_stats(new_stats[name], table_stats({name: rows})[name])
+    return DeltaResult(updated, new_stats, batch, replaced)
+
+
+def _csv_rows(df: pd.DataFrame, columns) -> pd.DataFrame:
+    return decode_ids(df)[list(columns)]
+
+
+def stale_copies(data_dir: Path, names: Iterable[str], partition_root: Optional[Path] = None) -> List[Path]:
+    """Copies of the dataset a delta to tables ``names`` would leave stale: Parquet twins of their CSVs and a partition layout."""
+    from .config import PARTITION_DIR
+
+    copies = [Path(data_dir) / f"{Path(TABLES[name].filename).stem}.parquet" for name in names]
+    root = partition_root if partition_root is not None else (Path(PARTITION_DIR) if PARTITION_DIR else None)
+    if root is not None:
+        copies.append(Path(root) / MANIFEST_NAME)
+    return [path for path in copies if path.exists()]
+
+
+def _check_no_stale_copies(data_dir: Path, names: Iterable[str], partition_root: Optional[Path] = None) -> None:
+    stale = stale_copies(data_dir, names, partition_root)
+    if stale:
+        raise ValueError(
+            "A delta would leave these copies of the dataset serving old rows: "
+            f"{', '.join(str(path) for path in stale)}. Remove them, apply the delta, then regenerate them."
+        )
+
+
+def persist_delta(data_dir: Path, result: DeltaResult, partition_root: Optional[Path] = None) -> None:
+    """Write a delta to the dataset's CSV files: append new rows, or rewrite a file whose rows were replaced."""
+    _check_no_stale_copies(data_dir, result.batch, partition_root)
+    for name, rows in result.batch.items():
+        path = Path(data_dir) / TABLES[name].filename
+        columns = pd.read_csv(path, nrows=0).columns
+        if len(result.replaced[name]):
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            _csv_rows(result.tables[name], columns).to_csv(tmp_path, index=False, date_format=CSV_DATE_FORMAT)
+            os.replace(tmp_path, path)
+            continue
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+        with open(path, "a", encoding="utf-8", newline="") as f:
+            if needs_newline:
+                f.write("\n")
+            _csv_rows(rows, columns).to_csv(f, header=False, index=False, date_format=CSV_DATE_FORMAT)
+
+
+def ingest_delta(
+    sources: Mapping[str, Source], refresher=None, data_dir: Optional[Path] = None, partition_root: Optional[Path] = None
+) -> DeltaResult:
+    """Apply a batch to the live reference snapshot and append it to the dataset files, without a full reload."""
+    from .data_loader import DATA_DIR
+    from .refresh import get_refresher
+
+    refresher = get_refresher() if refresher is None else refresher
+    data_dir = DATA_DIR if data_dir is None else data_dir
+    # Fail before any work; persist_delta checks again under the refresh lock.
+    _check_no_stale_copies(data_dir, [name for name in sources if name in TABLES], partition_root)
+    result = None
+
+    def update(snapshot):
+        nonlocal result
+        result = apply_delta(snapshot.tables, sources, snapshot.stats)
+        persist_delta(data_dir, result, partition_root)
+        return result.tables, result.stats
+
+    refresher.apply(update)
+    return result
+
+
+def main() -> None:
+    from .data_loader import DATA_DIR, load_all_data
+    from .ingestion import finalize
+
+    parser = argparse.ArgumentParser(description="Upsert a batch of CSV files into the reference dataset.")
+    parser.add_argument("batch_dir", type=Path, help="directory with some of the dataset's CSV files")
+    args = parser.parse_args()
+    sources = batch_sources(args.batch_dir)
+    if not sources:
+        parser.error(f"no dataset CSV files in {args.batch_dir}")
+    result = apply_delta(finalize(load_all_data()), sources)
+    persist_delta(DATA_DIR, result)
+    for name, (inserted, replaced) in result.counts().items():
+        print(f"{TABLES[name].filename}: {inserted} inserted, {replaced} replaced")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Derived time keys and table statistics, computed once per loaded dataset.
+
+Every dated table gets its period keys next to the date they come from:
+month and academic term starts, fiscal year, ISO week start (Monday) and an
+integer day number (days since 1970-01-01). Keys derived from ``date`` use
+bare names (``month``, ``term``, ...); keys for other date columns are
+prefixed with the column's stem, e.g. ``last_attended_month``. KPI code reads
+them through ``period_column``, which falls back to computing the key for
+frames that were not prepared, such as partitions or test fixtures.
+
+``table_stats`` records row counts and date bounds per table, so the sidebar
+defaults and the header do not scan the data on every rerun.
+"""
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional
+
+import pandas as pd
+
+from .config import FISCAL_YEAR_START_MONTH
+from .time_keys import period_start
+
+# Date column of each table that gets derived keys.
+DATE_COLUMNS = {
+    "workshops": "date",
+    "participants": "last_attended_date",
+    "confidence_pre": "date",
+    "confidence_post": "date",
+    "reflections": "date",
+}
+DERIVED_KEYS = ("month", "term", "fiscal_year", "iso_week", "day_number")
+
+_UNIX_EPOCH = pd.Timestamp("1970-01-01")
+
+
+def derived_name(date_column: str, key: str) -> str:
+    if date_column == "date":
+        return key
+    return f"{date_column[: -len('_date')] if date_column.endswith('_date') else date_column}_{key}"
+
+
+def fiscal_year(dates: pd.Series, start_month: int = FISCAL_YEAR_START_MONTH) -> pd.Series:
+    """Fiscal year named by the calendar year it ends in (FY2025 starts July 2024 by default)."""
+    years = dates.dt.year + (dates.dt.month >= start_month).astype(int) if start_month > 1 else dates.dt.year
+    return years.astype("Int32")
+
+
+def iso_week_start(dates: pd.Series) -> pd.Series:
+    return (dates - pd.to_timedelta(dates.dt.weekday, unit="D")).dt.normalize()
+
+
+def day_number(dates: pd.Series) -> pd.Series:
+    return (dates.dt.normalize() - _UNIX_EPOCH).dt.days.astype("Int32")
+
+
+def _derive(dates: pd.Series, key: str) -> pd.Series:
+    if key in ("month", "term"):
+        return period_start(dates, key)
+    if key == "fiscal_year":
+        return fiscal_year(dates)
+    if key == "iso_week":
+        return iso_week_start(dates)
+    return day_number(dates)
+
+
+def add_derived_columns(tables: Mapping[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """Tables with their derived time keys added (existing columns are kept); inputs are not modified."""
+    prepared = dict(tables)
+    for name, date_column in DATE_COLUMNS.items():
+        df = prepared.get(name)
+        if df is None or date_column not in df.columns:
+            continue
+        columns = {derived_name(date_column, key): key for key in DERIVED_KEYS}
+        missing = {column: key for column, key in columns.items() if column not in df.columns}
+        if missing:
+            prepared[name] = df.assign(**{column: _derive(df[date_column], key) for column, key in missing.items()})
+    return prepared
+
+
+def period_column(df: pd.DataFrame, freq: str = "month", date_column: str = "date") -> pd.Series:
+    """Precomputed period key of ``date_column`` when the frame has it, else computed from the dates."""
+    column = derived_name(date_column, freq)
+    if column in df.columns:
+        return df[column]
+    return period_start(df[date_column], freq).rename(column)
+
+
+@dataclass(frozen=True)
+class TableStats:
+    rows: int
+    min_date: Optional[pd.Timestamp] = None
+    max_date: Optional[pd.Timestamp] = None
+
+
+def table_stats(tables: Mapping[str, pd.DataFrame]) -> Dict[str, TableStats]:
+    stats = {}
+    for name, df in tables.items():
+        date_column = DATE_COLUMNS.get(name)
+        if date_column is None or date_column not in df.columns or df[date_column].isna().all():
+            stats[name] = TableStats(len(df))
+        else:
+            stats[name] = TableStats(len(df), df[date_column].min(), df[date_column].max())
+    return stats
+
+
+def combine_stats(first: TableStats, second: TableStats) -> TableStats:
+    """Stats of two disjoint sets of rows of one table taken together."""
+    mins = [value for value in (first.min_date, second.min_date) if value is not None]
+    maxs = [value for value in (first.max_date, second.max_date) if value is not None]
+    return TableStats(first.rows + second.rows, min(mins) if mins else None, max(maxs) if maxs else None)
@@ -0,0 +1,112 @@
+"""
+Dictionary encoding of entity ids.
+
+Each id domain (departments, participants, workshops) gets one sorted list
+of categories shared by every table that references it. Its columns are
+stored as pandas categoricals over that list, so merges, ``isin`` and
+groupbys on ids work on small integer codes instead of strings. Because the
+categories are identical across tables, joins between them stay on the
+codes. Values still read, display and export as the original strings, so
+the decode table is only consulted when something is shown or written out.
+"""
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Join keys, each shared by every table that carries the column. Row ids such
+# as survey_id and reflection_id are unique per row and gain nothing from a dictionary.
+ID_COLUMNS = ("department_id", "participant_id", "workshop_id")
+
+
+def domain_categories(tables: Dict[str, pd.DataFrame], column: str) -> pd.Index:
+    """Sorted distinct values of ``column`` across all tables (missing values excluded)."""
+    values = [df[column].dropna().unique() for df in tables.values() if column in df.columns]
+    if not values:
+        return pd.Index([])
+    return pd.Index(pd.concat([pd.Series(v) for v in values], ignore_index=True).unique()).astype(str).sort_values()
+
+
+def encode_ids(tables: Dict[str, pd.DataFrame], columns: Iterable[str] = ID_COLUMNS) -> Dict[str, pd.DataFrame]:
+    """Tables with their id columns as categoricals over shared per-domain categories; inputs are not modified."""
+    encoded = dict(tables)
+    for column in columns:
+        dtype = pd.CategoricalDtype(domain_categories(tables, column))
+        for name, df in encoded.items():
+            if column in df.columns and df[column].dtype != dtype:
+                encoded[name] = df.assign(**{column: df[column].astype(dtype)})
+    return encoded
+
+
+def extend_ids(
+    tables: Mapping[str, pd.DataFrame], batches: Mapping[str, pd.DataFrame], columns: Iterable[str] = ID_COLUMNS
+) -> Tuple[Dict[str, pd.DataFrame], Dict[str, pd.DataFrame]]:
+    """
+    Encoded ``tables`` and new ``batches`` over dictionaries extended with the batches' new ids.
+
+    Existing columns are recoded to the extended (still sorted) categories on
+    their integer codes, without hashing their strings again; the batches are
+    encoded against the same categories. Columns of ``tables`` that are not
+    encoded are left as they are.
+    """
+    tables, batches = dict(tables), dict(batches)
+    for column in columns:
+        current = next(
+            (df[column].dtype for df in tables.values() if column in df.columns and isinstance(df[column].dtype, pd.CategoricalDtype)),
+            None,
+        )
+        if current is None:
+            continue
+        added = domain_categories(batches, column).difference(current.categories)
+        dtype = pd.CategoricalDtype(current.categories.union(added)) if len(added) else current
+        for name, df in tables.items():
+            if column in df.columns and df[column].dtype != dtype:
+                tables[name] = df.assign(**{column: df[column].cat.set_categories(dtype.categories)})
+        for name, df in batches.items():
+            if column in df.columns:
+                batches[name] = df.assign(**{column: df[column].astype(dtype)})
+    return tables, batches
+
+
+def decode_ids(df: pd.DataFrame) -> pd.DataFrame:
+    """Frame with categorical id columns turned back into their original (string) dtype."""
+    decoded = {
+        column: df[column].astype(df[column].cat.categories.dtype)
+        for column in ID_COLUMNS
+        if column in df.columns and isinstance(df[column].dtype, pd.CategoricalDtype)
+    }
+    return df.assign(**decoded) if decoded else df
+
+
+def lookup_positions(keys: pd.Series, values: pd.Series) -> np.ndarray:
+    """Position of each of ``values`` in ``keys`` (unique), or -1; matched on the codes when both share a dictionary."""
+    if isinstance(keys.dtype, pd.CategoricalDtype) and keys.dtype == values.dtype:
+        by_code = np.full(len(keys.dtype.categories) + 1, -1, dtype=np.intp)
+        # Missing values have code -1, which lands on the trailing -1 slot.
+        by_code[keys.cat.codes.to_numpy()] = np.arange(len(keys))
+        by_code[-1] = -1
+        return by_code[values.cat.codes.to_numpy()]
+    return pd.Index(keys).get_indexer(values)
+
+
+def label_codes(values: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """Integer codes of ``values`` (-1 for missing) and the labels they point to, in sorted order."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy().astype(np.int64), values.dtype.categories
+    codes, labels = pd.factorize(values, sort=True)
+    return codes.astype(np.int64), pd.Index(labels)
+
+
+def label_table(labels: pd.Index, selected: Optional[Iterable[str]]) -> Optional[np.ndarray]:
+    """
+    Boolean lookup over ``label_codes`` codes, True for the ``selected`` labels; None when nothing is selected.
+
+    Missing values (code -1) land on a trailing False slot, so they never match.
+    """
+    selected = list(selected or [])
+    if not selected:
+        return None
+    table = np.zeros(len(labels) + 1, dtype=bool)
+    positions = labels.get_indexer(selected)
+    table[positions[positions >= 0]] = True
+    return table
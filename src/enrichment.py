@@ -0,0 +1,157 @@
+"""
+Offline sentiment and theme labelling for reflections exports without them.
+
+Tokens are mapped to a fixed-size feature space with a hashing vectorizer
+(``pandas.util.hash_array``, so the mapping is stable across processes) and
+scored against lexicon weight vectors in whole batches with ``np.bincount``.
+No model download or network access is needed. Labels are cached by a hash
+of the reflection text, so rows whose text has been labelled before are
+never re-scored; the cache keeps at most ``LABEL_CACHE_SIZE`` texts.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import LABEL_CACHE_SIZE
+from .text_index import TOKEN_PATTERN
+
+N_FEATURES = 2 ** 16
+DEFAULT_THEME = "general feedback"
+
+SENTIMENT_LEXICON: Dict[str, float] = {
+    **{
+        word: 1.0
+        for word in (
+            "actionable clarified clear clearer doable effective effectively engaging excellent good great "
+            "helpful insightful love practical relevant useful valuable"
+        ).split()
+    },
+    **{
+        word: -1.0
+        for word in (
+            "confusing dense difficult fast frustrating lacking missing need needed not overwhelming "
+            "poor rushed slow too unclear"
+        ).split()
+    },
+}
+
+THEME_LEXICON: Dict[str, List[str]] = {
+    "classroom use": "class classroom course courses discipline lecture slides student students syllabus teaching".split(),
+    "assessment": "assessment assignment exam exams feedback grading integrity quiz rubric rubrics".split(),
+    "ethical concerns": "bias ethical ethics guardrails licenses policies policy privacy responsible risk".split(),
+    "research workflows": "analysis coding data literature research researchers workflow workflows writing".split(),
+    "administrative processes": "admin administrative email process processes reports scheduling staff team".split(),
+}
+
+
+def _feature_ids(tokens: np.ndarray) -> np.ndarray:
+    hashed = pd.util.hash_array(tokens.astype(object), categorize=True)
+    return (hashed % np.uint64(N_FEATURES)).astype(np.int64)
+
+
+def _weight_vectors() -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    sentiment = np.zeros(N_FEATURES)
+    sentiment[_feature_ids(np.array(list(SENTIMENT_LEXICON)))] = list(SENTIMENT_LEXICON.values())
+    themes = list(THEME_LEXICON)
+    theme_weights = np.zeros((N_FEATURES, len(themes)))
+    for column, words in enumerate(THEME_LEXICON.values()):
+        theme_weights[_feature_ids(np.array(words)), column] = 1.0
+    return sentiment, theme_weights, themes
+
+
+_SENTIMENT_WEIGHTS, _THEME_WEIGHTS, _THEMES = _weight_vectors()
+
+
+def classify_texts(texts: pd.Series) -> pd.DataFrame:
+    """Score a batch of texts; returns ``sentiment`` and ``theme`` aligned to ``texts``."""
+    n_rows = len(texts)
+    tokens = pd.Series(texts.fillna("").astype(str).str.lower().str.findall(TOKEN_PATTERN).to_numpy()).explode().dropna()
+    rows = tokens.index.to_numpy(dtype=np.int64)
+    features = _feature_ids(tokens.to_numpy()) if len(tokens) else np.empty(0, dtype=np.int64)
+
+    sentiment_score = np.bincount(rows, weights=_SENTIMENT_WEIGHTS[features], minlength=n_rows)
+    sentiment = np.where(sentiment_score >= 1, "positive", np.where(sentiment_score <= -1, "negative", "neutral"))
+
+    theme_scores = np.column_stack(
+        [np.bincount(rows, weights=_THEME_WEIGHTS[features, column], minlength=n_rows) for column in range(len(_THEMES))]
+    )
+    theme = np.where(theme_scores.max(axis=1) > 0, np.array(_THEMES, dtype=object)[theme_scores.argmax(axis=1)], DEFAULT_THEME)
+    return pd.DataFrame({"sentiment": sentiment.astype(object), "theme": theme.astype(object)}, index=texts.index)
+
+
+class LabelCache:
+    """Sentiment/theme labels keyed by a 64-bit hash of the reflection text, oldest evicted first past ``max_entries``."""
+
+    def __init__(self, max_entries: int = LABEL_CACHE_SIZE):
+        self.max_entries = max_entries
+        # Lookups and stores cost only the batch's rows, however large the cache has grown.
+        self._labels: "OrderedDict[int, Tuple[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def get(self, hashes: np.ndarray) -> pd.DataFrame:
+        with self._lock:
+            found = [self._labels.get(key, (None, None)) for key in hashes.tolist()]
+        labels = np.array(found, dtype=object).reshape(len(found), 2)
+        return pd.DataFrame({"sentiment": labels[:, 0], "theme": labels[:, 1]})
+
+    def lookup(self, hashes: np.ndarray) -> pd.DataFrame:
+        found = self.get(hashes)
+        hit_count = int(found["sentiment"].notna().sum())
+        with self._lock:
+            self.hits += hit_count
+            self.misses += len(hashes) - hit_count
+        return found
+
+    def store(self, hashes: np.ndarray, labels: pd.DataFrame) -> None:
+        with self._lock:
+            for key, sentiment, theme in zip(hashes.tolist(), labels["sentiment"].tolist(), labels["theme"].tolist()):
+                self._labels[key] = (sentiment, theme)
+            while len(self._labels) > self.max_entries:
+                self._labels.popitem(last=False)
+
+
+LABEL_CACHE = LabelCache()
+
+
+def needs_enrichment(reflections_df: pd.DataFrame) -> bool:
+    return any(col not in reflections_df.columns or reflections_df[col].isna().any() for col in ("sentiment", "theme"))
+
+
+def enrich_reflections(
+    reflections_df: pd.DataFrame, batch_size: int = 50_000, cache: Optional[LabelCache] = None
+) -> pd.DataFrame:
+    """Fill missing ``sentiment``/``theme`` values; labelled rows are left untouched."""
+    cache = LABEL_CACHE if cache is None else cache
+    df = reflections_df.copy()
+    for col in ("sentiment", "theme"):
+        if col not in df.columns:
+            df[col] = pd.Series(np.nan, index=df.index, dtype=object)
+        else:
+            df[col] = df[col].astype(object)
+    missing = np.flatnonzero((df["sentiment"].isna() | df["theme"].isna()).to_numpy())
+
+    for start in range(0, len(missing), batch_size):
+        batch_rows = missing[start : start + batch_size]
+        texts = df["reflection_text"].iloc[batch_rows].fillna("").astype(str)
+        hashes = pd.util.hash_pandas_object(texts, index=False).to_numpy()
+        labels = cache.lookup(hashes)
+        unseen = labels["sentiment"].isna().to_numpy()
+        if unseen.any():
+            unseen_rows = np.flatnonzero(unseen)
+            unique_hashes, first, inverse = np.unique(hashes[unseen], return_index=True, return_inverse=True)
+            scored = classify_texts(texts.iloc[unseen_rows[first]].reset_index(drop=True))
+            cache.store(unique_hashes, scored)
+            # Fill from the scored batch itself: the cache may already have evicted some of it.
+            labels.iloc[unseen_rows] = scored.to_numpy()[inverse]
+        for col in ("sentiment", "theme"):
+            current = df[col].iloc[batch_rows]
+            df.iloc[batch_rows, df.columns.get_loc(col)] = current.where(current.notna(), labels[col].to_numpy())
+    return df
@@ -1,5 +1,10 @@
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
 import pandas as pd
 
+from .encoding import lookup_positions
+
 
 def filter_by_date_range(df: pd.DataFrame, date_column: str, start_date, end_date) -> pd.DataFrame:
     if start_date is None or end_date is None or date_column not in df.columns:
@@ -18,3 +23,92 @@ def filter_by_roles(df: pd.DataFrame, roles_column: str, selected_roles) -> pd.D
     if roles_column not in df.columns or not selected_roles:
         return df.copy()
     return df[df[roles_column].isin(selected_roles)].copy()
+
+
+class FilterContext:
+    """
+    A filter selection resolved once into a boolean row mask per table.
+
+    Masks are computed on first use and shared by every KPI, so each table is
+    scanned once per selection. ``rows`` returns the selected rows, or the
+    table itself when nothing is filtered out; KPI inputs are read-only.
+    """
+
+    def __init__(
+        self,
+        data: Dict[str, pd.DataFrame],
+        department_ids: Optional[Iterable[str]] = None,
+        roles: Optional[Iterable[str]] = None,
+        start_date=None,
+        end_date=None,
+    ):
+        self.data = data
+        self.department_ids = list(department_ids or [])
+        self.roles = list(roles or [])
+        self.start_date = start_date
+        self.end_date = end_date
+        self._masks: Dict[str, Optional[np.ndarray]] = {}
+        self._rows: Dict[str, pd.DataFrame] = {}
+        # Selection name -> (table, filters applied, in order).
+        self._selections: Dict[str, Tuple[str, Tuple[Callable[[pd.DataFrame], Optional[np.ndarray]], ...]]] = {
+            "departments": ("departments", (self._department_mask,)),
+            "participants": ("participants", (self._department_mask, self._role_mask)),
+            "workshops": ("workshops", (self._date_mask, self._department_mask)),
+            "reflections": ("reflections", (self._date_mask,)),
+            "reflections_by_participant": ("reflections", (self._date_mask, self._participant_mask)),
+        }
+
+    def _date_mask(self, df: pd.DataFrame) -> Optional[np.ndarray]:
+        if self.start_date is None or self.end_date is None or "date" not in df.columns:
+            return None
+        dates = df["date"]
+        return ((dates >= pd.to_datetime(self.start_date)) & (dates <= pd.to_datetime(self.end_date))).to_numpy()
+
+    def _department_mask(self, df: pd.DataFrame) -> Optional[np.ndarray]:
+        if not self.department_ids:
+            return None
+        return df["department_id"].isin(self.department_ids).to_numpy()
+
+    def _role_mask(self, df: pd.DataFrame) -> Optional[np.ndarray]:
+        if not self.roles or "role" not in df.columns:
+            return None
+        return df["role"].isin(self.roles).to_numpy()
+
+    def _participant_mask(self, df: pd.DataFrame) -> Optional[np.ndarray]:
+        """Rows whose participant is in the selected departments/roles, looked up through the participants mask."""
+        if not self.department_ids and not self.roles:
+            return None
+        if "department_id" in df.columns and "role" in df.columns:
+            return _combine(self._department_mask(df), self._role_mask(df))
+        participants = self.data["participants"]
+        selected = self.mask("participants")
+        codes = lookup_positions(participants["participant_id"], df["participant_id"])
+        if selected is None:
+            return codes >= 0
+        return (codes >= 0) & selected[np.maximum(codes, 0)]
+
+    def mask(self, name: str) -> Optional[np.ndarray]:
+        """Boolean row mask of a named selection, or None when it keeps every row."""
+        if name not in self._masks:
+            table, filters = self._selections[name]
+            df = self.data[table]
+            result = None
+            for row_filter in filters:
+                result = _combine(result, row_filter(df))
+            self._masks[name] = result
+        return self._masks[name]
+
+    def rows(self, name: str) -> pd.DataFrame:
+        if name not in self._rows:
+            df = self.data[self._selections[name][0]]
+            selected = self.mask(name)
+            self._rows[name] = df if selected is None or selected.all() else df.loc[selected]
+        return self._rows[name]
+
+
+def _combine(left: Optional[np.ndarray], right: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    return left & right
@@ -0,0 +1,50 @@
+"""
+Objects built from long-lived frames, cached by the identity of those frames.
+
+Indexes, funnels, sketches and figures are built once per loaded dataset (or
+cached KPI bundle) and looked up by the ``id`` of the frames they came from.
+An entry is dropped as soon as any of its frames is garbage collected, so a
+reused id never returns a stale entry. Builds run outside the lock; when two
+threads race, the first stored object wins and both get it.
+"""
+import threading
+import weakref
+from typing import Callable, Dict, Hashable, Optional, Sequence, Tuple, TypeVar
+
+import pandas as pd
+
+T = TypeVar("T")
+
+
+class FrameCache:
+    def __init__(self):
+        self._entries: Dict[Tuple[Hashable, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(frames: Sequence[pd.DataFrame], extra: Tuple[Hashable, ...]) -> Tuple[Hashable, ...]:
+        return tuple(id(df) for df in frames) + extra
+
+    def get(self, frames: Sequence[pd.DataFrame], *extra: Hashable) -> Optional[object]:
+        with self._lock:
+            return self._entries.get(self._key(frames, extra))
+
+    def store(self, frames: Sequence[pd.DataFrame], value: T, *extra: Hashable) -> T:
+        """Cache ``value`` for ``frames`` unless an entry exists already; returns the cached entry."""
+        key = self._key(frames, extra)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = value
+                for df in frames:
+                    weakref.finalize(df, self._entries.pop, key, None)
+            return self._entries[key]
+
+    def get_or_build(self, frames: Sequence[pd.DataFrame], build: Callable[[], T], *extra: Hashable) -> T:
+        """The entry for ``frames`` (and ``extra`` key parts), calling ``build`` only on a miss."""
+        value = self.get(frames, *extra)
+        if value is None:
+            value = self.store(frames, build(), *extra)
+        return value
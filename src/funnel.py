@@ -0,0 +1,112 @@
+"""
+Registration -> attendance -> completion funnel of workshops.
+
+One grouped aggregation per dataset sums registrations, attendances and
+completions (attendances x completion rate) by department, format, audience
+and workshop date. A sidebar selection is a mask over the cells of that
+cube, which stops growing with the number of workshops once every
+combination is present. The overall funnel and its breakdowns by department,
+format, audience and month are small groupbys of the selected cells.
+Completion is weighted by attendance, so a large workshop counts for more
+than a small one.
+"""
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from .derived import period_column
+from .frame_cache import FrameCache
+
+STAGES = ("registrations", "attendances", "completions")
+BREAKDOWNS = {
+    "by_department": "department_id",
+    "by_format": "format",
+    "by_audience": "audience",
+    "by_month": "month",
+}
+# Workshop columns the funnel is built from.
+REQUIRED_COLUMNS = ("department_id", "format", "audience", "date", "registrations", "attendances", "completion_rate")
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """``numerator / denominator`` rounded to three places, 0 where the denominator is 0."""
+    numerator, denominator = np.asarray(numerator, dtype=float), np.asarray(denominator, dtype=float)
+    ratio = np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+    return ratio.round(3)
+
+
+def with_rates(totals: pd.DataFrame) -> pd.DataFrame:
+    """Stage totals with the share of registrations attending, of attendances completing, and of registrations completing."""
+    registrations, attendances, completions = (totals[stage].to_numpy() for stage in STAGES)
+    return totals.assign(
+        attendance_rate=_ratio(attendances, registrations),
+        completion_rate=_ratio(completions, attendances),
+        conversion_rate=_ratio(completions, registrations),
+    )
+
+
+def funnel_stages(totals: pd.Series) -> pd.DataFrame:
+    """One row per stage, with its rate from the previous stage and from registration."""
+    counts = totals[list(STAGES)].to_numpy(dtype=float)
+    previous = np.concatenate([counts[:1], counts[:-1]])
+    return pd.DataFrame(
+        {
+            "stage": list(STAGES),
+            "count": counts.round(1),
+            "step_rate": _ratio(counts, previous),
+            "overall_rate": _ratio(counts, np.full_like(counts, counts[0])),
+        }
+    )
+
+
+class WorkshopFunnel:
+    def __init__(self, workshops_df: pd.DataFrame):
+        df = workshops_df.assign(
+            completions=workshops_df["attendances"] * workshops_df["completion_rate"],
+            month=period_column(workshops_df, "month"),
+        )
+        keys = ["department_id", "format", "audience", "date", "month"]
+        self.cube = df.groupby(keys, observed=True)[list(STAGES)].sum().reset_index()
+
+    def select(
+        self,
+        department_ids: Optional[Iterable[str]] = None,
+        audiences: Optional[Iterable[str]] = None,
+        start_date=None,
+        end_date=None,
+    ) -> pd.DataFrame:
+        """Cube cells within the selection, filtered like ``compute_workshop_engagement`` filters workshops."""
+        cube = self.cube
+        mask = np.ones(len(cube), dtype=bool)
+        if start_date is not None and end_date is not None:
+            dates = cube["date"]
+            mask &= ((dates >= pd.to_datetime(start_date)) & (dates <= pd.to_datetime(end_date))).to_numpy()
+        if department_ids:
+            mask &= cube["department_id"].isin(list(department_ids)).to_numpy()
+        if audiences:
+            mask &= cube["audience"].isin(list(audiences)).to_numpy()
+        return cube if mask.all() else cube.loc[mask]
+
+    def compute(
+        self,
+        department_ids: Optional[Iterable[str]] = None,
+        audiences: Optional[Iterable[str]] = None,
+        start_date=None,
+        end_date=None,
+    ) -> Dict[str, pd.DataFrame]:
+        """The overall funnel (``stages``) and per-dimension stage totals with conversion rates."""
+        cells = self.select(department_ids, audiences, start_date, end_date)
+        result = {"stages": funnel_stages(cells[list(STAGES)].sum())}
+        for name, column in BREAKDOWNS.items():
+            totals = cells.groupby(column, observed=True)[list(STAGES)].sum().reset_index()
+            result[name] = with_rates(totals)
+        return result
+
+
+# Funnels built per loaded dataset, dropped with its workshops frame.
+_FUNNELS = FrameCache()
+
+
+def workshop_funnel(workshops_df: pd.DataFrame) -> WorkshopFunnel:
+    return _FUNNELS.get_or_build((workshops_df,), lambda: WorkshopFunnel(workshops_df))
@@ -0,0 +1,175 @@
+"""
+Ingestion pipeline shared by the reference dataset and session uploads.
+
+Each table is read with the dtype plan of its JSON schema (string columns
+stay strings even when they look numeric), prepared, validated row by row,
+and then typed: date columns parsed, integer and number columns cast to
+int64 and float64. ``ingest`` runs that for every table, checks referential
+integrity and dictionary-encodes the ids. ``finalize`` adds the derived time
+keys and builds the per-dataset indexes (survey pairs, workshop funnel,
+reflection text and trends, and the KPI sketches in approximate mode) that
+KPI and search code look up by frame identity.
+
+The reference loader runs ``ingest`` (behind the Arrow store when one is
+configured) and the reference snapshot runs ``finalize``; uploads run both,
+so either source reaches the dashboard in the same typed, encoded and
+indexed form.
+"""
+import io
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Mapping, Optional, Tuple, Union
+
+import pandas as pd
+
+from .config import ENRICH_REFLECTIONS, KPI_APPROXIMATE
+from .derived import add_derived_columns
+from .encoding import encode_ids
+from .enrichment import enrich_reflections, needs_enrichment
+from .funnel import REQUIRED_COLUMNS, workshop_funnel
+from .integrity import validate_integrity
+from .reflection_trends import reflection_trend_index
+from .sketches import kpi_sketch_index
+from .survey_pairing import survey_pair_index
+from .text_index import reflection_index
+
+SCHEMA_DIR = Path(__file__).resolve().parent.parent / "schemas"
+
+# A CSV file path, or the raw bytes of an uploaded file.
+Source = Union[str, Path, bytes]
+
+
+def prepare_reflections(df: pd.DataFrame) -> pd.DataFrame:
+    """Label reflections missing sentiment/theme before schema validation, when enabled."""
+    if ENRICH_REFLECTIONS and needs_enrichment(df):
+        return enrich_reflections(df)
+    return df
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    filename: str
+    schema_name: str
+    prepare: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None
+
+
+TABLES: Dict[str, TableSpec] = {
+    "workshops": TableSpec("workshops.csv", "workshops_schema.json"),
+    "participants": TableSpec("participants.csv", "participants_schema.json"),
+    "confidence_pre": TableSpec("confidence_surveys_pre.csv", "confidence_surveys_schema.json"),
+    "confidence_post": TableSpec("confidence_surveys_post.csv", "confidence_surveys_schema.json"),
+    "reflections": TableSpec("reflections.csv", "reflections_schema.json", prepare_reflections),
+    "departments": TableSpec("departments.csv", "departments_schema.json"),
+}
+
+
+@lru_cache(maxsize=32)
+def _compiled_schema(schema_path: Path, mtime_ns: int):
+    # jsonschema is only needed once a file is validated; keep it off the startup path.
+    from jsonschema import Draft7Validator
+
+    with open(schema_path, "r", encoding="utf-8") as f:
+        schema = json.load(f)
+    return Draft7Validator(schema)
+
+
+def _read_schema(schema_name: str):
+    """Validator for a schema file, reused until the file changes."""
+    schema_path = SCHEMA_DIR / schema_name
+    return _compiled_schema(schema_path, schema_path.stat().st_mtime_ns)
+
+
+@dataclass(frozen=True)
+class DtypePlan:
+    read: Dict[str, type]
+    dates: Tuple[str, ...]
+    casts: Dict[str, str]
+
+
+def dtype_plan(schema_name: str) -> DtypePlan:
+    """Read dtypes, date columns and post-validation casts for the columns of a schema."""
+    properties = _read_schema(schema_name).schema.get("properties", {})
+    read, dates, casts = {}, [], {}
+    for column, spec in properties.items():
+        kind = spec.get("type")
+        if kind == "string":
+            read[column] = str
+            if spec.get("format") == "date":
+                dates.append(column)
+        elif kind == "integer":
+            casts[column] = "int64"
+        elif kind == "number":
+            casts[column] = "float64"
+    return DtypePlan(read, tuple(dates), casts)
+
+
+def validate_dataframe(df: pd.DataFrame, schema_name: str, label: Optional[str] = None) -> None:
+    """
+    Validate an in-memory DataFrame against a JSON schema.
+    Raises ValueError with details if validation fails.
+    """
+    validator = _read_schema(schema_name)
+    records = df.to_dict(orient="records")
+    for idx, record in enumerate(records):
+        errors = sorted(validator.iter_errors(record), key=lambda e: e.path)
+        if errors:
+            messages = "; ".join([f"{'.'.join(map(str, e.path))}: {e.message}" for e in errors])
+            raise ValueError(f"Validation failed for {label or schema_name} at row {idx}: {messages}")
+
+
+def read_table(source: Source, plan: DtypePlan) -> pd.DataFrame:
+    return pd.read_csv(io.BytesIO(source) if isinstance(source, bytes) else source, dtype=plan.read)
+
+
+def apply_plan(df: pd.DataFrame, plan: DtypePlan) -> pd.DataFrame:
+    typed = {column: pd.to_datetime(df[column]) for column in plan.dates if column in df.columns}
+    typed.update(
+        {column: df[column].astype(dtype) for column, dtype in plan.casts.items() if column in df.columns and df[column].dtype != dtype}
+    )
+    return df.assign(**typed) if typed else df
+
+
+def ingest_table(source: Source, spec: TableSpec) -> pd.DataFrame:
+    """One table read, prepared, validated and typed."""
+    plan = dtype_plan(spec.schema_name)
+    df = read_table(source, plan)
+    if spec.prepare is not None:
+        df = spec.prepare(df)
+    validate_dataframe(df, spec.schema_name, spec.filename)
+    return apply_plan(df, plan)
+
+
+def ingest(sources: Mapping[str, Source]) -> Dict[str, pd.DataFrame]:
+    """Every table of the dataset ingested, integrity-checked and id-encoded."""
+    tables = {}
+    for name, spec in TABLES.items():
+        if name not in sources:
+            raise ValueError(f"{spec.filename} is required.")
+        tables[name] = ingest_table(sources[name], spec)
+    validate_integrity(tables)
+    return encode_ids(tables)
+
+
+def build_indexes(tables: Mapping[str, pd.DataFrame]) -> None:
+    """Build the per-dataset indexes now, so the first dashboard run finds them cached."""
+    if {"confidence_pre", "confidence_post", "participants"} <= tables.keys():
+        survey_pair_index(tables["confidence_pre"], tables["confidence_post"], tables["participants"])
+    if "workshops" in tables and set(REQUIRED_COLUMNS) <= set(tables["workshops"].columns):
+        workshop_funnel(tables["workshops"])
+    if "reflections" in tables:
+        reflection_index(tables["reflections"])
+        if "participants" in tables:
+            reflection_trend_index(tables["reflections"], tables["participants"])
+    if KPI_APPROXIMATE and {"workshops", "participants", "confidence_pre", "confidence_post", "reflections"} <= tables.keys():
+        kpi_sketch_index(
+            tables["workshops"], tables["participants"], tables["confidence_pre"], tables["confidence_post"], tables["reflections"]
+        )
+
+
+def finalize(tables: Mapping[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """Tables with derived time keys added and their indexes built; inputs are not modified."""
+    prepared = add_derived_columns(tables)
+    build_indexes(prepared)
+    return prepared
@@ -0,0 +1,118 @@
+"""
+Cross-table referential integrity checks.
+
+Each parent key column is turned into a hash index once; every referencing
+column is then coded against it with ``Index.get_indexer``, and rows coded
+``-1`` are orphans. Duplicate primary keys are found with ``duplicated``. All
+checks are single vectorized passes, linear in the number of rows, so they
+run on every load.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+PRIMARY_KEYS: Dict[str, str] = {
+    "departments": "department_id",
+    "participants": "participant_id",
+    "workshops": "workshop_id",
+    "confidence_pre": "survey_id",
+    "confidence_post": "survey_id",
+    "reflections": "reflection_id",
+}
+
+# (table, column) -> referenced table; the referenced column is that table's primary key.
+FOREIGN_KEYS: List[Tuple[str, str, str]] = [
+    ("participants", "department_id", "departments"),
+    ("workshops", "department_id", "departments"),
+    ("confidence_pre", "participant_id", "participants"),
+    ("confidence_pre", "workshop_id", "workshops"),
+    ("confidence_post", "participant_id", "participants"),
+    ("confidence_post", "workshop_id", "workshops"),
+    ("reflections", "participant_id", "participants"),
+    ("reflections", "workshop_id", "workshops"),
+]
+
+
+@dataclass(frozen=True)
+class IntegrityIssue:
+    kind: str
+    table: str
+    column: str
+    count: int
+    references: str = ""
+    sample: pd.DataFrame = field(default_factory=pd.DataFrame, compare=False)
+
+    def describe(self) -> str:
+        values = ", ".join(map(str, self.sample[self.column].drop_duplicates().head(5))) if not self.sample.empty else ""
+        if self.kind == "orphan":
+            return f"{self.table}.{self.column}: {self.count} rows reference unknown {self.references} ({values})"
+        return f"{self.table}.{self.column}: {self.count} rows share a duplicate key ({values})"
+
+
+class IntegrityError(ValueError):
+    """Validation failure carrying the individual issues, with their sample rows."""
+
+    def __init__(self, issues: List["IntegrityIssue"]):
+        super().__init__("Referential integrity failed: " + "; ".join(issue.describe() for issue in issues))
+        self.issues = issues
+
+
+def _key_index(df: pd.DataFrame, column: str) -> pd.Index:
+    return pd.Index(df[column].dropna().unique())
+
+
+def check_integrity(
+    tables: Mapping[str, pd.DataFrame], sample_size: int = 5, parents: Optional[Mapping[str, pd.DataFrame]] = None
+) -> List[IntegrityIssue]:
+    """
+    Orphaned foreign keys and duplicate primary keys among the tables present.
+
+    References are resolved against ``parents`` when given (e.g. the whole
+    dataset, when ``tables`` only holds newly appended rows).
+    """
+    parents = tables if parents is None else parents
+    issues: List[IntegrityIssue] = []
+    for table, key in PRIMARY_KEYS.items():
+        df = tables.get(table)
+        if df is None or key not in df.columns:
+            continue
+        duplicated = df[key].duplicated(keep=False).to_numpy() & df[key].notna().to_numpy()
+        if duplicated.any():
+            sample = df.loc[duplicated].head(sample_size)
+            issues.append(IntegrityIssue("duplicate_key", table, key, int(np.count_nonzero(duplicated)), sample=sample))
+
+    parent_index: Dict[str, pd.Index] = {}
+    for table, column, parent in FOREIGN_KEYS:
+        child, parent_df = tables.get(table), parents.get(parent)
+        parent_key = PRIMARY_KEYS[parent]
+        if child is None or parent_df is None or column not in child.columns or parent_key not in parent_df.columns:
+            continue
+        if parent not in parent_index:
+            parent_index[parent] = _key_index(parent_df, parent_key)
+        codes = parent_index[parent].get_indexer(child[column])
+        orphans = (codes < 0) & child[column].notna().to_numpy()
+        count = int(np.count_nonzero(orphans))
+        if count:
+            issues.append(
+                IntegrityIssue("orphan", table, column, count, f"{parent}.{parent_key}", child.loc[orphans].head(sample_size))
+            )
+    return issues
+
+
+def integrity_report(issues: List[IntegrityIssue]) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {"kind": issue.kind, "table": issue.table, "column": issue.column, "references": issue.references, "rows": issue.count}
+            for issue in issues
+        ],
+        columns=["kind", "table", "column", "references", "rows"],
+    )
+
+
+def validate_integrity(tables: Mapping[str, pd.DataFrame], parents: Optional[Mapping[str, pd.DataFrame]] = None) -> None:
+    """Raise IntegrityError (a ValueError) listing every integrity issue, if there are any."""
+    issues = check_integrity(tables, parents=parents)
+    if issues:
+        raise IntegrityError(issues)
@@ -0,0 +1,338 @@
+"""
+Shared worker pool for KPI bundles, off the Streamlit script thread.
+
+Sessions ask for a bundle with ``session_job`` and poll the returned job, so
+the script keeps answering reruns while it waits. Jobs are keyed like the
+bundle cache (dataset fingerprint, engine, selection), and this pool is the
+one registry of bundles in flight: a session or warm-up (``src/warmup.py``)
+asking for a job already running joins it instead of computing again, and a
+finished job stores its bundle in the shared cache. Jobs on threads also go
+through the cache's own single flight, so they join bundles computed inline.
+
+Bundles of the reference dataset are computed in worker processes. Each
+worker loads the dataset itself (memory-mapped when the Arrow store is
+configured) and keeps it while the fingerprint holds, so a job ships only the
+selection and the bundle. Session uploads, partitioned loads and the SQL
+engine hold state a worker cannot rebuild, so their jobs run on threads.
+
+Jobs submitted as ``background`` (the startup warm-up) yield to sessions:
+``wait_until_idle`` blocks until no session job is in flight, no script run
+is inside ``session_running`` and neither has been for a short quiet period.
+A session that joins a background job makes it a session job.
+
+Every job has a deadline. A session that reruns for another selection
+releases the job it was waiting on, and a job nobody waits on is cancelled if
+it has not started. A running job cannot be interrupted: waiters stop at the
+deadline, and a late bundle still goes to the cache.
+"""
+import functools
+import multiprocessing
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Hashable, Iterator, MutableMapping, Optional
+
+import pandas as pd
+
+from .config import KPI_JOB_EXECUTOR, KPI_JOB_TIMEOUT_SECONDS, KPI_JOB_WORKERS
+from .kpi_bundle import BUNDLE_CACHE, BundleCache, FilterSelection, bundle_key, compute_kpi_bundle
+from .refresh import DatasetRefresher
+
+
+class JobTimeoutError(TimeoutError):
+    """A KPI job did not finish before its deadline."""
+
+
+class StaleDatasetError(RuntimeError):
+    """A worker's reference dataset no longer matches the fingerprint a job was submitted for."""
+
+
+class KpiJob:
+    def __init__(self, key: Hashable, future: Future, timeout_seconds: float, background: bool = False):
+        self.key = key
+        self.future = future
+        self.submitted_at = time.monotonic()
+        self.deadline = self.submitted_at + timeout_seconds
+        self.waiters = 1
+        self.background = background
+
+    @classmethod
+    def completed(cls, key: Hashable, result: Any) -> "KpiJob":
+        future: Future = Future()
+        future.set_result(result)
+        return cls(key, future, 0.0)
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return time.monotonic() - self.submitted_at
+
+    @property
+    def expired(self) -> bool:
+        return not self.future.done() and time.monotonic() >= self.deadline
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def wait(self, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds, never past the deadline; True once the job is done."""
+        wait([self.future], timeout=max(0.0, min(timeout, self.deadline - time.monotonic())))
+        return self.future.done()
+
+    def result(self) -> Any:
+        """The job's result, waiting until the deadline; re-raises the job's exception."""
+        if not self.wait(self.deadline - time.monotonic()):
+            raise JobTimeoutError(f"KPI job still running after {self.elapsed_seconds:.0f}s")
+        return self.future.result()
+
+
+class KpiJobPool:
+    def __init__(
+        self,
+        max_workers: int = KPI_JOB_WORKERS,
+        executor: str = KPI_JOB_EXECUTOR,
+        timeout_seconds: float = KPI_JOB_TIMEOUT_SECONDS,
+        cache: Optional[BundleCache] = None,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.executor = executor
+        self.timeout_seconds = timeout_seconds
+        self.cache = BUNDLE_CACHE if cache is None else cache
+        # Re-entrant: cancelling a future runs its done callbacks, which take the lock again.
+        self._lock = threading.RLock()
+        self._idle = threading.Condition(self._lock)
+        self._inflight: Dict[Hashable, KpiJob] = {}
+        self._foreground = 0
+        self._sessions = 0
+        self._last_activity = float("-inf")
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self.submitted = 0
+        self.deduplicated = 0
+        self.cancelled = 0
+
+    def submit(
+        self,
+        key: Hashable,
+        fn: Callable[..., Any],
+        *args: Any,
+        in_process: bool = False,
+        on_result: Optional[Callable[[Any], None]] = None,
+        background: bool = False,
+    ) -> KpiJob:
+        """A job running ``fn(*args)``, or the in-flight job with the same ``key`` (``on_result`` runs once per job)."""
+        with self._lock:
+            if not background:
+                self.touch()
+            job = self._inflight.get(key)
+            if job is not None:
+                job.waiters += 1
+                self.deduplicated += 1
+                if job.background and not background:
+                    job.background = False
+                    self._foreground += 1
+                return job
+            job = KpiJob(key, self._submit(fn, args, in_process), self.timeout_seconds, background)
+            self._inflight[key] = job
+            self._foreground += not background
+            self.submitted += 1
+        job.future.add_done_callback(lambda future: self._finished(job, on_result))
+        return job
+
+    def release(self, job: KpiJob) -> bool:
+        """Drop one waiter from ``job``; returns True if that left it unwanted and it was cancelled before starting."""
+        with self._lock:
+            job.waiters = max(0, job.waiters - 1)
+            if job.waiters or job.done() or not job.future.cancel():
+                return False
+            self.cancelled += 1
+            return True
+
+    def inflight(self) -> int:
+        with self._lock:
+            return len(self._inflight)
+
+    def touch(self) -> None:
+        """Record session activity, which background work waits out."""
+        with self._lock:
+            self._last_activity = time.monotonic()
+
+    @contextmanager
+    def session_running(self) -> Iterator[None]:
+        """Mark a session's script run as active; background jobs are not submitted meanwhile."""
+        with self._lock:
+            self._sessions += 1
+            self.touch()
+        try:
+            yield
+        finally:
+            with self._idle:
+                self._sessions -= 1
+                self.touch()
+                self._idle.notify_all()
+
+    def wait_until_idle(self, quiet_seconds: float, timeout: Optional[float] = None) -> bool:
+        """Block until sessions and their jobs have been idle for ``quiet_seconds``; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while True:
+                now = time.monotonic()
+                if self._foreground or self._sessions:
+                    remaining = None
+                else:
+                    remaining = self._last_activity + quiet_seconds - now
+                    if remaining <= 0:
+                        return True
+                if deadline is not None:
+                    if now >= deadline:
+                        return False
+                    remaining = deadline - now if remaining is None else min(remaining, deadline - now)
+                self._idle.wait(remaining)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executors, self._threads, self._processes = (self._threads, self._processes), None, None
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _submit(self, fn: Callable[..., Any], args: tuple, in_process: bool) -> Future:
+        if not in_process or self.executor != "process":
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(self.max_workers, thread_name_prefix="aire-kpi-job")
+            return self._threads.submit(fn, *args)
+        for attempt in range(2):
+            if self._processes is None:
+                # Spawned, not forked: the Streamlit server process runs threads a fork would copy mid-flight.
+                self._processes = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+            try:
+                return self._processes.submit(fn, *args)
+            except BrokenProcessPool:
+                # A worker died (e.g. out of memory); start a fresh pool once.
+                self._processes = None
+                if attempt:
+                    raise
+
+    def _finished(self, job: KpiJob, on_result: Optional[Callable[[Any], None]]) -> None:
+        with self._lock:
+            if self._inflight.get(job.key) is job:
+                del self._inflight[job.key]
+            if not job.background:
+                self._foreground -= 1
+                self._last_activity = time.monotonic()
+                self._idle.notify_all()
+        if on_result is not None and not job.future.cancelled() and job.future.exception() is None:
+            on_result(job.future.result())
+
+
+_WORKER_REFRESHER: Optional[DatasetRefresher] = None
+
+
+def _reference_tables(fingerprint: str):
+    """The reference dataset as loaded in this worker process, which must match ``fingerprint``."""
+    global _WORKER_REFRESHER
+    if _WORKER_REFRESHER is None:
+        _WORKER_REFRESHER = DatasetRefresher(interval_seconds=0)
+    snapshot = _WORKER_REFRESHER.current()
+    if snapshot.fingerprint != fingerprint:
+        # Reloads only if the files changed since this worker read them.
+        _WORKER_REFRESHER.refresh()
+        snapshot = _WORKER_REFRESHER.snapshot
+        if snapshot.fingerprint != fingerprint:
+            raise StaleDatasetError(f"worker has dataset {snapshot.fingerprint}, job wants {fingerprint}")
+    return snapshot.tables
+
+
+def reference_bundle(fingerprint: str, selection: FilterSelection) -> Dict[str, object]:
+    """Worker-process entry point: the bundle of ``selection`` over the reference dataset."""
+    return compute_kpi_bundle(_reference_tables(fingerprint), selection)
+
+
+def job_key(
+    data: Dict[str, pd.DataFrame], selection: FilterSelection, fingerprint: Optional[str] = None, backend=None
+) -> Hashable:
+    """The bundle-cache key, or for uploads (no fingerprint) one tied to the session's frames."""
+    if fingerprint is None:
+        return ("session", id(data["workshops"]), selection)
+    return bundle_key(fingerprint, selection, backend)
+
+
+def request_bundle(
+    data: Dict[str, pd.DataFrame],
+    selection: FilterSelection,
+    fingerprint: Optional[str] = None,
+    backend=None,
+    reference: bool = False,
+    pool: Optional[KpiJobPool] = None,
+    background: bool = False,
+) -> KpiJob:
+    """
+    A job computing the bundle of ``selection``, shared with anyone asking for the same one.
+
+    ``reference`` marks ``fingerprint`` as the on-disk reference dataset,
+    which worker processes can load themselves. Cached bundles come back as
+    finished jobs; uploads (no fingerprint) are not cached. ``background``
+    jobs (warm-ups) do not count as session activity.
+    """
+    pool = get_job_pool() if pool is None else pool
+    key = job_key(data, selection, fingerprint, backend)
+    if fingerprint is None:
+        return pool.submit(key, compute_kpi_bundle, data, selection, backend, background=background)
+    cached = pool.cache.get(key)
+    if cached is not None:
+        return KpiJob.completed(key, cached)
+    if reference and backend is None and pool.executor == "process":
+        on_result = lambda bundle: pool.cache.put(key, bundle)  # noqa: E731
+        return pool.submit(
+            key, reference_bundle, fingerprint, selection, in_process=True, on_result=on_result, background=background
+        )
+    # On a thread the cache's single flight also joins a bundle being computed inline (AIRE_KPI_JOBS=off, the API).
+    compute = functools.partial(compute_kpi_bundle, data, selection, backend)
+    return pool.submit(key, pool.cache.get_or_compute, key, compute, background=background)
+
+
+def session_job(
+    state: MutableMapping[str, Any],
+    data: Dict[str, pd.DataFrame],
+    selection: FilterSelection,
+    fingerprint: Optional[str] = None,
+    backend=None,
+    reference: bool = False,
+    pool: Optional[KpiJobPool] = None,
+    state_key: str = "kpi_job",
+) -> KpiJob:
+    """
+    The session's bundle job; the job it held for another selection is released, since that run was superseded.
+
+    A job for the same selection is reused while it runs or once it succeeded; one that failed or was
+    cancelled is dropped, so the rerun submits the selection again.
+    """
+    pool = get_job_pool() if pool is None else pool
+    previous: Optional[KpiJob] = state.get(state_key)
+    key = job_key(data, selection, fingerprint, backend)
+    if previous is not None and previous.key == key:
+        future = previous.future
+        if not future.cancelled() and (not future.done() or future.exception() is None):
+            return previous
+        pool.release(previous)
+        state.pop(state_key, None)
+        previous = None
+    job = request_bundle(data, selection, fingerprint, backend, reference, pool)
+    if previous is not None:
+        pool.release(previous)
+    state[state_key] = job
+    return job
+
+
+_POOL: Optional[KpiJobPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_job_pool() -> KpiJobPool:
+    """Process-wide job pool shared by all sessions."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = KpiJobPool()
+        return _POOL
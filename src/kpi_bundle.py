@@ -0,0 +1,286 @@
+"""
+KPI bundles: every indicator the dashboard shows for one filter selection.
+
+Bundles for the reference dataset are kept in a process-wide cache keyed by
+the dataset fingerprint, the KPI engine and the normalized selection, so
+sessions share results with each other and with the startup warm-up
+(``src/warmup.py``). Cached bundles are shared, so callers must not modify
+the frames they contain.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from .config import BOOTSTRAP_RESAMPLES, BUNDLE_CACHE_SIZE, KPI_APPROXIMATE
+from .filters import FilterContext, filter_by_date_range
+from .funnel import workshop_funnel
+from .kpi_calculations import (
+    compute_adoption_index_history,
+    compute_ai_adoption_index,
+    compute_distinct_participants,
+    compute_learning_impact,
+    compute_readiness_matrix,
+    compute_reflection_sentiment,
+    compute_score_quantiles,
+    compute_training_coverage,
+    compute_workshop_engagement,
+)
+from .reflection_trends import reflection_trend_index
+from .retention import attendance_events, compute_cohort_retention
+from .sketches import kpi_sketch_index
+from .survey_pairing import survey_pair_index
+
+ROLE_OPTIONS = ["faculty", "staff", "graduate student", "mixed"]
+HISTORY_GRANULARITIES = ("month", "term")
+
+_AUDIENCE_BY_ROLE = {
+    "faculty": "faculty",
+    "staff": "staff",
+    "graduate student": "graduate students",
+    "mixed": "mixed",
+}
+
+
+def prepare_role_filters(selected_roles: Optional[Iterable[str]]) -> List[str]:
+    if not selected_roles:
+        return []
+    cleaned = [r for r in selected_roles if r != "mixed"]
+    if not cleaned and "mixed" in selected_roles:
+        return ["faculty", "staff", "graduate student"]
+    return cleaned
+
+
+def map_roles_to_audiences(selected_roles: Optional[Iterable[str]]) -> List[str]:
+    if not selected_roles:
+        return []
+    return [_AUDIENCE_BY_ROLE[r] for r in selected_roles if r in _AUDIENCE_BY_ROLE]
+
+
+@dataclass(frozen=True)
+class FilterSelection:
+    department_ids: Tuple[str, ...]
+    roles: Tuple[str, ...]
+    start_date: date
+    end_date: date
+
+    @classmethod
+    def from_sidebar(cls, selected_depts, selected_roles, start_date, end_date) -> "FilterSelection":
+        """Order-independent selection, so equivalent sidebar states share a cache entry."""
+        return cls(
+            tuple(sorted(selected_depts or [])),
+            tuple(r for r in ROLE_OPTIONS if r in set(selected_roles or [])),
+            pd.Timestamp(start_date).date(),
+            pd.Timestamp(end_date).date(),
+        )
+
+    @property
+    def role_filter(self) -> List[str]:
+        return prepare_role_filters(list(self.roles))
+
+    @property
+    def audience_filter(self) -> List[str]:
+        return map_roles_to_audiences(list(self.roles))
+
+
+def compute_kpi_bundle(
+    data: Dict[str, pd.DataFrame], selection: FilterSelection, backend=None, approximate: bool = KPI_APPROXIMATE
+) -> Dict[str, object]:
+    """
+    All dashboard KPIs for ``selection``; ``backend`` is an optional ``SqlKpiBackend``.
+
+    With ``approximate``, distinct participants and score quantiles are merged
+    from per-cell sketches (``src/sketches.py``) instead of counted from rows.
+    """
+    selected_depts = list(selection.department_ids)
+    role_filter = selection.role_filter
+    audience_filter = selection.audience_filter
+    start_date, end_date = selection.start_date, selection.end_date
+    workshops = data["workshops"]
+    participants = data["participants"]
+    # Each table is filtered once here; the KPIs below receive the selected rows and don't filter again.
+    context = FilterContext(data, selected_depts, role_filter, start_date, end_date)
+    departments = context.rows("departments")
+    filtered_workshops = context.rows("workshops")
+    filtered_participants = context.rows("participants")
+    filtered_reflections = context.rows("reflections")
+    pair_index = survey_pair_index(data["confidence_pre"], data["confidence_post"], participants)
+
+    if backend is not None:
+        # SQL backend reads the dataset files directly and pushes the filters into each query.
+        adoption_df, adoption_overall = backend.compute_ai_adoption_index(selected_depts, role_filter)
+        coverage_df, coverage_overall = backend.compute_training_coverage(selected_depts)
+        learning_impact = backend.compute_learning_impact(
+            selected_depts, role_filter, start_date, end_date, bootstrap_resamples=BOOTSTRAP_RESAMPLES
+        )
+        engagement = backend.compute_workshop_engagement(selected_depts, audience_filter, start_date, end_date)
+        sentiment_theme = backend.compute_reflection_sentiment(selected_depts, role_filter, start_date, end_date)
+        readiness_df = backend.compute_readiness_matrix(selected_depts)
+    else:
+        adoption_df, adoption_overall = compute_ai_adoption_index(departments, filtered_participants)
+        coverage_df, coverage_overall = compute_training_coverage(departments)
+        learning_impact = compute_learning_impact(
+            data["confidence_pre"],
+            data["confidence_post"],
+            participants,
+            filtered_department_ids=selected_depts,
+            filtered_roles=role_filter,
+            bootstrap_resamples=BOOTSTRAP_RESAMPLES,
+            pair_index=pair_index,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        engagement = compute_workshop_engagement(filtered_workshops, filtered_audiences=audience_filter)
+        sentiment_theme = compute_reflection_sentiment(context.rows("reflections_by_participant"), participants)
+        readiness_df = compute_readiness_matrix(departments)
+
+    # The history ends at the adoption index above: the same departments and role-filtered participants.
+    # Workshops pace the department-wide readiness and coverage, so they are limited to the departments only.
+    adoption_history = {
+        freq: compute_adoption_index_history(departments, filtered_participants, workshops, selected_depts, freq=freq)
+        for freq in HISTORY_GRANULARITIES
+    }
+
+    funnel = workshop_funnel(workshops).compute(selected_depts, audience_filter, start_date, end_date)
+    funnel["by_department"] = funnel["by_department"].merge(
+        data["departments"][["department_id", "department_name"]], on="department_id", how="left"
+    )
+    reflection_trends = reflection_trend_index(data["reflections"], participants).crosstabs(
+        selected_depts, role_filter, start_date, end_date
+    )
+    reflection_trends["theme_by_department"] = reflection_trends["theme_by_department"].merge(
+        data["departments"][["department_id", "department_name"]], on="department_id", how="left"
+    )
+    events = attendance_events(workshops, participants, data["confidence_pre"], data["confidence_post"], data["reflections"])
+    retention = compute_cohort_retention(events, filtered_participants)
+    if approximate:
+        sketches = kpi_sketch_index(
+            workshops, participants, data["confidence_pre"], data["confidence_post"], data["reflections"]
+        )
+        participation = sketches.distinct_participants(selected_depts, role_filter, start_date, end_date)
+        score_quantiles = sketches.score_quantiles(selected_depts, role_filter, start_date, end_date)
+    else:
+        participation = compute_distinct_participants(
+            filter_by_date_range(events, "date", start_date, end_date), filtered_participants
+        )
+        score_quantiles = compute_score_quantiles(
+            filter_by_date_range(data["confidence_pre"], "date", start_date, end_date),
+            filter_by_date_range(data["confidence_post"], "date", start_date, end_date),
+            filtered_participants,
+        )
+    department_names = data["departments"][["department_id", "department_name"]]
+    participation["by_department"] = participation["by_department"].merge(department_names, on="department_id", how="left")
+    score_quantiles = score_quantiles.merge(department_names, on="department_id", how="left")
+    return {
+        "filtered_workshops": filtered_workshops,
+        "filtered_participants": filtered_participants,
+        "filtered_reflections": filtered_reflections,
+        "adoption": adoption_df,
+        "adoption_overall": adoption_overall,
+        "adoption_history": adoption_history,
+        "coverage": coverage_df,
+        "coverage_overall": coverage_overall,
+        "learning_impact": learning_impact,
+        "engagement": engagement,
+        "funnel": funnel,
+        "sentiment_theme": sentiment_theme,
+        "reflection_trends": reflection_trends,
+        "readiness": readiness_df,
+        "retention": retention,
+        "participation": participation,
+        "score_quantiles": score_quantiles,
+        "survey_pairing": pair_index.report(),
+    }
+
+
+class BundleCache:
+    """Thread-safe LRU of KPI bundles (also holds encoded responses for ``src/api.py``)."""
+
+    def __init__(self, max_entries: int = BUNDLE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Dict[str, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending: Dict[Hashable, Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[Dict[str, object]]:
+        with self._lock:
+            bundle = self._entries.get(key)
+            if bundle is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return bundle
+
+    def put(self, key: Hashable, bundle: Dict[str, object]) -> None:
+        with self._lock:
+            self._entries[key] = bundle
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Dict[str, object]]) -> Dict[str, object]:
+        """The cached entry, computing it on a miss; concurrent misses for one key wait for a single ``compute``."""
+        bundle = self.get(key)
+        if bundle is not None:
+            return bundle
+        with self._lock:
+            bundle = self._entries.get(key)
+            if bundle is not None:
+                return bundle
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._pending[key] = Future()
+        if not owner:
+            return pending.result()
+        try:
+            bundle = compute()
+            self.put(key, bundle)
+            pending.set_result(bundle)
+            return bundle
+        except BaseException as exc:
+            pending.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                del self._pending[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+BUNDLE_CACHE = BundleCache()
+
+
+def bundle_key(fingerprint: str, selection: FilterSelection, backend=None) -> Tuple[str, str, FilterSelection]:
+    return (fingerprint, "duckdb" if backend is not None else "pandas", selection)
+
+
+def get_kpi_bundle(
+    data: Dict[str, pd.DataFrame],
+    selection: FilterSelection,
+    fingerprint: Optional[str] = None,
+    backend=None,
+    cache: Optional[BundleCache] = None,
+) -> Dict[str, object]:
+    """Cached bundle for a fingerprinted dataset; session uploads (no fingerprint) are computed directly."""
+    if fingerprint is None:
+        return compute_kpi_bundle(data, selection, backend)
+    cache = BUNDLE_CACHE if cache is None else cache
+    return cache.get_or_compute(
+        bundle_key(fingerprint, selection, backend), lambda: compute_kpi_bundle(data, selection, backend)
+    )
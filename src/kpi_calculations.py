@@ -3,13 +3,29 @@ from typing import Dict, Iterable, Optional, Tuple
 import numpy as np
 import pandas as pd
 
+from .bootstrap import bootstrap_learning_impact
 from .filters import filter_by_departments, filter_by_roles
+from .sketches import (
+    QUANTILES,
+    SCORE_METRICS,
+    SCORE_VALUES,
+    SURVEY_STAGES,
+    distinct_frames,
+    histogram_quantile,
+    quantile_frame,
+)
+from .survey_pairing import SurveyPairIndex
+from .text_index import ReflectionTextIndex
+from .derived import period_column
 
 
 ADOPTION_MAPPING = {"early": 0.3, "developing": 0.6, "established": 1.0}
 
 
 def _maybe_filter(df: pd.DataFrame, dept_col: str, department_ids: Optional[Iterable[str]]) -> pd.DataFrame:
+    # Inputs are read-only here, so an unfiltered frame is used as is rather than copied.
+    if not department_ids:
+        return df
     return filter_by_departments(df, dept_col, department_ids)
 
 
@@ -25,7 +41,7 @@ def compute_ai_adoption_index(
         return pd.DataFrame(columns=["department_id", "department_name", "adoption_index"]), 0.0
 
     participant_subset = participant_subset.assign(adoption_numeric=participant_subset["adoption_level"].map(ADOPTION_MAPPING))
-    adoption_by_dept = participant_subset.groupby("department_id")["adoption_numeric"].mean().reset_index()
+    adoption_by_dept = participant_subset.groupby("department_id", observed=True)["adoption_numeric"].mean().reset_index()
 
     merged = dept_df.merge(adoption_by_dept, on="department_id", how="left").fillna({"adoption_numeric": 0})
     merged["adoption_index"] = (
@@ -39,53 +55,190 @@ def compute_ai_adoption_index(
     return merged[["department_id", "department_name", "adoption_index"]], overall
 
 
+HISTORY_STATE_COLUMNS = ["cum_attendances", "cum_adoption_sum", "cum_participants"]
+HISTORY_COLUMNS = [
+    "department_id",
+    "department_name",
+    "period",
+    "readiness",
+    "coverage",
+    "adoption_numeric",
+    "adoption_index",
+    *HISTORY_STATE_COLUMNS,
+]
+
+
+def _period_increments(
+    participants_df: pd.DataFrame, workshops_df: pd.DataFrame, freq: str
+) -> Dict[str, pd.DataFrame]:
+    """Per-period (department x period) totals that the history accumulates."""
+    attendances = (
+        workshops_df.assign(period=period_column(workshops_df, freq))
+        .groupby(["department_id", "period"], observed=True)["attendances"]
+        .sum()
+        .unstack("period")
+    )
+    participants = participants_df.assign(
+        period=period_column(participants_df, freq, "last_attended_date"),
+        adoption_numeric=participants_df["adoption_level"].map(ADOPTION_MAPPING),
+    )
+    grouped = participants.groupby(["department_id", "period"], observed=True)["adoption_numeric"]
+    return {
+        "cum_attendances": attendances,
+        "cum_adoption_sum": grouped.sum().unstack("period"),
+        "cum_participants": grouped.count().unstack("period"),
+    }
+
+
+def _history_from_state(dept_df: pd.DataFrame, state: pd.DataFrame) -> pd.DataFrame:
+    """Derive the time-sliced adoption index from cumulative per-period totals."""
+    history = state.merge(
+        dept_df[
+            [
+                "department_id",
+                "department_name",
+                "baseline_readiness_score",
+                "current_readiness_score",
+                "training_coverage_rate",
+            ]
+        ],
+        on="department_id",
+        how="inner",
+    )
+    # Keep the departments' (dictionary-encoded) id dtype; the cumulative state is keyed by plain values.
+    history["department_id"] = history["department_id"].astype(dept_df["department_id"].dtype)
+    total_attendances = history.groupby("department_id", observed=True)["cum_attendances"].transform("max")
+    # Share of each department's recorded training delivered so far; departments without
+    # workshop records are held at their current values.
+    progress = (history["cum_attendances"] / total_attendances.where(total_attendances > 0)).fillna(1.0)
+    history["readiness"] = history["baseline_readiness_score"] + (
+        history["current_readiness_score"] - history["baseline_readiness_score"]
+    ) * progress
+    history["coverage"] = history["training_coverage_rate"] * progress
+    history["adoption_numeric"] = (
+        history["cum_adoption_sum"] / history["cum_participants"].where(history["cum_participants"] > 0)
+    ).fillna(0)
+    history["adoption_index"] = (
+        (history["readiness"] * 0.4) + (history["coverage"] * 0.35) + (history["adoption_numeric"] * 0.25)
+    ) * 100
+    history["adoption_index"] = history["adoption_index"].round(1)
+    return history[HISTORY_COLUMNS].sort_values(["department_id", "period"]).reset_index(drop=True)
+
+
+def _accumulate(increments: Dict[str, pd.DataFrame], department_ids, periods, base: Optional[pd.DataFrame] = None):
+    """Cumulative sums along the period axis, optionally continuing from an earlier cumulative state."""
+    state = {}
+    for column, matrix in increments.items():
+        dense = matrix.reindex(index=department_ids, columns=periods).fillna(0).to_numpy(dtype=float)
+        cumulative = np.cumsum(dense, axis=1)
+        if base is not None:
+            carried = (
+                base.pivot(index="department_id", columns="period", values=column)
+                .reindex(index=department_ids)
+                .reindex(columns=periods)
+                .ffill(axis=1)
+                .fillna(0)
+            )
+            cumulative = cumulative + carried.to_numpy(dtype=float)
+        state[column] = cumulative.ravel()
+    grid = pd.MultiIndex.from_product([department_ids, periods], names=["department_id", "period"])
+    return pd.DataFrame(state, index=grid).reset_index()
+
+
+def compute_adoption_index_history(
+    departments_df: pd.DataFrame,
+    participants_df: pd.DataFrame,
+    workshops_df: pd.DataFrame,
+    filtered_department_ids: Optional[Iterable[str]] = None,
+    freq: str = "month",
+) -> pd.DataFrame:
+    """
+    Adoption index per department and period ("month" or "term"), built in one pass of cumulative sums.
+
+    Readiness moves from the baseline to the current score, and coverage grows to the current
+    rate, in proportion to the share of the department's workshop attendances delivered so far.
+    The adoption component averages participants whose last attendance falls on or before the
+    period. The final period therefore reproduces ``compute_ai_adoption_index``.
+    """
+    dept_df = _maybe_filter(departments_df, "department_id", filtered_department_ids)
+    participants_df = _maybe_filter(participants_df, "department_id", filtered_department_ids)
+    workshops_df = _maybe_filter(workshops_df, "department_id", filtered_department_ids)
+    if dept_df.empty or (participants_df.empty and workshops_df.empty):
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+
+    increments = _period_increments(participants_df, workshops_df, freq)
+    observed = pd.concat([pd.Series(m.columns) for m in increments.values()]).dropna()
+    if observed.empty:
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+    periods = pd.Index(sorted(observed.unique()), name="period")
+    state = _accumulate(increments, list(dept_df["department_id"]), periods)
+    return _history_from_state(dept_df, state)
+
+
+def extend_adoption_index_history(
+    history_df: pd.DataFrame,
+    departments_df: pd.DataFrame,
+    new_participants_df: pd.DataFrame,
+    new_workshops_df: pd.DataFrame,
+    freq: str = "month",
+) -> pd.DataFrame:
+    """
+    Fold newly arrived participant and workshop rows into an existing history without rescanning
+    earlier data. Only the new rows are aggregated; they are added on top of the cumulative totals
+    already stored in ``history_df``.
+    """
+    if history_df.empty:
+        return compute_adoption_index_history(departments_df, new_participants_df, new_workshops_df, freq=freq)
+    department_ids = list(history_df["department_id"].drop_duplicates())
+    dept_df = departments_df[departments_df["department_id"].isin(department_ids)]
+    increments = _period_increments(
+        new_participants_df[new_participants_df["department_id"].isin(department_ids)],
+        new_workshops_df[new_workshops_df["department_id"].isin(department_ids)],
+        freq,
+    )
+    observed = pd.concat([history_df["period"]] + [pd.Series(m.columns) for m in increments.values()]).dropna()
+    periods = pd.Index(sorted(observed.unique()), name="period")
+    state = _accumulate(increments, department_ids, periods, base=history_df)
+    return _history_from_state(dept_df, state)
+
+
 def compute_learning_impact(
     conf_pre_df: pd.DataFrame,
     conf_post_df: pd.DataFrame,
     participants_df: pd.DataFrame,
     filtered_department_ids: Optional[Iterable[str]] = None,
     filtered_roles: Optional[Iterable[str]] = None,
+    bootstrap_resamples: int = 0,
+    pair_index: Optional[SurveyPairIndex] = None,
+    start_date=None,
+    end_date=None,
 ) -> Dict[str, pd.DataFrame]:
-    pre = conf_pre_df.merge(participants_df[["participant_id", "department_id", "role"]], on="participant_id", how="left")
-    post = conf_post_df.merge(participants_df[["participant_id", "department_id", "role"]], on="participant_id", how="left")
-
-    pre = _maybe_filter(pre, "department_id", filtered_department_ids)
-    post = _maybe_filter(post, "department_id", filtered_department_ids)
-    pre = filter_by_roles(pre, "role", filtered_roles)
-    post = filter_by_roles(post, "role", filtered_roles)
-
-    summary_df = _impact_summary(pre, post)
-    by_department = _breakdown(pre, post, "department_id")
-    by_role = _breakdown(pre, post, "role")
+    """
+    Pre/post change over matched survey pairs. With ``pair_index`` the pairs are read from the
+    prebuilt index and narrowed to the date range; otherwise the given survey frames are paired.
+    Bootstrap intervals are opt-in: ``intervals`` stays empty unless ``bootstrap_resamples`` > 0.
+    """
+    if pair_index is None:
+        pair_index = SurveyPairIndex(conf_pre_df, conf_post_df, participants_df)
+    pairs = pair_index.select(start_date, end_date, filtered_department_ids, filtered_roles)
 
     return {
-        "summary": summary_df,
-        "by_department": by_department,
-        "by_role": by_role,
+        "summary": _impact_summary(pairs),
+        "by_department": _breakdown(pairs, "department_id"),
+        "by_role": _breakdown(pairs, "role"),
+        "intervals": bootstrap_learning_impact(pairs, n_resamples=bootstrap_resamples),
     }
 
 
-def _impact_summary(df_pre: pd.DataFrame, df_post: pd.DataFrame) -> pd.DataFrame:
-    if df_pre.empty or df_post.empty:
-        return pd.DataFrame(
-            columns=[
-                "group",
-                "metric",
-                "pre_mean",
-                "post_mean",
-                "delta",
-                "effect_size",
-            ]
-        )
-    merged_local = df_pre.merge(df_post, on=["participant_id", "workshop_id"], suffixes=("_pre", "_post"))
-    if merged_local.empty:
+def _impact_summary(pairs: pd.DataFrame) -> pd.DataFrame:
+    if pairs.empty:
         return pd.DataFrame(columns=["group", "metric", "pre_mean", "post_mean", "delta", "effect_size"])
 
     metrics = ["confidence_score", "understanding_responsible_ai"]
     rows = []
     for metric in metrics:
-        pre_vals = merged_local[f"{metric}_pre"].astype(float)
-        post_vals = merged_local[f"{metric}_post"].astype(float)
+        pre_vals = pairs[f"{metric}_pre"].astype(float)
+        post_vals = pairs[f"{metric}_post"].astype(float)
         pre_mean = pre_vals.mean()
         post_mean = post_vals.mean()
         delta = post_mean - pre_mean
@@ -104,22 +257,11 @@ def _impact_summary(df_pre: pd.DataFrame, df_post: pd.DataFrame) -> pd.DataFrame
     return pd.DataFrame(rows)
 
 
-def _breakdown(pre: pd.DataFrame, post: pd.DataFrame, group_field: str) -> pd.DataFrame:
-    if pre.empty or post.empty:
-        return pd.DataFrame(columns=[group_field, "metric", "delta"])
-    merged_local = pre.merge(post, on=["participant_id", "workshop_id"], suffixes=("_pre", "_post"))
-    if merged_local.empty:
-        return pd.DataFrame(columns=[group_field, "metric", "delta"])
-    if "department_id_pre" in merged_local.columns:
-        merged_local["department_id"] = merged_local.get("department_id_pre").fillna(
-            merged_local.get("department_id_post")
-        )
-    if "role_pre" in merged_local.columns:
-        merged_local["role"] = merged_local.get("role_pre").fillna(merged_local.get("role_post"))
-    if group_field not in merged_local.columns:
+def _breakdown(pairs: pd.DataFrame, group_field: str) -> pd.DataFrame:
+    if pairs.empty or group_field not in pairs.columns:
         return pd.DataFrame(columns=[group_field, "metric", "delta"])
     records = []
-    for group_value, group_df in merged_local.groupby(group_field):
+    for group_value, group_df in pairs.groupby(group_field, observed=True):
         for metric in ["confidence_score", "understanding_responsible_ai"]:
             pre_vals = group_df[f"{metric}_pre"].astype(float)
             post_vals = group_df[f"{metric}_post"].astype(float)
@@ -162,9 +304,7 @@ def compute_workshop_engagement(
             "completion": pd.DataFrame(columns=["metric", "value"]),
         }
 
-    timeseries = df.copy()
-    timeseries["month"] = timeseries["date"].dt.to_period("M").dt.to_timestamp()
-    timeseries = timeseries.groupby("month")["attendances"].sum().reset_index()
+    timeseries = df.groupby(period_column(df, "month").rename("month"))["attendances"].sum().reset_index()
 
     by_format = df.groupby("format")["attendances"].sum().reset_index()
     by_audience = df.groupby("audience")["attendances"].sum().reset_index()
@@ -189,15 +329,15 @@ def compute_reflection_sentiment(
     filtered_department_ids: Optional[Iterable[str]] = None,
     filtered_roles: Optional[Iterable[str]] = None,
 ) -> Dict[str, pd.DataFrame]:
-    if "department_id" not in reflections_df.columns or "role" not in reflections_df.columns:
-        merged = reflections_df.merge(
-            participants_df[["participant_id", "department_id", "role"]], on="participant_id", how="left"
-        )
-    else:
-        merged = reflections_df.copy()
-
-    merged = _maybe_filter(merged, "department_id", filtered_department_ids)
-    merged = filter_by_roles(merged, "role", filtered_roles)
+    merged = reflections_df
+    if filtered_department_ids or filtered_roles:
+        # Department and role come from the participant unless the reflections already carry them.
+        if "department_id" not in merged.columns or "role" not in merged.columns:
+            merged = merged.merge(
+                participants_df[["participant_id", "department_id", "role"]], on="participant_id", how="left"
+            )
+        merged = _maybe_filter(merged, "department_id", filtered_department_ids)
+        merged = filter_by_roles(merged, "role", filtered_roles)
 
     if merged.empty:
         return {
@@ -210,6 +350,50 @@ def compute_reflection_sentiment(
     return {"sentiment": sentiment, "themes": themes}
 
 
+def compute_reflection_search(
+    reflections_df: pd.DataFrame,
+    participants_df: pd.DataFrame,
+    text_index: ReflectionTextIndex,
+    query: str,
+    filtered_department_ids: Optional[Iterable[str]] = None,
+    filtered_roles: Optional[Iterable[str]] = None,
+    top_n_terms: int = 15,
+) -> Dict[str, pd.DataFrame]:
+    """Reflections matching ``query`` (via the prebuilt text index) and their counts by department, role and month."""
+    matched_labels = text_index.labels_for(text_index.search(query))
+    matches = reflections_df[reflections_df.index.isin(matched_labels)]
+    matches = matches.assign(_row=text_index.labels.get_indexer(matches.index))
+    if "department_id" not in matches.columns or "role" not in matches.columns:
+        matches = matches.merge(
+            participants_df[["participant_id", "department_id", "role"]], on="participant_id", how="left"
+        )
+    matches = _maybe_filter(matches, "department_id", filtered_department_ids)
+    matches = filter_by_roles(matches, "role", filtered_roles)
+
+    if matches.empty:
+        return {
+            "matches": pd.DataFrame(columns=["reflection_id", "date", "department_id", "role", "reflection_text"]),
+            "by_department": pd.DataFrame(columns=["department_id", "count"]),
+            "by_role": pd.DataFrame(columns=["role", "count"]),
+            "by_month": pd.DataFrame(columns=["month", "count"]),
+            "terms": pd.DataFrame(columns=["term", "reflections"]),
+        }
+
+    by_month = (
+        matches.assign(month=period_column(matches, "month"))
+        .groupby("month")
+        .size()
+        .reset_index(name="count")
+    )
+    return {
+        "matches": matches[["reflection_id", "date", "department_id", "role", "reflection_text"]],
+        "by_department": matches.groupby("department_id", observed=True).size().reset_index(name="count"),
+        "by_role": matches.groupby("role").size().reset_index(name="count"),
+        "by_month": by_month,
+        "terms": text_index.term_frequencies(matches["_row"].to_numpy(), top_n=top_n_terms),
+    }
+
+
 def compute_readiness_matrix(
     departments_df: pd.DataFrame, filtered_department_ids: Optional[Iterable[str]] = None
 ) -> pd.DataFrame:
@@ -236,3 +420,35 @@ def compute_readiness_matrix(
             "participant_count",
         ]
     ]
+
+
+def compute_distinct_participants(events_df: pd.DataFrame, participants_df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Exact distinct participants with an event, per department and overall (inputs already filtered)."""
+    merged = events_df[["participant_id"]].merge(participants_df[["participant_id", "department_id"]], on="participant_id")
+    counts = merged.groupby("department_id", observed=True)["participant_id"].nunique()
+    return distinct_frames(
+        pd.Index(counts.index), counts.to_numpy(), np.zeros(len(counts)), (merged["participant_id"].nunique(), 0.0)
+    )
+
+
+def compute_score_quantiles(pre_df: pd.DataFrame, post_df: pd.DataFrame, participants_df: pd.DataFrame) -> pd.DataFrame:
+    """Exact pre and post score quantiles per department (inputs already filtered)."""
+    responses = [
+        df.merge(participants_df[["participant_id", "department_id"]], on="participant_id")
+        .assign(stage=stage)
+        .melt(id_vars=["department_id", "stage"], value_vars=list(SCORE_METRICS), var_name="metric", value_name="score")
+        for stage, df in zip(SURVEY_STAGES, (pre_df, post_df))
+    ]
+    scores = pd.concat(responses, ignore_index=True)
+    if scores.empty:
+        return quantile_frame(pd.Index([]), np.zeros((0, len(SURVEY_STAGES), len(SCORE_METRICS), len(SCORE_VALUES))))
+    counts = (
+        scores.groupby(["department_id", "stage", "metric", "score"], observed=True)
+        .size()
+        .unstack("score", fill_value=0)
+        .reindex(columns=SCORE_VALUES, fill_value=0)
+    )
+    frame = counts.sum(axis=1).rename("responses").reset_index()
+    for name, q in QUANTILES.items():
+        frame[name] = histogram_quantile(counts.to_numpy(), q)
+    return frame
@@ -1,18 +1,32 @@
 import streamlit as st
-import plotly.express as px
 from typing import List
 
 from .charts import (
     PALETTE,
+    make_active_participants_bar,
+    make_attendance_bar,
+    make_adoption_history_chart,
     make_adoption_radar_chart,
+    make_cohort_retention_heatmap,
     make_confidence_change_chart,
+    make_conversion_rate_bar,
+    make_delta_interval_chart,
     make_department_readiness_scatter,
     make_overview_kpi_cards,
+    make_reflection_mentions_bar,
+    make_reflection_mentions_timeseries,
     make_reflection_sentiment_bar,
+    make_repeat_rate_bar,
+    make_score_quantile_chart,
+    make_sentiment_trend_chart,
+    make_theme_department_heatmap,
     make_theme_distribution_bar,
+    make_theme_trend_chart,
     make_workshop_engagement_timeseries,
+    make_workshop_funnel_chart,
 )
-from .data_sources import REQUIRED_FILES
+from .data_sources import REQUIRED_FILES, invalidate_reference_snapshot
+from .sketches import SCORE_METRICS
 
 from .assets import LUCIDE_ICONS, get_global_styles
 
@@ -121,6 +135,14 @@ def render_adoption_section(dept_adoption_df):
     st.plotly_chart(fig, use_container_width=True)
 
 
+def render_adoption_history_section(history_df):
+    st.subheader("Adoption Trajectory")
+    st.write(
+        "How each department's composite adoption score has developed as training was delivered. Readiness and coverage advance with the share of a unit's workshop attendance completed to date, so flat lines indicate units where activity has stalled."
+    )
+    st.plotly_chart(make_adoption_history_chart(history_df), use_container_width=True)
+
+
 def render_learning_impact_section(impact_summary_df):
     st.subheader("Competency Growth Analysis")
     st.write(
@@ -130,6 +152,62 @@ def render_learning_impact_section(impact_summary_df):
     st.plotly_chart(fig, use_container_width=True)
 
 
+def render_score_distribution_section(score_quantiles, approximate: bool = False):
+    st.subheader("Score Distribution by Department")
+    st.write(
+        "Median pre- and post-survey scores per department, with bars spanning the middle half of responses. A wide spread, or a post median that barely moves, shows where a department's average hides participants who did not benefit."
+    )
+    metric = st.selectbox(
+        "Survey measure",
+        SCORE_METRICS,
+        format_func=lambda name: name.replace("_", " ").title(),
+        key="score_distribution_metric",
+    )
+    st.plotly_chart(make_score_quantile_chart(score_quantiles, metric), use_container_width=True)
+    if approximate:
+        st.caption("Merged from per-department, role and month score histograms; scores are whole numbers, so the quantiles are exact.")
+
+
+def render_impact_uncertainty_section(intervals_df, departments_df):
+    st.subheader("Statistical Confidence")
+    st.write(
+        "Bootstrap 95% intervals around each pre/post change. Intervals that cross zero, common for small departments, indicate that the observed shift may not be distinguishable from survey noise and should be interpreted cautiously."
+    )
+    if intervals_df.empty:
+        st.info("No data available for the current filters.")
+        return
+    names = departments_df.set_index("department_id")["department_name"]
+    labelled = intervals_df.assign(
+        label=intervals_df["group"].map(names).fillna(intervals_df["group"].astype(str))
+    )
+    col1, col2 = st.columns(2)
+    col1.plotly_chart(
+        make_delta_interval_chart(labelled[labelled["group_field"] == "department_id"], "Change by Department"),
+        use_container_width=True,
+    )
+    col2.plotly_chart(
+        make_delta_interval_chart(labelled[labelled["group_field"].isin(["overall", "role"])], "Change Overall and by Role"),
+        use_container_width=True,
+    )
+    st.dataframe(
+        labelled[["label", "metric", "n", "delta", "delta_ci_low", "delta_ci_high", "effect_size", "effect_size_ci_low", "effect_size_ci_high"]].rename(
+            columns={
+                "label": "Group",
+                "metric": "Metric",
+                "n": "Matched pairs",
+                "delta": "Delta",
+                "delta_ci_low": "Delta low",
+                "delta_ci_high": "Delta high",
+                "effect_size": "Effect size",
+                "effect_size_ci_low": "Effect low",
+                "effect_size_ci_high": "Effect high",
+            }
+        ),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+
 def render_participation_section(timeseries_df, by_format_df, by_audience_df, completion_df):
     st.subheader("Engagement Velocity")
     st.write(
@@ -148,18 +226,63 @@ def render_participation_section(timeseries_df, by_format_df, by_audience_df, co
         col3.info("No data available for the current filters.")
     else:
         col3.plotly_chart(
-            px.bar(by_format_df, x="format", y="attendances", title="Engagement by Format", color_discrete_sequence=[PALETTE["primary"]]),
+            make_attendance_bar(by_format_df, "format", "Engagement by Format", PALETTE["primary"]),
             use_container_width=True,
         )
     if by_audience_df.empty:
         col4.info("No data available for the current filters.")
     else:
         col4.plotly_chart(
-            px.bar(by_audience_df, x="audience", y="attendances", title="Engagement by Audience", color_discrete_sequence=[PALETTE["accent"]]),
+            make_attendance_bar(by_audience_df, "audience", "Engagement by Audience", PALETTE["accent"]),
             use_container_width=True,
         )
 
 
+def render_funnel_section(funnel):
+    st.subheader("Registration to Completion Funnel")
+    st.write(
+        "Share of registrants who attend, and of attendees who complete, with completion weighted by attendance so large sessions count in proportion to the people they reach. Low attendance points to scheduling or reminder gaps; low completion after attending points to content or format fit."
+    )
+    col1, col2 = st.columns([1, 2])
+    col1.plotly_chart(make_workshop_funnel_chart(funnel["stages"]), use_container_width=True)
+    col2.plotly_chart(
+        make_conversion_rate_bar(funnel["by_department"], "department_name", "Conversion by Department"),
+        use_container_width=True,
+    )
+    col3, col4 = st.columns(2)
+    col3.plotly_chart(make_conversion_rate_bar(funnel["by_format"], "format", "Conversion by Format"), use_container_width=True)
+    col4.plotly_chart(make_conversion_rate_bar(funnel["by_audience"], "audience", "Conversion by Audience"), use_container_width=True)
+
+
+def render_active_participants_section(participation, approximate: bool = False):
+    st.subheader("Active Participants")
+    st.write(
+        "Distinct people with a survey response, reflection or attendance in the selected window. Unlike attendance totals, repeat visits count once, so this is the reach of the program in each unit."
+    )
+    overall = participation["overall"].iloc[0]
+    col1, col2 = st.columns([1, 3])
+    if approximate:
+        col1.metric("Active participants", f"{int(overall['participants']):,} ± {int(overall['error'])}")
+        col1.caption("Estimated from HyperLogLog sketches; ± is a 95% error bound.")
+    else:
+        col1.metric("Active participants", f"{int(overall['participants']):,}")
+    col2.plotly_chart(make_active_participants_bar(participation["by_department"]), use_container_width=True)
+
+
+def render_retention_section(retention, departments_df):
+    st.subheader("Retention & Repeat Engagement")
+    st.write(
+        "Cohorts group participants by the month they first attended; each cell shows the share still participating in later months. Repeat-attendance rates show where enablement is building sustained practice rather than one-off exposure."
+    )
+    st.plotly_chart(make_cohort_retention_heatmap(retention["cohorts"]), use_container_width=True)
+    by_department = retention["repeat_by_department"].merge(
+        departments_df[["department_id", "department_name"]], on="department_id", how="left"
+    )
+    col1, col2 = st.columns([2, 1])
+    col1.plotly_chart(make_repeat_rate_bar(by_department, "department_name", "Repeat Attendance by Department"), use_container_width=True)
+    col2.plotly_chart(make_repeat_rate_bar(retention["repeat_by_role"], "role", "Repeat Attendance by Role"), use_container_width=True)
+
+
 def render_reflection_section(sentiment_df, theme_df):
     st.subheader("Qualitative Intelligence")
     st.write(
@@ -170,6 +293,49 @@ def render_reflection_section(sentiment_df, theme_df):
     col2.plotly_chart(make_theme_distribution_bar(theme_df), use_container_width=True)
 
 
+def render_reflection_trends_section(trends):
+    st.subheader("Sentiment and Theme Trends")
+    st.write(
+        "How the sentiment mix and the themes raised move month by month, and which units raise which themes. A theme that grows in one department, or a rising share of negative reflections, points to where guidance or follow-up is needed next."
+    )
+    col1, col2 = st.columns(2)
+    col1.plotly_chart(make_sentiment_trend_chart(trends["sentiment_by_month"]), use_container_width=True)
+    col2.plotly_chart(make_theme_trend_chart(trends["theme_by_month"]), use_container_width=True)
+    st.plotly_chart(make_theme_department_heatmap(trends["theme_by_department"]), use_container_width=True)
+
+
+def render_reflection_search_section(query: str, results, departments_df):
+    st.subheader("Reflection Search")
+    matches = results["matches"]
+    st.write(
+        f"{len(matches):,} reflections match **{query}** within the current filters. Counts show where the topic surfaces so follow-up can be targeted to the units and roles raising it."
+    )
+    by_department = results["by_department"].merge(
+        departments_df[["department_id", "department_name"]], on="department_id", how="left"
+    )
+    col1, col2 = st.columns(2)
+    col1.plotly_chart(
+        make_reflection_mentions_bar(
+            by_department[["department_name", "count"]] if not by_department.empty else results["by_department"],
+            "department_name",
+            "Mentions by Department",
+        ),
+        use_container_width=True,
+    )
+    col2.plotly_chart(make_reflection_mentions_bar(results["by_role"], "role", "Mentions by Role"), use_container_width=True)
+    col3, col4 = st.columns([2, 1])
+    col3.plotly_chart(make_reflection_mentions_timeseries(results["by_month"]), use_container_width=True)
+    with col4:
+        st.markdown("**Co-occurring terms**")
+        st.dataframe(
+            results["terms"].rename(columns={"term": "Term", "reflections": "Reflections"}),
+            use_container_width=True,
+            hide_index=True,
+        )
+    with st.expander("Matching reflections", expanded=False):
+        st.dataframe(matches.head(200), use_container_width=True, hide_index=True)
+
+
 def render_department_readiness_section(readiness_df):
     st.subheader("Strategic Alignment Matrix")
     st.write(
@@ -279,3 +445,6 @@ def render_data_management_panel():
                 st.session_state["uploaded_data"] = None
                 st.session_state["active_source"] = "synthetic"
                 st.success("Dashboard is now using the reference synthetic dataset for this session.")
+            if st.button("Reload reference dataset", help="Re-read and re-validate the reference files for every session"):
+                invalidate_reference_snapshot()
+                st.success("The reference dataset will be reloaded from disk on the next run.")
@@ -0,0 +1,31 @@
+"""
+Deferred imports for heavy dependencies.
+
+``lazy_module("plotly.express")`` returns a stand-in that imports the real
+module on first attribute access, so modules can keep the usual
+``px.bar(...)`` call style without paying the import cost at startup.
+"""
+import importlib
+from types import ModuleType
+
+
+class LazyModule:
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    return LazyModule(name)
@@ -0,0 +1,211 @@
+"""
+Date-partitioned layout for the fact tables.
+
+``write_partitions`` splits each dated table into one Parquet file per
+academic term or calendar month and records every partition's date span in
+a manifest. ``PartitionedDataset`` then reads only the partitions that
+overlap a requested date range, keeps the ones it has read, and loads
+further partitions lazily when the range widens. Rows keep their original
+file order, so pruned tables filter exactly like the flat ones.
+
+Write a layout from the validated reference dataset with::
+
+    python -m src.partitions --out data/partitioned --freq term
+"""
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .config import PARTITION_DIR, PARTITION_FREQ
+from .time_keys import PERIOD_FREQUENCIES, period_start
+
+MANIFEST_NAME = "manifest.json"
+
+# Fact tables and the column they are partitioned on; all other tables are stored whole.
+FACT_DATE_COLUMNS = {
+    "workshops": "date",
+    "confidence_pre": "date",
+    "confidence_post": "date",
+    "reflections": "date",
+}
+
+_ROW_COLUMN = "_row"
+_UNDATED = "undated"
+
+
+def _write_parquet(df: pd.DataFrame, path: Path) -> Dict[str, object]:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(path, index=False)
+    return {"file": path.name, "rows": len(df)}
+
+
+def write_partitions(
+    tables: Dict[str, pd.DataFrame], root: Path, freq: str = "term", fingerprint: str = ""
+) -> Path:
+    """Write a new layout version under ``root`` and point the manifest at it; returns the version directory."""
+    if freq not in PERIOD_FREQUENCIES:
+        raise ValueError(f"Unsupported period frequency: {freq}")
+    root = Path(root)
+    version = f"v-{time.time_ns()}-{freq}"
+    version_dir = root / version
+
+    manifest: Dict[str, object] = {"fingerprint": fingerprint, "freq": freq, "version": version, "tables": {}}
+    for name, df in tables.items():
+        date_column = FACT_DATE_COLUMNS.get(name)
+        if date_column is None or date_column not in df.columns:
+            manifest["tables"][name] = {"partitioned": False, **_write_parquet(df, version_dir / f"{name}.parquet")}
+            continue
+        stored = df.reset_index(drop=True)
+        stored[_ROW_COLUMN] = stored.index
+        keys = period_start(stored[date_column], freq).dt.strftime("%Y-%m-%d").fillna(_UNDATED)
+        partitions = []
+        for key, part in stored.groupby(keys, sort=True):
+            dates = part[date_column]
+            entry = _write_parquet(part, version_dir / name / f"{key}.parquet")
+            partitions.append(
+                {
+                    "key": key,
+                    "min_date": None if dates.isna().all() else dates.min().strftime("%Y-%m-%d"),
+                    "max_date": None if dates.isna().all() else dates.max().strftime("%Y-%m-%d"),
+                    **entry,
+                }
+            )
+        manifest["tables"][name] = {"partitioned": True, "date_column": date_column, "partitions": partitions}
+
+    previous = _read_manifest(root)
+    tmp_path = root / f"{MANIFEST_NAME}.{os.getpid()}.tmp"
+    tmp_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp_path, root / MANIFEST_NAME)
+    # Readers may still be loading from the version we just replaced; anything older can go.
+    keep = {version, previous.get("version") if previous else None}
+    for child in root.glob("v-*"):
+        if child.is_dir() and child.name not in keep:
+            shutil.rmtree(child, ignore_errors=True)
+    return version_dir
+
+
+def _read_manifest(root: Path) -> Optional[Dict[str, object]]:
+    path = Path(root) / MANIFEST_NAME
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+class PartitionedDataset:
+    """Read side of a partitioned layout; safe to share between sessions."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        manifest = _read_manifest(self.root)
+        if manifest is None:
+            raise FileNotFoundError(f"No partition manifest in {self.root}")
+        self.fingerprint: str = manifest["fingerprint"]
+        self.freq: str = manifest["freq"]
+        self.version_dir = self.root / manifest["version"]
+        self._tables: Dict[str, Dict[str, object]] = manifest["tables"]
+        self._cache: Dict[Tuple[str, str], pd.DataFrame] = {}
+        self._lock = threading.Lock()
+        self.partition_reads = 0
+
+    @property
+    def fact_tables(self) -> List[str]:
+        return [name for name, meta in self._tables.items() if meta["partitioned"]]
+
+    def _read(self, cache_key: Tuple[str, str], path: Path) -> pd.DataFrame:
+        with self._lock:
+            df = self._cache.get(cache_key)
+        if df is None:
+            df = pd.read_parquet(path)
+            with self._lock:
+                df = self._cache.setdefault(cache_key, df)
+                self.partition_reads += 1
+        return df
+
+    def dimensions(self) -> Dict[str, pd.DataFrame]:
+        """Tables stored whole (participants, departments)."""
+        return {
+            name: self._read((name, ""), self.version_dir / meta["file"])
+            for name, meta in self._tables.items()
+            if not meta["partitioned"]
+        }
+
+    def bounds(self, table: str = "workshops") -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+        spans = [p for p in self._tables[table]["partitions"] if p["min_date"] is not None]
+        if not spans:
+            return None, None
+        return pd.Timestamp(min(p["min_date"] for p in spans)), pd.Timestamp(max(p["max_date"] for p in spans))
+
+    def partitions_for(self, table: str, start_date=None, end_date=None) -> List[str]:
+        """Keys of the partitions whose dates overlap ``[start_date, end_date]`` (undated rows always qualify)."""
+        start = pd.Timestamp(start_date) if start_date is not None else None
+        end = pd.Timestamp(end_date) if end_date is not None else None
+        keys = []
+        for part in self._tables[table]["partitions"]:
+            if part["min_date"] is not None:
+                if start is not None and pd.Timestamp(part["max_date"]) < start:
+                    continue
+                if end is not None and pd.Timestamp(part["min_date"]) > end:
+                    continue
+            keys.append(part["key"])
+        return keys
+
+    def partition_count(self, start_date=None, end_date=None) -> int:
+        return sum(len(self.partitions_for(table, start_date, end_date)) for table in self.fact_tables)
+
+    def load_table(self, table: str, start_date=None, end_date=None) -> pd.DataFrame:
+        meta = self._tables[table]
+        if not meta["partitioned"]:
+            return self._read((table, ""), self.version_dir / meta["file"])
+        files = {p["key"]: p["file"] for p in meta["partitions"]}
+        keys = self.partitions_for(table, start_date, end_date)
+        parts = [self._read((table, key), self.version_dir / table / files[key]) for key in keys]
+        if not parts:
+            # Empty range: keep the schema by slicing any partition.
+            first = meta["partitions"][0]
+            parts = [self._read((table, first["key"]), self.version_dir / table / first["file"]).iloc[0:0]]
+        df = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+        return df.sort_values(_ROW_COLUMN, kind="stable").drop(columns=_ROW_COLUMN).reset_index(drop=True)
+
+    def load(self, start_date=None, end_date=None) -> Dict[str, pd.DataFrame]:
+        """Fact tables pruned to the partitions overlapping the range."""
+        return {table: self.load_table(table, start_date, end_date) for table in self.fact_tables}
+
+
+_DATASETS: Dict[Path, Tuple[float, PartitionedDataset]] = {}
+_DATASETS_LOCK = threading.Lock()
+
+
+def get_partitioned_dataset(root: Optional[Path] = None) -> Optional[PartitionedDataset]:
+    """Shared dataset for the configured layout, reopened when its manifest is rewritten."""
+    root = Path(root or PARTITION_DIR) if (root or PARTITION_DIR) else None
+    if root is None or not (root / MANIFEST_NAME).exists():
+        return None
+    mtime = (root / MANIFEST_NAME).stat().st_mtime_ns
+    with _DATASETS_LOCK:
+        cached = _DATASETS.get(root)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, PartitionedDataset(root))
+            _DATASETS[root] = cached
+        return cached[1]
+
+
+def main() -> None:
+    from .data_loader import dataset_fingerprint, load_all_data
+
+    parser = argparse.ArgumentParser(description="Write the reference dataset as date-partitioned Parquet files.")
+    parser.add_argument("--out", default=PARTITION_DIR or "data/partitioned")
+    parser.add_argument("--freq", choices=PERIOD_FREQUENCIES, default=PARTITION_FREQ)
+    args = parser.parse_args()
+    version_dir = write_partitions(load_all_data(), Path(args.out), args.freq, dataset_fingerprint())
+    print(f"Wrote {args.freq} partitions to {version_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Sentiment and theme crosstabs of reflections over months and departments.
+
+``ReflectionTrendIndex`` turns every reflection into small integer codes once
+per loaded dataset: sentiment, theme, month, and the department and role of
+its participant. Rows are kept in date order, so a date range is a contiguous
+slice found by binary search, and department and role filters are lookups in
+per-code boolean tables. Each crosstab is then a single ``np.bincount`` over
+the combined row and column codes of the selected rows, with no merge,
+groupby or string comparison per query. Results are long frames holding only
+the non-zero cells, which is the layout the trend charts plot.
+"""
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .derived import period_column
+from .encoding import label_codes, label_table, lookup_positions
+from .frame_cache import FrameCache
+
+# Crosstab name -> (row dimension, column dimension).
+TRENDS = {
+    "sentiment_by_month": ("month", "sentiment"),
+    "theme_by_month": ("month", "theme"),
+    "theme_by_department": ("department_id", "theme"),
+}
+
+
+class ReflectionTrendIndex:
+    def __init__(self, reflections_df: pd.DataFrame, participants_df: pd.DataFrame):
+        dates = reflections_df["date"].to_numpy()
+        order = np.argsort(dates, kind="stable")
+        self.dates = dates[order]
+        self.codes: Dict[str, np.ndarray] = {}
+        self.labels: Dict[str, pd.Index] = {}
+        for name, values in (
+            ("sentiment", reflections_df["sentiment"]),
+            ("theme", reflections_df["theme"]),
+            ("month", period_column(reflections_df, "month")),
+        ):
+            codes, self.labels[name] = label_codes(values)
+            self.codes[name] = codes[order]
+
+        if "department_id" in reflections_df.columns and "role" in reflections_df.columns:
+            source, rows = reflections_df, np.arange(len(reflections_df))
+        else:
+            # Department and role come from the participant, as in FilterContext.
+            source = participants_df
+            rows = lookup_positions(participants_df["participant_id"], reflections_df["participant_id"])
+        matched = rows >= 0
+        for name in ("department_id", "role"):
+            codes, self.labels[name] = label_codes(source[name])
+            looked_up = np.full(len(rows), -1, dtype=np.int64)
+            looked_up[matched] = codes[rows[matched]]
+            self.codes[name] = looked_up[order]
+
+    def _selection(self, department_ids, roles, start_date, end_date) -> Tuple[slice, Optional[np.ndarray]]:
+        """Date-ordered row slice of the range, and a mask within it for departments and roles (None keeps all)."""
+        start, stop = 0, len(self.dates)
+        if start_date is not None and end_date is not None:
+            start = int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start_date)), "left"))
+            stop = int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end_date)), "right"))
+        rows = slice(start, max(start, stop))
+        mask = None
+        for name, selected in (("department_id", department_ids), ("role", roles)):
+            table = label_table(self.labels[name], selected)
+            if table is not None:
+                allowed = table[self.codes[name][rows]]
+                mask = allowed if mask is None else mask & allowed
+        return rows, mask
+
+    def _count(self, name: str, rows: slice, mask: Optional[np.ndarray]) -> pd.DataFrame:
+        row_dim, col_dim = TRENDS[name]
+        row_codes, col_codes = self.codes[row_dim][rows], self.codes[col_dim][rows]
+        if mask is not None:
+            row_codes, col_codes = row_codes[mask], col_codes[mask]
+        keep = (row_codes >= 0) & (col_codes >= 0)
+        n_cols = len(self.labels[col_dim])
+        counts = np.bincount(
+            row_codes[keep] * n_cols + col_codes[keep], minlength=len(self.labels[row_dim]) * n_cols
+        )
+        cells = np.flatnonzero(counts)
+        return pd.DataFrame(
+            {
+                row_dim: self.labels[row_dim].take(cells // n_cols),
+                col_dim: self.labels[col_dim].take(cells % n_cols),
+                "count": counts[cells].astype(np.int64),
+            }
+        )
+
+    def crosstabs(
+        self,
+        department_ids: Optional[Iterable[str]] = None,
+        roles: Optional[Iterable[str]] = None,
+        start_date=None,
+        end_date=None,
+    ) -> Dict[str, pd.DataFrame]:
+        """Every crosstab in ``TRENDS`` for one filter selection, as long frames of non-zero counts."""
+        rows, mask = self._selection(list(department_ids or []), list(roles or []), start_date, end_date)
+        return {name: self._count(name, rows, mask) for name in TRENDS}
+
+
+# Indexes built per loaded dataset, dropped with its frames.
+_INDEXES = FrameCache()
+
+
+def reflection_trend_index(reflections_df: pd.DataFrame, participants_df: pd.DataFrame) -> ReflectionTrendIndex:
+    return _INDEXES.get_or_build(
+        (reflections_df, participants_df), lambda: ReflectionTrendIndex(reflections_df, participants_df)
+    )
@@ -0,0 +1,184 @@
+"""
+Process-wide snapshot of the reference dataset, with background refresh.
+
+Every session reads the same snapshot without copying it. Its table mapping
+is read-only and the column buffers of its frames are write-protected, so an
+accidental in-place edit raises instead of leaking into other sessions. The
+snapshot is replaced, never modified: ``invalidate`` forces a reload on next
+access. Each snapshot is finalized by the ingestion pipeline (derived time
+keys, prebuilt indexes) and carries per-table statistics. When a refresh
+interval is configured, a daemon thread polls the data directory for changed
+files (name, size and modification time). Once a change has been stable for
+one poll, so a drop folder copy in progress is not picked up half-written,
+the dataset is rebuilt and validated on that thread and the new snapshot
+replaces the old one in a single reference assignment. Sessions keep reading
+the previous snapshot until the new one is complete, and a failed rebuild
+leaves it in place.
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import REFRESH_INTERVAL_SECONDS
+from .data_loader import dataset_fingerprint, load_all_data
+from .derived import TableStats, table_stats
+from .ingestion import finalize
+
+
+def protect_tables(tables: Dict[str, pd.DataFrame]) -> Mapping[str, pd.DataFrame]:
+    """Read-only mapping of ``tables`` whose numpy-backed column values can no longer be written in place."""
+    for df in tables.values():
+        # pandas has no public switch for this; flag each block's backing array (datetime and
+        # categorical arrays wrap theirs in ``_ndarray``). Arrow-backed columns are immutable already.
+        for block in getattr(df._mgr, "blocks", ()):
+            values = getattr(block.values, "_ndarray", block.values)
+            if isinstance(values, np.ndarray):
+                values.flags.writeable = False
+    return MappingProxyType(dict(tables))
+
+
+@dataclass(frozen=True)
+class DatasetSnapshot:
+    tables: Mapping[str, pd.DataFrame]
+    fingerprint: str
+    loaded_at: float
+    load_seconds: float
+    stats: Mapping[str, TableStats] = field(default_factory=dict)
+
+
+class DatasetRefresher:
+    def __init__(
+        self,
+        loader: Callable[[], Dict[str, pd.DataFrame]] = load_all_data,
+        fingerprint: Callable[[], str] = dataset_fingerprint,
+        interval_seconds: float = REFRESH_INTERVAL_SECONDS,
+    ):
+        self._loader = loader
+        self._fingerprint = fingerprint
+        self.interval_seconds = interval_seconds
+        self._snapshot: Optional[DatasetSnapshot] = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pending: Optional[str] = None
+        # Fingerprint of files whose rebuild failed; polling skips them until they change again.
+        self._failed: Optional[str] = None
+        self._stale = False
+        self.last_error: Optional[str] = None
+
+    @property
+    def snapshot(self) -> Optional[DatasetSnapshot]:
+        return self._snapshot
+
+    def current(self) -> DatasetSnapshot:
+        """The live snapshot; the first call, and the first after ``invalidate``, loads it on the caller's thread."""
+        if self._snapshot is None or self._stale:
+            self.refresh(force=self._stale)
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        """Reload on next access even if the source files look unchanged; readers keep the old snapshot meanwhile."""
+        self._stale = True
+
+    def refresh(self, force: bool = False) -> bool:
+        """Rebuild when the source files changed; returns True if a new snapshot was swapped in."""
+        with self._refresh_lock:
+            fingerprint = self._fingerprint()
+            current = self._snapshot
+            if not force and current is not None and current.fingerprint == fingerprint:
+                return False
+            started = time.perf_counter()
+            self._stale = False
+            try:
+                tables = protect_tables(finalize(self._loader()))
+            except Exception as exc:
+                if current is None:
+                    raise
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                self._failed = fingerprint
+                return False
+            self._snapshot = DatasetSnapshot(
+                tables, fingerprint, time.time(), time.perf_counter() - started, table_stats(tables)
+            )
+            self._failed = None
+            self.last_error = None
+            return True
+
+    def apply(
+        self, update: Callable[[DatasetSnapshot], Tuple[Dict[str, pd.DataFrame], Mapping[str, TableStats]]]
+    ) -> DatasetSnapshot:
+        """
+        Swap in tables derived from the live snapshot (e.g. with a delta appended) without reloading.
+
+        ``update`` runs under the refresh lock and returns the new tables and
+        their stats. Files it writes are covered by the new snapshot's
+        fingerprint, so the watcher does not reload them again.
+        """
+        self.current()
+        with self._refresh_lock:
+            started = time.perf_counter()
+            tables, stats = update(self._snapshot)
+            self._snapshot = DatasetSnapshot(
+                protect_tables(tables), self._fingerprint(), time.time(), time.perf_counter() - started, stats
+            )
+            self._pending = None
+            self.last_error = None
+            return self._snapshot
+
+    def poll(self) -> bool:
+        """
+        One watcher tick: refresh only once a changed fingerprint has held since the previous tick.
+
+        Files whose rebuild already failed are not retried until they change again (or ``invalidate``).
+        """
+        fingerprint = self._fingerprint()
+        current = self._snapshot
+        if (current is not None and current.fingerprint == fingerprint) or fingerprint == self._failed:
+            self._pending = None
+            return False
+        if fingerprint != self._pending:
+            self._pending = fingerprint
+            return False
+        self._pending = None
+        return self.refresh()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="aire-dataset-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.poll()
+            except Exception as exc:
+                # Files can vanish mid-copy; report it and try again on the next tick.
+                self.last_error = f"{type(exc).__name__}: {exc}"
+
+
+_REFRESHER: Optional[DatasetRefresher] = None
+_REFRESHER_LOCK = threading.Lock()
+
+
+def get_refresher() -> DatasetRefresher:
+    """Process-wide snapshot holder for the reference dataset; polling starts on first use if an interval is set."""
+    global _REFRESHER
+    with _REFRESHER_LOCK:
+        if _REFRESHER is None:
+            _REFRESHER = DatasetRefresher()
+            if _REFRESHER.interval_seconds > 0:
+                _REFRESHER.start()
+        return _REFRESHER
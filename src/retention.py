@@ -0,0 +1,149 @@
+"""
+Cohort retention and repeat-attendance analytics.
+
+Participants and months are integer-coded once; first-attendance months,
+months-since-first offsets and cohort counts are then computed with NumPy
+ufuncs and ``bincount`` over those codes, with no per-participant loops.
+"""
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from .filters import filter_by_departments, filter_by_roles
+
+COHORT_COLUMNS = ["cohort_month", "months_since", "active_participants", "cohort_size", "retention_rate"]
+REPEAT_COLUMNS = ["participants", "repeat_participants", "repeat_rate", "avg_workshops"]
+
+
+def attendance_events(
+    workshops_df: pd.DataFrame,
+    participants_df: pd.DataFrame,
+    *event_dfs: pd.DataFrame,
+) -> pd.DataFrame:
+    """
+    One row per recorded participation: survey responses and reflections (dated by their workshop
+    when it is known) plus each participant's last attendance date.
+    """
+    facts = pd.concat([df[["participant_id", "workshop_id", "date"]] for df in event_dfs], ignore_index=True)
+    workshop_dates = workshops_df.drop_duplicates("workshop_id").set_index("workshop_id")["date"]
+    facts["date"] = workshop_dates.reindex(facts["workshop_id"]).to_numpy()
+    facts["date"] = facts["date"].fillna(pd.concat([df["date"] for df in event_dfs], ignore_index=True))
+    last_attended = pd.DataFrame(
+        {
+            "participant_id": participants_df["participant_id"],
+            "workshop_id": pd.Series(np.nan, index=participants_df.index, dtype=object),
+            "date": participants_df["last_attended_date"],
+        }
+    )
+    return pd.concat([facts, last_attended], ignore_index=True).dropna(subset=["date"])
+
+
+def _month_codes(dates: pd.Series) -> np.ndarray:
+    return (dates.dt.year.to_numpy() * 12 + dates.dt.month.to_numpy() - 1).astype(np.int32)
+
+
+def _month_timestamps(codes: np.ndarray) -> pd.Series:
+    return pd.to_datetime({"year": codes // 12, "month": codes % 12 + 1, "day": np.ones_like(codes)})
+
+
+def _repeat_rates(group_codes: np.ndarray, groups: pd.Index, attended: np.ndarray, field: str) -> pd.DataFrame:
+    valid = group_codes >= 0
+    codes = group_codes[valid]
+    counts = np.bincount(codes, minlength=len(groups))
+    repeat = np.bincount(codes, weights=(attended[valid] >= 2), minlength=len(groups))
+    workshops = np.bincount(codes, weights=attended[valid], minlength=len(groups))
+    rates = pd.DataFrame(
+        {
+            field: groups,
+            "participants": counts,
+            "repeat_participants": repeat.astype(int),
+            "repeat_rate": np.round(np.divide(repeat, counts, out=np.zeros(len(groups)), where=counts > 0), 2),
+            "avg_workshops": np.round(np.divide(workshops, counts, out=np.zeros(len(groups)), where=counts > 0), 2),
+        }
+    )
+    return rates[rates["participants"] > 0].reset_index(drop=True)
+
+
+def compute_cohort_retention(
+    events_df: pd.DataFrame,
+    participants_df: pd.DataFrame,
+    filtered_department_ids: Optional[Iterable[str]] = None,
+    filtered_roles: Optional[Iterable[str]] = None,
+) -> Dict[str, pd.DataFrame]:
+    participants = participants_df
+    if filtered_department_ids or filtered_roles:
+        participants = filter_by_roles(
+            filter_by_departments(participants, "department_id", filtered_department_ids), "role", filtered_roles
+        )
+    participants = participants.drop_duplicates("participant_id")
+    empty = {
+        "cohorts": pd.DataFrame(columns=COHORT_COLUMNS),
+        "curve": pd.DataFrame(columns=["months_since", "retention_rate"]),
+        "repeat_by_department": pd.DataFrame(columns=["department_id", *REPEAT_COLUMNS]),
+        "repeat_by_role": pd.DataFrame(columns=["role", *REPEAT_COLUMNS]),
+    }
+    if participants.empty or events_df.empty:
+        return empty
+
+    participant_index = pd.Index(participants["participant_id"])
+    pid = participant_index.get_indexer(events_df["participant_id"])
+    keep = pid >= 0
+    if not keep.any():
+        return empty
+    pid = pid[keep].astype(np.int64)
+    month = _month_codes(events_df["date"][keep])
+    n_participants = len(participant_index)
+
+    # First-attendance month per participant and each event's offset from it.
+    first = np.full(n_participants, np.iinfo(np.int32).max, dtype=np.int32)
+    np.minimum.at(first, pid, month)
+    offset = month - first[pid]
+
+    # Distinct (participant, months_since) activity, then counts per (cohort, months_since).
+    n_offsets = int(offset.max()) + 1
+    active_keys = np.unique(pid * n_offsets + offset)
+    active_pid = active_keys // n_offsets
+    active_offset = (active_keys % n_offsets).astype(np.int32)
+    has_events = first != np.iinfo(np.int32).max
+    min_month = int(first[has_events].min())
+    last_month = int(month.max())
+    n_cohorts = last_month - min_month + 1
+    cohort = first[active_pid] - min_month
+    active = np.bincount(cohort * n_offsets + active_offset, minlength=n_cohorts * n_offsets).reshape(n_cohorts, n_offsets)
+    sizes = np.bincount(first[has_events] - min_month, minlength=n_cohorts)
+
+    cohort_grid, offset_grid = np.meshgrid(np.arange(n_cohorts), np.arange(n_offsets), indexing="ij")
+    observable = (sizes[cohort_grid] > 0) & (cohort_grid + offset_grid <= last_month - min_month)
+    cohorts = pd.DataFrame(
+        {
+            "cohort_month": _month_timestamps(cohort_grid[observable] + min_month),
+            "months_since": offset_grid[observable],
+            "active_participants": active[observable],
+            "cohort_size": sizes[cohort_grid[observable]],
+        }
+    )
+    cohorts["retention_rate"] = (cohorts["active_participants"] / cohorts["cohort_size"]).round(3)
+
+    curve = cohorts.groupby("months_since")[["active_participants", "cohort_size"]].sum().reset_index()
+    curve["retention_rate"] = (curve["active_participants"] / curve["cohort_size"]).round(3)
+
+    # Workshops attended: distinct workshops seen in the events, or the participant's own count if higher.
+    workshop_codes, _ = pd.factorize(events_df["workshop_id"][keep])
+    seen = workshop_codes >= 0
+    stride = max(int(workshop_codes.max()) + 1, 1)
+    distinct_pairs = np.unique(pid[seen] * stride + workshop_codes[seen])
+    distinct_workshops = np.bincount(distinct_pairs // stride, minlength=n_participants)
+    attended = np.maximum(distinct_workshops, participants["workshops_attended"].fillna(0).to_numpy(dtype=np.int64))
+    attended = np.where(has_events, attended, 0)
+
+    department_codes, departments = pd.factorize(participants["department_id"], sort=True)
+    role_codes, roles = pd.factorize(participants["role"], sort=True)
+    return {
+        "cohorts": cohorts[COHORT_COLUMNS],
+        "curve": curve[["months_since", "retention_rate"]],
+        "repeat_by_department": _repeat_rates(
+            np.where(has_events, department_codes, -1), pd.Index(departments), attended, "department_id"
+        ),
+        "repeat_by_role": _repeat_rates(np.where(has_events, role_codes, -1), pd.Index(roles), attended, "role"),
+    }
@@ -0,0 +1,338 @@
+"""
+Mergeable sketches for the approximate KPI mode: distinct participants and score quantiles.
+
+Distinct counts use HyperLogLog. Each participant id is hashed to 64 bits;
+the top ``precision`` bits pick one of ``2**precision`` registers, which keeps
+the longest run of leading zeros seen in the remaining bits. Sketches merge by
+taking the register-wise maximum, so a count over any union of cells costs one
+``max`` over their registers, however many rows are behind them. Survey scores
+are whole numbers from 1 to 5 (see the survey schema), so their quantile
+sketch is a histogram over those five values: it merges by addition and its
+quantiles are exact.
+
+``KpiSketchIndex`` builds both per (department, role, month) cell once per
+loaded dataset. A filter selection merges the cells of the whole months in
+its date range and adds the rows of the partial months at either end, so
+day-level date ranges are honoured and the only approximation left is the
+HyperLogLog error, reported next to each count.
+"""
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import HLL_PRECISION
+from .encoding import label_codes, label_table, lookup_positions
+from .frame_cache import FrameCache
+from .retention import attendance_events
+
+SCORE_METRICS = ("confidence_score", "understanding_responsible_ai", "comfort_with_tools")
+SCORE_VALUES = np.arange(1, 6)
+SURVEY_STAGES = ("pre", "post")
+QUANTILES = {"p25": 0.25, "median": 0.5, "p75": 0.75}
+
+# Error bounds are two-sided 95% intervals of the estimate.
+ERROR_Z = 1.96
+
+
+def hash_ids(values: pd.Series) -> np.ndarray:
+    """Stable 64-bit hash of each id, computed on its text so encoded and plain ids agree; ids must not be missing."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        table = pd.util.hash_array(values.dtype.categories.astype(str).to_numpy(dtype=object))
+        return table.take(values.cat.codes.to_numpy())
+    return pd.util.hash_array(values.astype(str).to_numpy(dtype=object))
+
+
+def _bit_length(words: np.ndarray) -> np.ndarray:
+    length = np.zeros(len(words), dtype=np.int64)
+    words = words.copy()
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = words >= (np.uint64(1) << np.uint64(shift))
+        length += shift * high
+        words[high] >>= np.uint64(shift)
+    return length + (words > 0)
+
+
+def hll_slots(hashes: np.ndarray, precision: int = HLL_PRECISION) -> Tuple[np.ndarray, np.ndarray]:
+    """Register index and rank (leading zeros of the remaining bits, plus one) of each hash."""
+    index = (hashes >> np.uint64(64 - precision)).astype(np.intp)
+    rest = hashes << np.uint64(precision)
+    rank = np.minimum(64 - _bit_length(rest) + 1, 64 - precision + 1)
+    return index, rank.astype(np.uint8)
+
+
+def hll_registers(groups: np.ndarray, n_groups: int, index: np.ndarray, rank: np.ndarray, precision: int = HLL_PRECISION) -> np.ndarray:
+    """One register array per group, from the slots of its rows."""
+    registers = np.zeros((n_groups, 1 << precision), dtype=np.uint8)
+    np.maximum.at(registers, (groups, index), rank)
+    return registers
+
+
+def _sigma(x: float) -> float:
+    if x == 1.0:
+        return float("inf")
+    y, z = 1.0, x
+    while True:
+        x *= x
+        previous, z = z, z + x * y
+        y += y
+        if z == previous:
+            return z
+
+
+def _tau(x: float) -> float:
+    if x == 0.0 or x == 1.0:
+        return 0.0
+    y, z = 1.0, 1.0 - x
+    while True:
+        x = np.sqrt(x)
+        y *= 0.5
+        previous, z = z, z - (1.0 - x) ** 2 * y
+        if z == previous:
+            return z / 3.0
+
+
+def hll_estimate(registers: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Distinct-count estimate of each row of ``registers`` and its 95% error bound.
+
+    Uses Ertl's improved estimator ("New cardinality estimation algorithms for
+    HyperLogLog sketches", 2017), which stays unbiased from tiny to huge counts
+    without the empirical bias tables of HyperLogLog++.
+    """
+    n_rows, m = registers.shape
+    q = 64 - int(np.log2(m))
+    offsets = (np.arange(n_rows) * (q + 2))[:, None]
+    histograms = np.bincount((registers + offsets).ravel(), minlength=n_rows * (q + 2)).reshape(n_rows, q + 2)
+    estimate = np.empty(n_rows)
+    for row, counts in enumerate(histograms):
+        z = m * _tau(1.0 - counts[q + 1] / m)
+        for k in range(q, 0, -1):
+            z = 0.5 * (z + counts[k])
+        z += m * _sigma(counts[0] / m)
+        estimate[row] = m * m / (2 * np.log(2) * z)
+    # While registers are still empty the estimate behaves like linear counting, whose error is far smaller.
+    zeros = histograms[:, 0]
+    load = estimate / m
+    linear_sd = np.sqrt(m * np.maximum(np.exp(load) - load - 1, 0.0))
+    sd = 1.04 / np.sqrt(m) * estimate
+    sd = np.where((zeros > 0) & (estimate <= 2.5 * m), np.minimum(sd, linear_sd), sd)
+    return estimate, ERROR_Z * sd
+
+
+def score_histograms(groups: np.ndarray, n_groups: int, stages: np.ndarray, scores: Iterable[np.ndarray]) -> np.ndarray:
+    """Counts of each score value per (group, survey stage, metric); scores outside 1-5 are ignored."""
+    n_values = len(SCORE_VALUES)
+    counts = np.zeros(n_groups * len(SURVEY_STAGES) * len(SCORE_METRICS) * n_values, dtype=np.int64)
+    for metric, values in enumerate(scores):
+        valid = (values >= SCORE_VALUES[0]) & (values <= SCORE_VALUES[-1])
+        cells = (groups[valid] * len(SURVEY_STAGES) + stages[valid]) * len(SCORE_METRICS) + metric
+        counts += np.bincount(cells * n_values + (values[valid] - SCORE_VALUES[0]), minlength=len(counts))
+    return counts.reshape(n_groups, len(SURVEY_STAGES), len(SCORE_METRICS), n_values)
+
+
+def histogram_quantile(counts: np.ndarray, q: float) -> np.ndarray:
+    """Quantile ``q`` of histograms over ``SCORE_VALUES`` (last axis), as numpy's ``inverted_cdf``; NaN when empty."""
+    cumulative = counts.cumsum(axis=-1)
+    total = cumulative[..., -1:]
+    position = np.argmax(cumulative >= np.maximum(q * total, 1), axis=-1)
+    return np.where(total[..., 0] > 0, SCORE_VALUES[position], np.nan)
+
+
+def quantile_frame(departments: pd.Index, histograms: np.ndarray) -> pd.DataFrame:
+    """One row per (department, stage, metric) with responses: counts and quantiles of its histogram."""
+    n_departments = len(departments)
+    shape = (n_departments, len(SURVEY_STAGES), len(SCORE_METRICS))
+    grid = np.indices(shape).reshape(len(shape), -1)
+    flat = histograms.reshape(-1, len(SCORE_VALUES))
+    responses = flat.sum(axis=1)
+    keep = responses > 0
+    frame = pd.DataFrame(
+        {
+            "department_id": departments.take(grid[0][keep]),
+            "stage": np.asarray(SURVEY_STAGES, dtype=object)[grid[1][keep]],
+            "metric": np.asarray(SCORE_METRICS, dtype=object)[grid[2][keep]],
+            "responses": responses[keep],
+        }
+    )
+    for name, q in QUANTILES.items():
+        frame[name] = histogram_quantile(flat[keep], q)
+    return frame
+
+
+def distinct_frames(departments: pd.Index, counts: np.ndarray, errors: np.ndarray, overall: Tuple[float, float]) -> Dict[str, pd.DataFrame]:
+    """Distinct participants per department (non-zero only) and overall, with error bounds rounded up to whole people."""
+    counts = np.round(counts).astype(np.int64)
+    errors = np.ceil(errors).astype(np.int64)
+    keep = counts > 0
+    return {
+        "by_department": pd.DataFrame({"department_id": departments[keep], "participants": counts[keep], "error": errors[keep]}),
+        "overall": pd.DataFrame({"participants": [int(round(overall[0]))], "error": [int(np.ceil(overall[1]))]}),
+    }
+
+
+def _merge_by_department(values: np.ndarray, departments: np.ndarray, n_departments: int, reduce) -> np.ndarray:
+    """``values`` of department-ordered cells reduced per department with ``reduce`` (a ufunc)."""
+    merged = np.zeros((n_departments,) + values.shape[1:], dtype=values.dtype)
+    if len(values):
+        starts = np.flatnonzero(np.r_[True, departments[1:] != departments[:-1]])
+        merged[departments[starts]] = reduce.reduceat(values, starts, axis=0)
+    return merged
+
+
+class _CellRows:
+    """Rows of one fact table in date order, with their (department, role, month) cell."""
+
+    def __init__(self, dates: np.ndarray, department: np.ndarray, role: np.ndarray, n_departments: int, n_roles: int):
+        self.order = np.argsort(dates, kind="stable")
+        self.dates = dates[self.order]
+        self.department = department[self.order]
+        self.role = role[self.order]
+        self.month = self.dates.astype("datetime64[M]").astype(np.int64)
+        first = self.month.min() if len(self.month) else 0
+        n_months = int(self.month.max() - first + 1) if len(self.month) else 1
+        # Department is the most significant part of the key, so cells come out grouped by department.
+        key = (self.department * n_roles + self.role) * n_months + (self.month - first)
+        keys, self.cell = np.unique(key, return_inverse=True)
+        self.cell_department = keys // (n_roles * n_months)
+        self.cell_role = keys // n_months % n_roles
+        self.cell_month = keys % n_months + first
+
+    def select(self, departments: Optional[np.ndarray], roles: Optional[np.ndarray], start_date, end_date) -> Tuple[np.ndarray, np.ndarray]:
+        """Cells of the whole months in the selection, and the rows of its partial months."""
+        cells = np.ones(len(self.cell_department), dtype=bool)
+        if departments is not None:
+            cells &= departments[self.cell_department]
+        if roles is not None:
+            cells &= roles[self.cell_role]
+        if start_date is None or end_date is None:
+            return np.flatnonzero(cells), np.zeros(0, dtype=np.intp)
+
+        start, end = pd.Timestamp(start_date).normalize(), pd.Timestamp(end_date).normalize()
+        first_full = _month_code(start) + (start.day != 1)
+        last_full = _month_code(end) - ((end + pd.Timedelta(days=1)).day != 1)
+        lo = int(np.searchsorted(self.dates, np.datetime64(start), "left"))
+        hi = int(np.searchsorted(self.dates, np.datetime64(end), "right"))
+        if first_full <= last_full:
+            cells &= (self.cell_month >= first_full) & (self.cell_month <= last_full)
+            inner_lo = int(np.searchsorted(self.month, first_full, "left"))
+            inner_hi = int(np.searchsorted(self.month, last_full, "right"))
+            rows = np.r_[lo:inner_lo, inner_hi:hi]
+        else:
+            cells[:] = False
+            rows = np.arange(lo, max(lo, hi))
+        keep = np.ones(len(rows), dtype=bool)
+        if departments is not None:
+            keep &= departments[self.department[rows]]
+        if roles is not None:
+            keep &= roles[self.role[rows]]
+        return np.flatnonzero(cells), rows[keep]
+
+
+def _month_code(timestamp: pd.Timestamp) -> int:
+    return int(np.datetime64(timestamp, "M").astype(np.int64))
+
+
+class KpiSketchIndex:
+    def __init__(
+        self,
+        events_df: pd.DataFrame,
+        pre_df: pd.DataFrame,
+        post_df: pd.DataFrame,
+        participants_df: pd.DataFrame,
+        precision: int = HLL_PRECISION,
+    ):
+        self.precision = precision
+        department, self.departments = label_codes(participants_df["department_id"])
+        role, self.roles = label_codes(participants_df["role"])
+
+        def facts(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+            rows = lookup_positions(participants_df["participant_id"], df["participant_id"])
+            keep = (rows >= 0) & ~np.isnat(df["date"].to_numpy())
+            rows = np.where(keep, rows, 0)
+            keep &= (department[rows] >= 0) & (role[rows] >= 0)
+            return np.flatnonzero(keep), rows
+
+        n_departments, n_roles = len(self.departments), len(self.roles)
+        kept, rows = facts(events_df)
+        self.events = _CellRows(
+            events_df["date"].to_numpy()[kept], department[rows[kept]], role[rows[kept]], n_departments, n_roles
+        )
+        index, rank = hll_slots(hash_ids(events_df["participant_id"].iloc[kept]), precision)
+        self.event_index, self.event_rank = index[self.events.order], rank[self.events.order]
+        self.registers = hll_registers(
+            self.events.cell, len(self.events.cell_department), self.event_index, self.event_rank, precision
+        )
+
+        surveys = pd.concat([pre_df, post_df], ignore_index=True)
+        kept, rows = facts(surveys)
+        self.surveys = _CellRows(
+            surveys["date"].to_numpy()[kept], department[rows[kept]], role[rows[kept]], n_departments, n_roles
+        )
+        order = kept[self.surveys.order]
+        self.survey_stage = (order >= len(pre_df)).astype(np.int64)
+        self.survey_scores = [surveys[metric].to_numpy(dtype=np.int64)[order] for metric in SCORE_METRICS]
+        self.histograms = score_histograms(
+            self.surveys.cell, len(self.surveys.cell_department), self.survey_stage, self.survey_scores
+        )
+
+    def _tables(self, department_ids, roles):
+        return label_table(self.departments, department_ids), label_table(self.roles, roles)
+
+    def distinct_participants(
+        self,
+        department_ids: Optional[Iterable[str]] = None,
+        roles: Optional[Iterable[str]] = None,
+        start_date=None,
+        end_date=None,
+    ) -> Dict[str, pd.DataFrame]:
+        """Estimated distinct active participants per department and overall, with 95% error bounds."""
+        cells, rows = self.events.select(*self._tables(department_ids, roles), start_date, end_date)
+        merged = _merge_by_department(
+            self.registers[cells], self.events.cell_department[cells], len(self.departments), np.maximum
+        )
+        np.maximum.at(merged, (self.events.department[rows], self.event_index[rows]), self.event_rank[rows])
+        counts, errors = hll_estimate(merged)
+        overall = hll_estimate(merged.max(axis=0, keepdims=True))
+        return distinct_frames(self.departments, counts, errors, (overall[0][0], overall[1][0]))
+
+    def score_quantiles(
+        self,
+        department_ids: Optional[Iterable[str]] = None,
+        roles: Optional[Iterable[str]] = None,
+        start_date=None,
+        end_date=None,
+    ) -> pd.DataFrame:
+        """Pre and post score quantiles per department, merged from the cell histograms."""
+        cells, rows = self.surveys.select(*self._tables(department_ids, roles), start_date, end_date)
+        merged = _merge_by_department(
+            self.histograms[cells], self.surveys.cell_department[cells], len(self.departments), np.add
+        )
+        merged += score_histograms(
+            self.surveys.department[rows],
+            len(self.departments),
+            self.survey_stage[rows],
+            [scores[rows] for scores in self.survey_scores],
+        )
+        return quantile_frame(self.departments, merged)
+
+
+# Indexes built per loaded dataset, dropped with its frames.
+_INDEXES = FrameCache()
+
+
+def kpi_sketch_index(
+    workshops_df: pd.DataFrame,
+    participants_df: pd.DataFrame,
+    pre_df: pd.DataFrame,
+    post_df: pd.DataFrame,
+    reflections_df: pd.DataFrame,
+    precision: int = HLL_PRECISION,
+) -> KpiSketchIndex:
+    """Sketches of a dataset's participation events (as in ``src/retention.py``) and survey scores."""
+
+    def build() -> KpiSketchIndex:
+        events = attendance_events(workshops_df, participants_df, pre_df, post_df, reflections_df)
+        return KpiSketchIndex(events, pre_df, post_df, participants_df, precision)
+
+    return _INDEXES.get_or_build((workshops_df, participants_df, pre_df, post_df, reflections_df), build, precision)
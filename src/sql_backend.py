@@ -0,0 +1,361 @@
+"""
+DuckDB implementation of the dashboard KPIs.
+
+Tables are exposed as views over the dataset files (Parquet when a
+``<name>.parquet`` file sits next to the CSV, CSV otherwise), so only the
+columns and rows a query needs are read. Filters are pushed into the SQL
+``WHERE`` clauses and each method returns the same DataFrame shapes as the
+matching function in ``kpi_calculations``.
+"""
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from .bootstrap import bootstrap_learning_impact
+from .config import SURVEY_DUPLICATE_POLICY
+from .data_loader import DATA_DIR
+from .kpi_calculations import ADOPTION_MAPPING
+from .survey_pairing import DUPLICATE_POLICIES
+
+TABLE_FILES = {
+    "workshops": "workshops",
+    "participants": "participants",
+    "confidence_pre": "confidence_surveys_pre",
+    "confidence_post": "confidence_surveys_post",
+    "reflections": "reflections",
+    "departments": "departments",
+}
+
+IMPACT_METRICS = ["confidence_score", "understanding_responsible_ai"]
+
+
+def _source_expression(data_dir: Path, stem: str) -> str:
+    parquet_path = data_dir / f"{stem}.parquet"
+    if parquet_path.exists():
+        return f"read_parquet('{parquet_path.as_posix()}')"
+    return f"read_csv_auto('{(data_dir / f'{stem}.csv').as_posix()}')"
+
+
+class _Where:
+    """Collects SQL predicates and their bound parameters."""
+
+    def __init__(self):
+        self.clauses: List[str] = []
+        self.params: List[object] = []
+
+    def values_in(self, column: str, values: Optional[Iterable[str]]) -> "_Where":
+        values = list(values) if values else []
+        if values:
+            self.clauses.append(f"{column} IN ({', '.join('?' for _ in values)})")
+            self.params.extend(values)
+        return self
+
+    def date_between(self, column: str, start_date, end_date) -> "_Where":
+        if start_date is not None and end_date is not None:
+            self.clauses.append(f"{column} BETWEEN ? AND ?")
+            self.params.extend([pd.to_datetime(start_date).date(), pd.to_datetime(end_date).date()])
+        return self
+
+    def sql(self) -> str:
+        return f"WHERE {' AND '.join(self.clauses)}" if self.clauses else ""
+
+
+class SqlKpiBackend:
+    def __init__(self, data_dir: Path = DATA_DIR, duplicate_policy: str = SURVEY_DUPLICATE_POLICY):
+        if duplicate_policy not in DUPLICATE_POLICIES:
+            raise ValueError(f"Unsupported duplicate policy: {duplicate_policy}")
+        self.data_dir = Path(data_dir)
+        self.duplicate_policy = duplicate_policy
+        self.con = duckdb.connect(database=":memory:")
+        for table, stem in TABLE_FILES.items():
+            self.con.execute(
+                f"CREATE VIEW {table} AS "
+                f"SELECT *, row_number() OVER () AS _row FROM {_source_expression(self.data_dir, stem)}"
+            )
+
+    def _query(self, sql: str, params: Optional[List[object]] = None) -> pd.DataFrame:
+        # A cursor per query lets sessions and warm-up threads share the backend safely.
+        with self.con.cursor() as cursor:
+            return cursor.execute(sql, params or []).fetchdf()
+
+    def _scalar(self, sql: str, params: Optional[List[object]] = None):
+        with self.con.cursor() as cursor:
+            return cursor.execute(sql, params or []).fetchone()[0]
+
+    def compute_ai_adoption_index(
+        self,
+        filtered_department_ids: Optional[Iterable[str]] = None,
+        filtered_roles: Optional[Iterable[str]] = None,
+    ) -> Tuple[pd.DataFrame, float]:
+        participant_where = (
+            _Where().values_in("department_id", filtered_department_ids).values_in("role", filtered_roles)
+        )
+        dept_where = _Where().values_in("d.department_id", filtered_department_ids)
+        participant_count = self._scalar(
+            f"SELECT count(*) FROM participants {participant_where.sql()}", participant_where.params
+        )
+        mapping_sql = " ".join(f"WHEN '{level}' THEN {value}" for level, value in ADOPTION_MAPPING.items())
+        merged = self._query(
+            f"""
+            WITH adoption AS (
+                SELECT department_id, avg(CASE adoption_level {mapping_sql} END) AS adoption_numeric
+                FROM participants {participant_where.sql()}
+                GROUP BY department_id
+            )
+            SELECT d.department_id, d.department_name,
+                   (d.current_readiness_score * 0.4
+                    + d.training_coverage_rate * 0.35
+                    + coalesce(a.adoption_numeric, 0) * 0.25) * 100 AS adoption_index
+            FROM departments d LEFT JOIN adoption a USING (department_id)
+            {dept_where.sql()}
+            ORDER BY d._row
+            """,
+            participant_where.params + dept_where.params,
+        )
+        if participant_count == 0 or merged.empty:
+            return pd.DataFrame(columns=["department_id", "department_name", "adoption_index"]), 0.0
+        merged["adoption_index"] = merged["adoption_index"].round(1)
+        overall = merged["adoption_index"].mean().round(1)
+        return merged[["department_id", "department_name", "adoption_index"]], overall
+
+    def _deduplicated_responses(self, table: str) -> str:
+        """One response per (participant_id, workshop_id), resolved by the configured duplicate policy."""
+        order = "_row DESC" if self.duplicate_policy == "last" else "_row"
+        window = "PARTITION BY participant_id, workshop_id"
+        if self.duplicate_policy == "mean":
+            metrics = ", ".join(f"avg({m}) OVER ({window}) AS {m}" for m in IMPACT_METRICS)
+        else:
+            metrics = ", ".join(IMPACT_METRICS)
+        return f"""
+            SELECT participant_id, workshop_id, date, {metrics}
+            FROM {table}
+            QUALIFY row_number() OVER ({window} ORDER BY {order}) = 1
+        """
+
+    def _survey_pairs(
+        self,
+        filtered_department_ids: Optional[Iterable[str]],
+        filtered_roles: Optional[Iterable[str]],
+        start_date,
+        end_date,
+    ) -> Tuple[str, List[object]]:
+        """SQL for pre/post responses joined on (participant_id, workshop_id), filters applied per side."""
+        sides = []
+        params: List[object] = []
+        for table in ["confidence_pre", "confidence_post"]:
+            where = (
+                _Where()
+                .date_between("c.date", start_date, end_date)
+                .values_in("p.department_id", filtered_department_ids)
+                .values_in("p.role", filtered_roles)
+            )
+            sides.append(
+                f"""
+                SELECT c.participant_id, c.workshop_id, {', '.join(f'c.{m}' for m in IMPACT_METRICS)},
+                       p.department_id, p.role
+                FROM ({self._deduplicated_responses(table)}) c LEFT JOIN participants p USING (participant_id)
+                {where.sql()}
+                """
+            )
+            params.extend(where.params)
+        metric_columns = ", ".join(f"pre.{m} AS {m}_pre, post.{m} AS {m}_post" for m in IMPACT_METRICS)
+        sql = f"""
+            WITH pre AS ({sides[0]}), post AS ({sides[1]})
+            SELECT participant_id, workshop_id, {metric_columns},
+                   coalesce(pre.department_id, post.department_id) AS department_id,
+                   coalesce(pre.role, post.role) AS role
+            FROM pre JOIN post USING (participant_id, workshop_id)
+        """
+        return sql, params
+
+    def compute_learning_impact(
+        self,
+        filtered_department_ids: Optional[Iterable[str]] = None,
+        filtered_roles: Optional[Iterable[str]] = None,
+        start_date=None,
+        end_date=None,
+        bootstrap_resamples: int = 0,
+    ) -> Dict[str, pd.DataFrame]:
+        """Pre/post change over matched survey pairs; intervals only when ``bootstrap_resamples`` > 0."""
+        pairs_sql, params = self._survey_pairs(filtered_department_ids, filtered_roles, start_date, end_date)
+        return {
+            "summary": self._impact_summary(pairs_sql, params),
+            "by_department": self._breakdown(pairs_sql, params, "department_id"),
+            "by_role": self._breakdown(pairs_sql, params, "role"),
+            "intervals": bootstrap_learning_impact(self._query(pairs_sql, params), n_resamples=bootstrap_resamples),
+        }
+
+    def _impact_summary(self, pairs_sql: str, params: List[object]) -> pd.DataFrame:
+        aggregates = ", ".join(
+            f"avg({m}_pre) AS {m}_pre_mean, avg({m}_post) AS {m}_post_mean, "
+            f"stddev_samp({m}_pre) AS {m}_pre_std, stddev_samp({m}_post) AS {m}_post_std"
+            for m in IMPACT_METRICS
+        )
+        stats = self._query(f"SELECT count(*) AS n, {aggregates} FROM ({pairs_sql})", params).iloc[0]
+        if stats["n"] == 0:
+            return pd.DataFrame(columns=["group", "metric", "pre_mean", "post_mean", "delta", "effect_size"])
+        rows = []
+        for metric in IMPACT_METRICS:
+            pre_mean = stats[f"{metric}_pre_mean"]
+            post_mean = stats[f"{metric}_post_mean"]
+            delta = post_mean - pre_mean
+            pooled_std = np.sqrt(((stats[f"{metric}_pre_std"] ** 2) + (stats[f"{metric}_post_std"] ** 2)) / 2)
+            effect_size = delta / pooled_std if pooled_std > 0 else 0
+            rows.append(
+                {
+                    "group": "overall",
+                    "metric": metric,
+                    "pre_mean": round(pre_mean, 2),
+                    "post_mean": round(post_mean, 2),
+                    "delta": round(delta, 2),
+                    "effect_size": round(effect_size, 2),
+                }
+            )
+        return pd.DataFrame(rows)
+
+    def _breakdown(self, pairs_sql: str, params: List[object], group_field: str) -> pd.DataFrame:
+        aggregates = ", ".join(f"avg({m}_pre) AS {m}_pre, avg({m}_post) AS {m}_post" for m in IMPACT_METRICS)
+        grouped = self._query(
+            f"""
+            SELECT {group_field}, {aggregates} FROM ({pairs_sql})
+            WHERE {group_field} IS NOT NULL
+            GROUP BY {group_field} ORDER BY {group_field}
+            """,
+            params,
+        )
+        if grouped.empty:
+            return pd.DataFrame(columns=[group_field, "metric", "delta"])
+        records = []
+        for _, row in grouped.iterrows():
+            for metric in IMPACT_METRICS:
+                pre_mean = row[f"{metric}_pre"]
+                post_mean = row[f"{metric}_post"]
+                records.append(
+                    {
+                        group_field: row[group_field],
+                        "metric": metric,
+                        "delta": round(post_mean - pre_mean, 2),
+                        "post_mean": round(post_mean, 2),
+                        "pre_mean": round(pre_mean, 2),
+                    }
+                )
+        return pd.DataFrame(records)
+
+    def compute_training_coverage(
+        self, filtered_department_ids: Optional[Iterable[str]] = None
+    ) -> Tuple[pd.DataFrame, float]:
+        where = _Where().values_in("department_id", filtered_department_ids)
+        df = self._query(
+            f"SELECT department_id, department_name, training_coverage_rate FROM departments {where.sql()} ORDER BY _row",
+            where.params,
+        )
+        if df.empty:
+            return pd.DataFrame(columns=["department_id", "department_name", "training_coverage_rate"]), 0.0
+        return df, round(df["training_coverage_rate"].mean(), 2)
+
+    def compute_workshop_engagement(
+        self,
+        filtered_department_ids: Optional[Iterable[str]] = None,
+        filtered_audiences: Optional[Iterable[str]] = None,
+        start_date=None,
+        end_date=None,
+    ) -> Dict[str, pd.DataFrame]:
+        where = (
+            _Where()
+            .date_between("date", start_date, end_date)
+            .values_in("department_id", filtered_department_ids)
+            .values_in("audience", filtered_audiences)
+        )
+        filtered = f"SELECT * FROM workshops {where.sql()}"
+        count = self._scalar(f"SELECT count(*) FROM ({filtered})", where.params)
+        if count == 0:
+            return {
+                "timeseries": pd.DataFrame(columns=["month", "attendances"]),
+                "by_format": pd.DataFrame(columns=["format", "attendances"]),
+                "by_audience": pd.DataFrame(columns=["audience", "attendances"]),
+                "completion": pd.DataFrame(columns=["metric", "value"]),
+            }
+
+        timeseries = self._query(
+            f"""
+            SELECT CAST(date_trunc('month', date) AS TIMESTAMP) AS month, CAST(sum(attendances) AS BIGINT) AS attendances
+            FROM ({filtered}) GROUP BY month ORDER BY month
+            """,
+            where.params,
+        )
+        by_format = self._query(
+            f"SELECT format, CAST(sum(attendances) AS BIGINT) AS attendances FROM ({filtered}) GROUP BY format ORDER BY format",
+            where.params,
+        )
+        by_audience = self._query(
+            f"SELECT audience, CAST(sum(attendances) AS BIGINT) AS attendances FROM ({filtered}) GROUP BY audience ORDER BY audience",
+            where.params,
+        )
+        average_completion = self._scalar(f"SELECT avg(completion_rate) FROM ({filtered})", where.params)
+        completion = pd.DataFrame({"metric": ["average_completion"], "value": [round(average_completion, 2)]})
+        return {
+            "timeseries": timeseries,
+            "by_format": by_format,
+            "by_audience": by_audience,
+            "completion": completion,
+        }
+
+    def compute_reflection_sentiment(
+        self,
+        filtered_department_ids: Optional[Iterable[str]] = None,
+        filtered_roles: Optional[Iterable[str]] = None,
+        start_date=None,
+        end_date=None,
+    ) -> Dict[str, pd.DataFrame]:
+        where = (
+            _Where()
+            .date_between("r.date", start_date, end_date)
+            .values_in("p.department_id", filtered_department_ids)
+            .values_in("p.role", filtered_roles)
+        )
+        filtered = f"""
+            SELECT r.sentiment, r.theme FROM reflections r
+            LEFT JOIN participants p USING (participant_id) {where.sql()}
+        """
+        sentiment = self._query(
+            f"""
+            SELECT sentiment, count(*) AS count FROM ({filtered})
+            WHERE sentiment IS NOT NULL GROUP BY sentiment ORDER BY sentiment
+            """,
+            where.params,
+        )
+        if sentiment.empty:
+            return {
+                "sentiment": pd.DataFrame(columns=["sentiment", "count"]),
+                "themes": pd.DataFrame(columns=["theme", "count"]),
+            }
+        themes = self._query(
+            f"SELECT theme, count(*) AS count FROM ({filtered}) WHERE theme IS NOT NULL GROUP BY theme ORDER BY theme",
+            where.params,
+        )
+        return {"sentiment": sentiment, "themes": themes}
+
+    def compute_readiness_matrix(self, filtered_department_ids: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        columns = [
+            "department_id",
+            "department_name",
+            "training_coverage_rate",
+            "current_readiness_score",
+            "participant_count",
+        ]
+        where = _Where().values_in("department_id", filtered_department_ids)
+        df = self._query(
+            f"""
+            SELECT department_id, department_name, training_coverage_rate, current_readiness_score
+            FROM departments {where.sql()} ORDER BY _row
+            """,
+            where.params,
+        )
+        if df.empty:
+            return pd.DataFrame(columns=columns)
+        # lightweight synthetic participant count for bubble sizing
+        df["participant_count"] = np.random.randint(80, 260, size=len(df))
+        return df[columns]
@@ -0,0 +1,148 @@
+"""
+Pre/post survey pairing index.
+
+Responses are matched on (participant_id, workshop_id). Both key columns are
+integer-coded once across the two survey tables and combined into a single
+int64 key. Duplicate responses for a key are resolved on each side by a
+policy (keep the first or last response, or average the scores), so a
+repeated submission can no longer multiply pairs. The index is built once
+per loaded dataset; KPI code reads matched pairs from it and narrows them
+with ``select``.
+"""
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import SURVEY_DUPLICATE_POLICY
+from .encoding import lookup_positions
+from .frame_cache import FrameCache
+
+PAIR_KEYS = ["participant_id", "workshop_id"]
+SURVEY_METRICS = ["confidence_score", "understanding_responsible_ai", "comfort_with_tools"]
+DUPLICATE_POLICIES = ("first", "last", "mean")
+
+
+def _column_codes(pre: pd.Series, post: pd.Series) -> Tuple[np.ndarray, int]:
+    """Integer codes for one id column across both sides, and the number of distinct ids (-1 marks missing)."""
+    if isinstance(pre.dtype, pd.CategoricalDtype) and pre.dtype == post.dtype:
+        # Dictionary-encoded ids (src/encoding.py) already share codes across tables.
+        return np.concatenate([pre.cat.codes.to_numpy(), post.cat.codes.to_numpy()]), len(pre.dtype.categories)
+    codes, uniques = pd.factorize(pd.concat([pre, post], ignore_index=True))
+    return codes, len(uniques)
+
+
+def _key_codes(pre_df: pd.DataFrame, post_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """One int64 code per (participant_id, workshop_id), shared by both sides; -1 when either id is missing."""
+    participant_codes, _ = _column_codes(pre_df["participant_id"], post_df["participant_id"])
+    workshop_codes, n_workshops = _column_codes(pre_df["workshop_id"], post_df["workshop_id"])
+    codes = participant_codes.astype(np.int64) * max(n_workshops, 1) + workshop_codes
+    codes[(participant_codes < 0) | (workshop_codes < 0)] = -1
+    return codes[: len(pre_df)], codes[len(pre_df) :]
+
+
+def _resolve_duplicates(
+    df: pd.DataFrame, codes: np.ndarray, policy: str, metrics: Iterable[str]
+) -> Tuple[pd.DataFrame, np.ndarray, int]:
+    """One row per key (keyless rows pass through), plus the number of duplicate rows folded away."""
+    keyed = codes >= 0
+    duplicated = pd.Series(codes).duplicated(keep=False).to_numpy() & keyed
+    keep = ~pd.Series(codes).duplicated(keep="last" if policy == "last" else "first").to_numpy() | ~keyed
+    resolved = df.loc[keep].copy()
+    if policy == "mean" and duplicated.any():
+        metrics = list(metrics)
+        means = df.loc[keyed, metrics].astype(float).groupby(codes[keyed]).mean()
+        resolved_codes = codes[keep]
+        has_key = resolved_codes >= 0
+        resolved[metrics] = resolved[metrics].astype(float)
+        resolved.loc[has_key, metrics] = means.reindex(resolved_codes[has_key]).to_numpy()
+    return resolved.reset_index(drop=True), codes[keep], int(np.count_nonzero(duplicated) - len(np.unique(codes[duplicated])))
+
+
+class SurveyPairIndex:
+    def __init__(
+        self,
+        pre_df: pd.DataFrame,
+        post_df: pd.DataFrame,
+        participants_df: Optional[pd.DataFrame] = None,
+        duplicate_policy: str = SURVEY_DUPLICATE_POLICY,
+    ):
+        if duplicate_policy not in DUPLICATE_POLICIES:
+            raise ValueError(f"Unsupported duplicate policy: {duplicate_policy}")
+        self.duplicate_policy = duplicate_policy
+        self.metrics = [m for m in SURVEY_METRICS if m in pre_df.columns and m in post_df.columns]
+        pre_codes, post_codes = _key_codes(pre_df, post_df)
+        pre, pre_codes, self.duplicate_pre = _resolve_duplicates(pre_df, pre_codes, duplicate_policy, self.metrics)
+        post, post_codes, self.duplicate_post = _resolve_duplicates(post_df, post_codes, duplicate_policy, self.metrics)
+
+        keyed_post = np.flatnonzero(post_codes >= 0)
+        found = pd.Index(post_codes[keyed_post]).get_indexer(pre_codes)
+        matched = (found >= 0) & (pre_codes >= 0)
+        post_position = np.where(matched, keyed_post[np.maximum(found, 0)], -1)
+        pre_rows = np.flatnonzero(matched)
+        post_rows = post_position[matched]
+
+        # Take keeps the id columns' dtype, so dictionary-encoded ids stay encoded in the pairs.
+        pairs = {key: pre[key].array.take(pre_rows) for key in PAIR_KEYS}
+        if "date" in pre.columns and "date" in post.columns:
+            pairs["date_pre"] = pre["date"].to_numpy()[pre_rows]
+            pairs["date_post"] = post["date"].to_numpy()[post_rows]
+        for metric in self.metrics:
+            pairs[f"{metric}_pre"] = pre[metric].to_numpy()[pre_rows]
+            pairs[f"{metric}_post"] = post[metric].to_numpy()[post_rows]
+        self.pairs = pd.DataFrame(pairs)
+        if participants_df is not None:
+            people = participants_df.drop_duplicates("participant_id")
+            positions = lookup_positions(people["participant_id"], self.pairs["participant_id"])
+            for column in ("department_id", "role"):
+                self.pairs[column] = people[column].array.take(positions, allow_fill=True)
+
+        post_matched = np.zeros(len(post), dtype=bool)
+        post_matched[post_rows] = True
+        self.unmatched_pre = pre.loc[~matched].reset_index(drop=True)
+        self.unmatched_post = post.loc[~post_matched].reset_index(drop=True)
+
+    def select(
+        self,
+        start_date=None,
+        end_date=None,
+        department_ids: Optional[Iterable[str]] = None,
+        roles: Optional[Iterable[str]] = None,
+    ) -> pd.DataFrame:
+        """Matched pairs whose pre and post responses both fall in the date range, for the given departments/roles."""
+        mask = np.ones(len(self.pairs), dtype=bool)
+        if start_date is not None and end_date is not None and "date_pre" in self.pairs.columns:
+            start, end = pd.to_datetime(start_date), pd.to_datetime(end_date)
+            for column in ("date_pre", "date_post"):
+                mask &= ((self.pairs[column] >= start) & (self.pairs[column] <= end)).to_numpy()
+        if department_ids and "department_id" in self.pairs.columns:
+            mask &= self.pairs["department_id"].isin(list(department_ids)).to_numpy()
+        if roles and "role" in self.pairs.columns:
+            mask &= self.pairs["role"].isin(list(roles)).to_numpy()
+        return self.pairs.loc[mask].reset_index(drop=True)
+
+    def report(self) -> pd.DataFrame:
+        matched = len(self.pairs)
+        return pd.DataFrame(
+            [
+                {"side": "pre", "matched": matched, "unmatched": len(self.unmatched_pre), "duplicates_resolved": self.duplicate_pre},
+                {"side": "post", "matched": matched, "unmatched": len(self.unmatched_post), "duplicates_resolved": self.duplicate_post},
+            ]
+        )
+
+
+# Indexes built per loaded dataset, dropped with its frames.
+_INDEXES = FrameCache()
+
+
+def survey_pair_index(
+    pre_df: pd.DataFrame,
+    post_df: pd.DataFrame,
+    participants_df: pd.DataFrame,
+    duplicate_policy: str = SURVEY_DUPLICATE_POLICY,
+) -> SurveyPairIndex:
+    return _INDEXES.get_or_build(
+        (pre_df, post_df, participants_df),
+        lambda: SurveyPairIndex(pre_df, post_df, participants_df, duplicate_policy),
+        duplicate_policy,
+    )
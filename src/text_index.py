@@ -0,0 +1,193 @@
+"""
+Inverted index over reflection text.
+
+Postings are stored as flat NumPy arrays sorted by (term, row, position),
+so term lookups are two binary searches and boolean/phrase queries reduce to
+sorted-array set operations rather than substring scans over every row.
+
+Query syntax: whitespace-separated terms must all match, ``OR`` between two
+terms accepts either, a leading ``-`` (or ``NOT``) excludes a term, and
+double quotes match an exact phrase, e.g. ``"academic integrity" -policy``.
+"""
+import re
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .frame_cache import FrameCache
+
+TOKEN_PATTERN = r"[a-z0-9]+(?:'[a-z0-9]+)?"
+
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from has have i in is it its more my of on or our so that the "
+    "their them this to was we were what when with".split()
+)
+
+_QUERY_PATTERN = re.compile(r'(-?)"([^"]*)"|(\S+)')
+
+
+def tokenize(text: str) -> List[str]:
+    return re.findall(TOKEN_PATTERN, text.lower())
+
+
+def _token_postings(texts: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Row position, position within the row, and token of every token in ``texts``."""
+    tokens = pd.Series(texts.fillna("").astype(str).str.lower().str.findall(TOKEN_PATTERN).to_numpy())
+    exploded = tokens.explode().dropna()
+    rows = exploded.index.to_numpy(dtype=np.int64)
+    positions = exploded.groupby(level=0).cumcount().to_numpy(dtype=np.int64)
+    return rows, positions, exploded.to_numpy(dtype=object)
+
+
+class ReflectionTextIndex:
+    def __init__(self, texts: pd.Series):
+        rows, positions, terms = _token_postings(texts)
+        codes, vocabulary = pd.factorize(terms, sort=True)
+        self._set_postings(texts.index, pd.Index(vocabulary), codes, rows, positions)
+
+    def _set_postings(self, labels: pd.Index, vocabulary: pd.Index, codes: np.ndarray, rows: np.ndarray, positions: np.ndarray) -> None:
+        self.labels = labels
+        self.n_docs = len(labels)
+
+        order = np.lexsort((positions, rows, codes))
+        self.vocabulary = vocabulary
+        self.term_codes = codes[order]
+        self.rows = rows[order]
+        self.positions = positions[order]
+        self.offsets = np.searchsorted(self.term_codes, np.arange(len(self.vocabulary) + 1))
+        self.position_stride = int(self.positions.max()) + 1 if len(self.positions) else 1
+
+        # One entry per (term, reflection) pair for document-frequency tables.
+        keep = np.ones(len(self.rows), dtype=bool)
+        keep[1:] = (self.term_codes[1:] != self.term_codes[:-1]) | (self.rows[1:] != self.rows[:-1])
+        self.doc_terms = self.term_codes[keep]
+        self.doc_rows = self.rows[keep]
+
+    def updated(self, texts: pd.Series, changed_rows: np.ndarray) -> "ReflectionTextIndex":
+        """
+        Index of ``texts`` in which only ``changed_rows`` (row positions) are tokenized again.
+
+        Every other row must hold the same text as in this index, and rows
+        beyond this index's length count as changed. The vocabularies are
+        merged and the existing postings recoded, so unchanged rows are not
+        tokenized twice.
+        """
+        changed_rows = np.union1d(np.asarray(changed_rows, dtype=np.int64), np.arange(self.n_docs, len(texts)))
+        rows, positions, terms = _token_postings(texts.iloc[changed_rows])
+        rows = changed_rows[rows]
+        kept = ~np.isin(self.rows, changed_rows)
+        vocabulary = self.vocabulary.union(pd.Index(pd.unique(terms)))
+        codes = np.concatenate(
+            [vocabulary.get_indexer(self.vocabulary)[self.term_codes[kept]], vocabulary.get_indexer(terms)]
+        )
+        index = ReflectionTextIndex.__new__(ReflectionTextIndex)
+        index._set_postings(
+            texts.index,
+            vocabulary,
+            codes,
+            np.concatenate([self.rows[kept], rows]),
+            np.concatenate([self.positions[kept], positions]),
+        )
+        return index
+
+    def _postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        code = self.vocabulary.get_indexer([term])[0]
+        if code < 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        start, stop = self.offsets[code], self.offsets[code + 1]
+        return self.rows[start:stop], self.positions[start:stop]
+
+    def term_rows(self, term: str) -> np.ndarray:
+        return np.unique(self._postings(term)[0])
+
+    def phrase_rows(self, terms: List[str]) -> np.ndarray:
+        if not terms:
+            return np.empty(0, dtype=np.int64)
+        if len(terms) == 1:
+            return self.term_rows(terms[0])
+        # Shift each term onto the position of the phrase's last term so consecutive terms share a key;
+        # the stride leaves room for the shift, so keys never run into the next row.
+        stride = self.position_stride + len(terms) - 1
+        keys = None
+        for offset, term in enumerate(terms):
+            rows, positions = self._postings(term)
+            term_keys = rows * stride + positions + (len(terms) - 1 - offset)
+            keys = term_keys if keys is None else np.intersect1d(keys, term_keys, assume_unique=True)
+            if not len(keys):
+                break
+        return np.unique(keys // stride)
+
+    def search(self, query: str) -> np.ndarray:
+        """Return sorted positional row ids of reflections matching ``query``."""
+        required: List[List[List[str]]] = []
+        excluded: List[List[str]] = []
+        join_next = False
+        negate_next = False
+        for match in _QUERY_PATTERN.finditer(query):
+            negated, phrase, word = match.groups()
+            if word is not None:
+                if word == "OR":
+                    join_next = bool(required)
+                    continue
+                if word == "NOT":
+                    negate_next = True
+                    continue
+                negated, phrase = ("-", word[1:]) if word.startswith("-") and len(word) > 1 else ("", word)
+            terms = tokenize(phrase)
+            if not terms:
+                continue
+            if negated or negate_next:
+                excluded.append(terms)
+            elif join_next:
+                required[-1].append(terms)
+            else:
+                required.append([terms])
+            join_next = negate_next = False
+
+        if not required and not excluded:
+            return np.empty(0, dtype=np.int64)
+        result = np.arange(self.n_docs, dtype=np.int64) if not required else None
+        for alternatives in required:
+            clause_rows = np.unique(np.concatenate([self.phrase_rows(terms) for terms in alternatives]))
+            result = clause_rows if result is None else np.intersect1d(result, clause_rows, assume_unique=True)
+        for terms in excluded:
+            result = np.setdiff1d(result, self.phrase_rows(terms), assume_unique=True)
+        return result
+
+    def labels_for(self, rows: np.ndarray) -> pd.Index:
+        return self.labels.take(rows)
+
+    def term_frequencies(self, rows: Optional[np.ndarray] = None, top_n: Optional[int] = 20) -> pd.DataFrame:
+        """Number of reflections containing each term, optionally restricted to ``rows``."""
+        if rows is None:
+            doc_terms = self.doc_terms
+        else:
+            selected = np.zeros(self.n_docs, dtype=bool)
+            selected[rows] = True
+            doc_terms = self.doc_terms[selected[self.doc_rows]]
+        counts = np.bincount(doc_terms, minlength=len(self.vocabulary))
+        frequencies = pd.DataFrame({"term": self.vocabulary, "reflections": counts})
+        frequencies = frequencies[(frequencies["reflections"] > 0) & ~frequencies["term"].isin(STOP_WORDS)]
+        frequencies = frequencies.sort_values(["reflections", "term"], ascending=[False, True], kind="stable")
+        if top_n is not None:
+            frequencies = frequencies.head(top_n)
+        return frequencies.reset_index(drop=True)
+
+
+def build_reflection_index(reflections_df: pd.DataFrame) -> ReflectionTextIndex:
+    return ReflectionTextIndex(reflections_df["reflection_text"])
+
+
+# Indexes built per loaded dataset, dropped with its reflections frame.
+_INDEXES = FrameCache()
+
+
+def store_reflection_index(reflections_df: pd.DataFrame, index: ReflectionTextIndex) -> ReflectionTextIndex:
+    """Cache ``index`` for the frame unless one is cached already; returns the cached index."""
+    return _INDEXES.store((reflections_df,), index)
+
+
+def reflection_index(reflections_df: pd.DataFrame) -> ReflectionTextIndex:
+    return _INDEXES.get_or_build((reflections_df,), lambda: build_reflection_index(reflections_df))
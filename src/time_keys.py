@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+# Academic terms by calendar month: Spring (Jan-May), Summer (Jun-Jul), Fall (Aug-Dec).
+_TERM_START_MONTH = np.array([0, 1, 1, 1, 1, 1, 1, 6, 6, 8, 8, 8, 8])
+_TERM_NAMES = {1: "Spring", 6: "Summer", 8: "Fall"}
+
+PERIOD_FREQUENCIES = ("month", "term")
+
+
+def month_start(dates: pd.Series) -> pd.Series:
+    return dates.dt.to_period("M").dt.to_timestamp()
+
+
+def term_start(dates: pd.Series) -> pd.Series:
+    """First day of the academic term containing each date."""
+    start_month = _TERM_START_MONTH[dates.dt.month.fillna(0).astype(int).to_numpy()]
+    starts = pd.to_datetime(
+        {"year": dates.dt.year.fillna(1970).astype(int), "month": np.maximum(start_month, 1), "day": 1}
+    )
+    return starts.where(dates.notna())
+
+
+def term_label(starts: pd.Series) -> pd.Series:
+    return starts.dt.month.map(_TERM_NAMES) + " " + starts.dt.year.astype(str)
+
+
+def period_start(dates: pd.Series, freq: str = "month") -> pd.Series:
+    if freq == "month":
+        return month_start(dates)
+    if freq == "term":
+        return term_start(dates)
+    raise ValueError(f"Unsupported period frequency: {freq}")
@@ -1,22 +1,32 @@
 import streamlit as st
 import pandas as pd
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from src.layout_components import (
+    render_active_participants_section,
     render_adoption_section,
+    render_adoption_history_section,
     render_department_focus,
     render_department_readiness_section,
     render_executive_notes,
+    render_funnel_section,
+    render_impact_uncertainty_section,
     render_learning_impact_section,
     render_overview_section,
     render_participation_section,
+    render_reflection_search_section,
     render_reflection_section,
+    render_reflection_trends_section,
+    render_retention_section,
+    render_score_distribution_section,
 )
 from src.kpi_calculations import (
+    compute_reflection_search,
     compute_workshop_engagement,
     compute_reflection_sentiment,
 )
 from src.filters import filter_by_departments
+from src.kpi_bundle import HISTORY_GRANULARITIES
 
 def render_overview_tab(
     adoption_overall: float,
@@ -52,7 +62,11 @@ def render_overview_tab(
         mime="text/csv",
     )
 
-def render_adoption_tab(adoption_df: pd.DataFrame, readiness_df: pd.DataFrame):
+def render_adoption_tab(
+    adoption_df: pd.DataFrame,
+    readiness_df: pd.DataFrame,
+    adoption_history: Dict[str, pd.DataFrame]
+):
     st.markdown(
         "Comparative analysis of departmental readiness profiles. Identifies units that are well-positioned for advanced AI integration versus those requiring foundational support. Use these metrics to allocate resources and identify peer-mentoring opportunities."
     )
@@ -64,6 +78,14 @@ def render_adoption_tab(adoption_df: pd.DataFrame, readiness_df: pd.DataFrame):
         use_container_width=True,
         hide_index=True,
     )
+    granularity = st.radio(
+        "Trajectory granularity",
+        options=list(HISTORY_GRANULARITIES),
+        format_func=lambda x: "Monthly" if x == "month" else "Academic term",
+        horizontal=True,
+        key="adoption_history_freq",
+    )
+    render_adoption_history_section(adoption_history[granularity])
     render_department_readiness_section(readiness_df)
     st.download_button(
         "Download adoption & readiness data (CSV)",
@@ -72,28 +94,60 @@ def render_adoption_tab(adoption_df: pd.DataFrame, readiness_df: pd.DataFrame):
         mime="text/csv",
     )
 
-def render_learning_impact_tab(impact_summary_df: pd.DataFrame):
+def render_learning_impact_tab(
+    impact_summary_df: pd.DataFrame,
+    intervals_df: pd.DataFrame,
+    departments: pd.DataFrame,
+    pairing_report: Optional[pd.DataFrame] = None,
+    score_quantiles: Optional[pd.DataFrame] = None,
+    approximate: bool = False
+):
     st.markdown(
         "Longitudinal assessment of confidence and competency shifts. Validates whether training interventions are driving measurable improvements in responsible AI understanding across faculty, staff, and graduate student cohorts."
     )
     render_learning_impact_section(impact_summary_df)
-    st.download_button(
+    if pairing_report is not None and not pairing_report.empty:
+        counts = pairing_report.set_index("side")
+        st.caption(
+            f"{counts.loc['pre', 'matched']} matched pre/post pairs across the dataset; "
+            f"{counts.loc['pre', 'unmatched']} pre and {counts.loc['post', 'unmatched']} post responses have no counterpart, "
+            f"and {counts['duplicates_resolved'].sum()} duplicate responses were resolved."
+        )
+    render_impact_uncertainty_section(intervals_df, departments)
+    if score_quantiles is not None:
+        render_score_distribution_section(score_quantiles, approximate)
+    col1, col2 = st.columns(2)
+    col1.download_button(
         "Download learning impact (CSV)",
         data=impact_summary_df.to_csv(index=False),
         file_name="learning_impact.csv",
         mime="text/csv",
     )
+    col2.download_button(
+        "Download confidence intervals (CSV)",
+        data=intervals_df.to_csv(index=False),
+        file_name="learning_impact_intervals.csv",
+        mime="text/csv",
+    )
 
 def render_engagement_tab(
     timeseries_df: pd.DataFrame,
     by_format_df: pd.DataFrame,
     by_audience_df: pd.DataFrame,
-    completion_df: pd.DataFrame
+    completion_df: pd.DataFrame,
+    funnel: Dict[str, pd.DataFrame],
+    participation: Dict[str, pd.DataFrame],
+    retention: dict,
+    departments: pd.DataFrame,
+    approximate: bool = False
 ):
     st.markdown(
         "Temporal analysis of participation volume and modality preferences. Supports capacity planning, facilitator staffing, and the optimization of workshop formats to maximize institutional reach."
     )
     render_participation_section(timeseries_df, by_format_df, by_audience_df, completion_df)
+    render_funnel_section(funnel)
+    render_active_participants_section(participation, approximate)
+    render_retention_section(retention, departments)
     st.download_button(
         "Download engagement data (CSV)",
         data=timeseries_df.to_csv(index=False),
@@ -101,11 +155,38 @@ def render_engagement_tab(
         mime="text/csv",
     )
 
-def render_reflections_tab(sentiment_df: pd.DataFrame, theme_df: pd.DataFrame):
+def render_reflections_tab(
+    sentiment_df: pd.DataFrame,
+    theme_df: pd.DataFrame,
+    trends: Dict[str, pd.DataFrame],
+    reflections: pd.DataFrame,
+    participants: pd.DataFrame,
+    departments: pd.DataFrame,
+    text_index,
+    selected_depts: List[str],
+    role_filter: List[str]
+):
     st.markdown(
         "Thematic analysis of qualitative feedback. Surfaces emerging risks, ethical concerns, and support needs reported by participants. These signals are critical for guiding policy adjustments and curriculum refinement."
     )
     render_reflection_section(sentiment_df, theme_df)
+    render_reflection_trends_section(trends)
+    query = st.text_input(
+        "Search reflection text",
+        key="reflection_query",
+        placeholder='e.g. examples OR resources, "data privacy", tools -licenses',
+        help='All words must appear; use OR for alternatives, quotes for exact phrases, and a leading "-" to exclude a word.',
+    )
+    if query.strip():
+        results = compute_reflection_search(
+            reflections,
+            participants,
+            text_index,
+            query,
+            filtered_department_ids=selected_depts,
+            filtered_roles=role_filter,
+        )
+        render_reflection_search_section(query, results, departments)
     st.download_button(
         "Download reflections summary (CSV)",
         data=theme_df.to_csv(index=False),
@@ -0,0 +1,157 @@
+"""
+Startup warm-up of the KPI bundle cache.
+
+Common filter presets (the default view first, then each single department
+and each role segment, over the default date range) are requested from the
+shared KPI job pool (``src/jobs.py``). They run where session jobs run, in
+worker processes for the reference dataset, and land in the same cache. A
+session that asks for a preset still warming joins its job instead of
+computing it again. Warm-ups yield to sessions: each one waits until no
+session script or session job has been running for ``QUIET_SECONDS``, and
+only a few run at once, leaving at least one pool worker free. Charts are not prebuilt: each is built on first render and
+cached with its bundle. Progress and coverage are exposed for the sidebar.
+"""
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from .config import WARMUP_ENABLED, WARMUP_WORKERS
+from .jobs import KpiJobPool, get_job_pool, request_bundle
+from .kpi_bundle import ROLE_OPTIONS, FilterSelection
+
+QUIET_SECONDS = 2.0
+
+
+@dataclass(frozen=True)
+class WarmupProgress:
+    total: int
+    completed: int
+    failed: int
+    elapsed_seconds: float
+    running: bool
+
+    @property
+    def coverage(self) -> float:
+        """Share of the presets whose bundles are cached."""
+        return self.completed / self.total if self.total else 1.0
+
+
+def common_selections(data: Dict[str, pd.DataFrame]) -> List[FilterSelection]:
+    """Warm-up presets, the dashboard's default view first."""
+    workshops = data["workshops"]
+    start, end = workshops["date"].min(), workshops["date"].max()
+    all_depts = list(data["departments"]["department_id"])
+    presets = [(all_depts, ROLE_OPTIONS)]
+    presets += [([dept], ROLE_OPTIONS) for dept in all_depts]
+    presets += [(all_depts, [role]) for role in ROLE_OPTIONS]
+    return [FilterSelection.from_sidebar(depts, roles, start, end) for depts, roles in presets]
+
+
+class CacheWarmer:
+    def __init__(
+        self,
+        data: Dict[str, pd.DataFrame],
+        fingerprint: str,
+        selections: Optional[List[FilterSelection]] = None,
+        backend=None,
+        max_workers: int = WARMUP_WORKERS,
+        pool: Optional[KpiJobPool] = None,
+        reference: bool = False,
+        quiet_seconds: float = QUIET_SECONDS,
+    ):
+        self.data = data
+        self.fingerprint = fingerprint
+        self.selections = common_selections(data) if selections is None else list(selections)
+        self.backend = backend
+        self.pool = get_job_pool() if pool is None else pool
+        # Warm-ups never take every pool worker, so a session's job does not queue behind them.
+        self.max_workers = max(1, min(max_workers, self.pool.max_workers - 1))
+        self.reference = reference
+        self.quiet_seconds = quiet_seconds
+        self._queue: "queue.Queue[FilterSelection]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._completed = 0
+        self._failed = 0
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self.errors: List[str] = []
+
+    def start(self) -> "CacheWarmer":
+        if self._started_at is not None:
+            return self
+        self._started_at = time.perf_counter()
+        for selection in self.selections:
+            self._queue.put(selection)
+        for index in range(min(self.max_workers, len(self.selections)) or 1):
+            thread = threading.Thread(target=self._work, name=f"aire-warmup-{index}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> WarmupProgress:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return self.progress()
+
+    def progress(self) -> WarmupProgress:
+        with self._lock:
+            running = any(thread.is_alive() for thread in self._threads)
+            end = time.perf_counter() if self._finished_at is None else self._finished_at
+            return WarmupProgress(
+                total=len(self.selections),
+                completed=self._completed,
+                failed=self._failed,
+                elapsed_seconds=end - self._started_at if self._started_at is not None else 0.0,
+                running=running,
+            )
+
+    def _warm(self, selection: FilterSelection) -> None:
+        self.pool.wait_until_idle(self.quiet_seconds)
+        # The same job key as session requests, so either side joins a job the other started.
+        job = request_bundle(
+            self.data, selection, self.fingerprint, self.backend, self.reference, self.pool, background=True
+        )
+        try:
+            job.result()
+        finally:
+            self.pool.release(job)
+
+    def _work(self) -> None:
+        while True:
+            try:
+                selection = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                self._warm(selection)
+            except Exception as exc:
+                with self._lock:
+                    self._failed += 1
+                    self.errors.append(f"{selection}: {type(exc).__name__}: {exc}")
+            else:
+                with self._lock:
+                    self._completed += 1
+        with self._lock:
+            if self._completed + self._failed == len(self.selections) and self._finished_at is None:
+                self._finished_at = time.perf_counter()
+
+
+_WARMER: Optional[CacheWarmer] = None
+_WARMER_LOCK = threading.Lock()
+
+
+def ensure_warmup(data: Dict[str, pd.DataFrame], fingerprint: str, backend=None) -> Optional[CacheWarmer]:
+    """Start warming the reference dataset's bundles, once per fingerprint; None when disabled."""
+    global _WARMER
+    if not WARMUP_ENABLED:
+        return None
+    with _WARMER_LOCK:
+        if _WARMER is None or _WARMER.fingerprint != fingerprint:
+            _WARMER = CacheWarmer(data, fingerprint, backend=backend, reference=True).start()
+        return _WARMER
@@ -0,0 +1,125 @@
+import io
+import json
+import threading
+import time
+from http import HTTPStatus
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pyarrow as pa
+import pytest
+
+from src import kpi_bundle
+from src.api import ApiError, KpiApi, make_server
+from src.data_loader import load_all_data
+from src.kpi_bundle import BundleCache
+
+
+@pytest.fixture(scope="module")
+def data():
+    return load_all_data()
+
+
+@pytest.fixture
+def api(data):
+    state = {"fingerprint": "v1"}
+    kpi_api = KpiApi(lambda: (data, state["fingerprint"]), cache_size=8, bundle_cache=BundleCache(8))
+    kpi_api.state = state
+    return kpi_api
+
+
+@pytest.fixture
+def server(api):
+    http = make_server(api, "127.0.0.1", 0)
+    thread = threading.Thread(target=http.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{http.server_port}"
+    http.shutdown()
+    http.server_close()
+
+
+def _get(url, **headers):
+    try:
+        with urlopen(Request(url, headers=headers)) as response:
+            return response.status, dict(response.headers), response.read()
+    except HTTPError as exc:
+        return exc.code, dict(exc.headers), exc.read()
+
+
+def test_json_matches_bundle_and_revalidates_with_etag(server, api):
+    status, headers, body = _get(f"{server}/kpis/adoption?departments=D001,D002")
+    assert status == HTTPStatus.OK
+    rows = json.loads(body)
+    assert {row["department_id"] for row in rows} == {"D001", "D002"}
+
+    status, _, body = _get(f"{server}/kpis/adoption?departments=D002,D001", **{"If-None-Match": headers["ETag"]})
+    assert status == HTTPStatus.NOT_MODIFIED and body == b""
+
+    api.state["fingerprint"] = "v2"
+    status, new_headers, _ = _get(f"{server}/kpis/adoption?departments=D001,D002", **{"If-None-Match": headers["ETag"]})
+    assert status == HTTPStatus.OK and new_headers["ETag"] != headers["ETag"]
+
+
+def test_arrow_output_and_response_cache(server, api):
+    url = f"{server}/kpis/engagement/timeseries?format=arrow&roles=faculty"
+    status, headers, body = _get(url)
+    assert status == HTTPStatus.OK
+    assert headers["Content-Type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(io.BytesIO(body)).read_all()
+    assert set(table.column_names) == {"month", "attendances"}
+
+    _get(url)
+    assert api.responses.hits == 1 and api.responses.misses == 1
+
+    status, _, body = _get(f"{server}/kpis/coverage_overall?format=arrow")
+    assert status == HTTPStatus.OK
+    assert pa.ipc.open_stream(io.BytesIO(body)).read_all().column_names == ["value"]
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("/kpis/unknown", HTTPStatus.NOT_FOUND),
+        ("/kpis/engagement/unknown", HTTPStatus.NOT_FOUND),
+        ("/kpis/adoption?roles=dean", HTTPStatus.BAD_REQUEST),
+        ("/kpis/adoption?departments=D999", HTTPStatus.BAD_REQUEST),
+        ("/kpis/adoption?start=not-a-date", HTTPStatus.BAD_REQUEST),
+        ("/kpis/adoption?format=xml", HTTPStatus.BAD_REQUEST),
+        ("/kpis/engagement?format=arrow", HTTPStatus.NOT_ACCEPTABLE),
+    ],
+)
+def test_invalid_requests(server, path, expected):
+    status, _, body = _get(f"{server}{path}")
+    assert status == expected
+    assert "error" in json.loads(body)
+
+
+def test_concurrent_requests_share_one_bundle(server, api, monkeypatch):
+    results, computed = [], []
+    compute = kpi_bundle.compute_kpi_bundle
+
+    def counting_compute(*args, **kwargs):
+        computed.append(1)
+        # Slow enough that every request arrives while the first is still computing.
+        time.sleep(0.3)
+        return compute(*args, **kwargs)
+
+    monkeypatch.setattr(kpi_bundle, "compute_kpi_bundle", counting_compute)
+
+    def fetch():
+        results.append(_get(f"{server}/kpis/learning_impact?departments=D003")[0])
+
+    threads = [threading.Thread(target=fetch) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [HTTPStatus.OK] * 8
+    assert len(computed) == 1 and len(api.bundle_cache) == 1
+
+
+def test_handle_without_transport(api):
+    status, headers, body = api.handle("/kpis/sentiment_theme")
+    assert status == HTTPStatus.OK and set(json.loads(body)) == {"sentiment", "themes"}
+    with pytest.raises(ApiError):
+        api.handle("/other")
@@ -3,3 +3,14 @@ def test_app_imports_without_running():
 
     app_module = importlib.import_module("app")
     assert hasattr(app_module, "main")
+
+
+def test_app_import_defers_plotting_and_validation_libraries():
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    probe = "import sys, app; print([m for m in ('plotly.express', 'jsonschema') if m in sys.modules])"
+    root = Path(__file__).resolve().parents[1]
+    result = subprocess.run([sys.executable, "-c", probe], cwd=root, capture_output=True, text=True, check=True)
+    assert result.stdout.strip().splitlines()[-1] == "[]"
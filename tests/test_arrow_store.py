@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from src import arrow_store
+from src.data_loader import load_all_data
+
+
+def test_store_round_trip(tmp_path):
+    data = load_all_data()
+    arrow_store.materialize(data, tmp_path, "v1")
+    loaded = arrow_store.read_store(tmp_path, "v1")
+    assert set(loaded) == set(data)
+    for name, df in data.items():
+        pd.testing.assert_frame_equal(loaded[name], df, check_dtype=False)
+
+
+def test_numeric_columns_are_mapped_read_only(tmp_path):
+    arrow_store.materialize(load_all_data(), tmp_path, "v1")
+    workshops = arrow_store.read_store(tmp_path, "v1")["workshops"]
+    assert not workshops["attendances"].to_numpy().flags.writeable
+
+
+def test_stale_fingerprint_triggers_rebuild(tmp_path):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return {"departments": load_all_data()["departments"]}
+
+    arrow_store.load_or_materialize(tmp_path, "v1", loader)
+    arrow_store.load_or_materialize(tmp_path, "v1", loader)
+    assert len(calls) == 1
+    assert arrow_store.read_store(tmp_path, "v2") is None
+    arrow_store.load_or_materialize(tmp_path, "v2", loader)
+    assert len(calls) == 2
+
+
+def test_rewrites_go_to_a_new_generation(tmp_path):
+    departments = load_all_data()["departments"]
+    arrow_store.materialize({"departments": departments}, tmp_path, "v1")
+    first = arrow_store.read_store(tmp_path, "v1")["departments"]
+    arrow_store.materialize({"departments": departments.head(2)}, tmp_path, "v2")
+    arrow_store.materialize({"departments": departments.head(1)}, tmp_path, "v3")
+    # The v1 reader keeps its own mapped generation; only the current and the one it replaced remain on disk.
+    pd.testing.assert_frame_equal(first, departments, check_dtype=False)
+    assert len(list(tmp_path.glob(f"{arrow_store.GENERATION_PREFIX}*"))) == 2
+    assert len(arrow_store.read_store(tmp_path, "v3")["departments"]) == 1
+
+
+def test_store_fingerprint_covers_settings_and_format():
+    fingerprints = {
+        arrow_store.store_fingerprint("files", True),
+        arrow_store.store_fingerprint("files", False),
+        arrow_store.store_fingerprint("other", True),
+    }
+    assert len(fingerprints) == 3
+    assert str(arrow_store.STORE_FORMAT_VERSION) in arrow_store.store_fingerprint("files", True)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from src.bootstrap import INTERVAL_COLUMNS, bootstrap_learning_impact
+from src.data_loader import load_all_data
+from src.jobs import KpiJobPool
+from src.kpi_bundle import BundleCache
+from src.kpi_calculations import compute_learning_impact
+from src.survey_pairing import SurveyPairIndex
+
+
+def _paired():
+    data = load_all_data()
+    return SurveyPairIndex(data["confidence_pre"], data["confidence_post"], data["participants"]).pairs
+
+
+def test_intervals_cover_point_estimates():
+    intervals = bootstrap_learning_impact(_paired(), n_resamples=500, seed=7)
+    assert set(intervals["group_field"]) == {"overall", "department_id", "role"}
+    assert (intervals["delta_ci_low"] <= intervals["delta"]).all()
+    assert (intervals["delta"] <= intervals["delta_ci_high"]).all()
+
+
+def test_fixed_seed_is_reproducible_and_order_independent():
+    paired = _paired()
+    first = bootstrap_learning_impact(paired, n_resamples=300, seed=11)
+    shuffled = bootstrap_learning_impact(paired.sample(frac=1, random_state=3), n_resamples=300, seed=11)
+    pd.testing.assert_frame_equal(first, shuffled)
+
+
+def test_process_pool_matches_serial():
+    paired = _paired()
+    serial = bootstrap_learning_impact(paired, n_resamples=200, seed=5, max_workers=1)
+    pooled = bootstrap_learning_impact(paired, n_resamples=200, seed=5, max_workers=2, parallel_min_groups=1)
+    pd.testing.assert_frame_equal(serial, pooled)
+    # Later parallel runs reuse the same worker processes.
+    again = bootstrap_learning_impact(paired, n_resamples=200, seed=5, max_workers=2, parallel_min_groups=1)
+    pd.testing.assert_frame_equal(serial, again)
+
+
+def test_single_pair_has_no_interval_and_empty_input_keeps_columns():
+    paired = pd.DataFrame(
+        {
+            "confidence_score_pre": [2],
+            "confidence_score_post": [4],
+            "understanding_responsible_ai_pre": [3],
+            "understanding_responsible_ai_post": [3],
+        }
+    )
+    intervals = bootstrap_learning_impact(paired, group_fields=(), n_resamples=100, seed=1)
+    assert intervals["delta"].tolist() == [2.0, 0.0]
+    assert intervals["delta_ci_low"].isna().all()
+    assert list(bootstrap_learning_impact(paired.iloc[0:0]).columns) == INTERVAL_COLUMNS
+
+
+def test_learning_impact_bootstrap_is_opt_in():
+    data = load_all_data()
+    impact = compute_learning_impact(data["confidence_pre"], data["confidence_post"], data["participants"])
+    assert impact["intervals"].empty
+    assert not np.isnan(impact["summary"]["effect_size"]).any()
+    impact = compute_learning_impact(
+        data["confidence_pre"], data["confidence_post"], data["participants"], bootstrap_resamples=100
+    )
+    assert impact["intervals"].loc[0, "group"] == "overall"
+
+
+def test_parallel_run_inside_a_job_worker_lets_it_exit():
+    paired = _paired()
+    pool = KpiJobPool(max_workers=1, executor="process", timeout_seconds=120, cache=BundleCache())
+    args = (paired, ("department_id", "role"), 200, 5, 0.95, 2, 1)
+    pooled = pool.submit("bootstrap", bootstrap_learning_impact, *args, in_process=True).result()
+    pd.testing.assert_frame_equal(pooled, bootstrap_learning_impact(paired, n_resamples=200, seed=5, max_workers=1))
+    # The worker's own resampling pool is shut down at exit, so this returns instead of hanging.
+    pool.shutdown()
@@ -0,0 +1,96 @@
+import shutil
+
+import pandas as pd
+import pytest
+
+from src.data_loader import DATA_DIR, source_fingerprint
+from src.delta import apply_delta, ingest_delta, persist_delta
+from src.derived import table_stats
+from src.ingestion import TABLES, finalize, ingest
+from src.integrity import IntegrityError
+from src.refresh import DatasetRefresher
+from src.text_index import reflection_index
+
+
+@pytest.fixture
+def dataset_dir(tmp_path):
+    for spec in TABLES.values():
+        shutil.copy(DATA_DIR / spec.filename, tmp_path / spec.filename)
+    return tmp_path
+
+
+def _load(folder):
+    return finalize(ingest({name: folder / spec.filename for name, spec in TABLES.items()}))
+
+
+def _batch(folder):
+    workshops = pd.read_csv(folder / "workshops.csv").head(2)
+    workshops.loc[0, "completion_rate"] = 0.11
+    workshops.loc[1, ["workshop_id", "date"]] = ["W999", "2025-09-01"]
+    reflections = pd.read_csv(folder / "reflections.csv").head(3)
+    reflections.loc[0, "reflection_text"] = "Zebra examples on ethics."
+    reflections.loc[1:, ["reflection_id", "workshop_id"]] = ["R9999", "W999"]
+    reflections.loc[2, "reflection_text"] = "The last duplicate wins."
+    return {
+        "workshops": workshops.to_csv(index=False).encode("utf-8"),
+        "reflections": reflections.to_csv(index=False).encode("utf-8"),
+    }
+
+
+def test_delta_matches_a_full_reload(dataset_dir):
+    base = _load(dataset_dir)
+    result = apply_delta(base, _batch(dataset_dir), table_stats(base))
+    assert result.counts() == {"workshops": (1, 1), "reflections": (1, 1)}
+    persist_delta(dataset_dir, result)
+
+    reloaded = _load(dataset_dir)
+    for name, df in reloaded.items():
+        pd.testing.assert_frame_equal(result.tables[name], df)
+    assert result.stats == table_stats(reloaded)
+    assert len(result.tables["workshops"]) == len(base["workshops"]) + 1
+
+    updated, full = reflection_index(result.tables["reflections"]), reflection_index(reloaded["reflections"])
+    for query in ("zebra", "wins", "courses", "examples -zebra", '"demos and discussion"'):
+        assert list(updated.search(query)) == list(full.search(query))
+    pd.testing.assert_frame_equal(updated.term_frequencies(top_n=None), full.term_frequencies(top_n=None))
+
+
+def test_only_batch_rows_are_validated(dataset_dir):
+    base = _load(dataset_dir)
+    reflections = pd.read_csv(dataset_dir / "reflections.csv").head(1).assign(reflection_id="R9999", workshop_id="W999")
+    with pytest.raises(IntegrityError, match="reflections.workshop_id"):
+        apply_delta(base, {"reflections": reflections.to_csv(index=False).encode("utf-8")})
+    invalid = reflections.assign(workshop_id="W001", sentiment="elated")
+    with pytest.raises(ValueError, match="reflections.csv at row 0"):
+        apply_delta(base, {"reflections": invalid.to_csv(index=False).encode("utf-8")})
+
+
+def test_ingest_delta_swaps_the_snapshot_without_a_reload(dataset_dir):
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return _load(dataset_dir)
+
+    refresher = DatasetRefresher(loader, lambda: source_fingerprint(dataset_dir.glob("*.csv")), interval_seconds=0)
+    before = refresher.current()
+    ingest_delta(_batch(dataset_dir), refresher, dataset_dir)
+    after = refresher.current()
+    assert after is not before and len(loads) == 1
+    assert "W999" in set(after.tables["workshops"]["workshop_id"])
+    assert after.stats["workshops"].max_date == pd.Timestamp("2025-09-01")
+    assert refresher.poll() is False and refresher.poll() is False
+
+
+@pytest.mark.parametrize("copy", ["workshops.parquet", "partitions/manifest.json"])
+def test_delta_is_refused_while_stale_copies_exist(dataset_dir, copy):
+    (dataset_dir / copy).parent.mkdir(exist_ok=True)
+    (dataset_dir / copy).write_bytes(b"")
+    refresher = DatasetRefresher(lambda: _load(dataset_dir), lambda: source_fingerprint(dataset_dir.glob("*.csv")), interval_seconds=0)
+    before = refresher.current()
+    csv_before = (dataset_dir / "workshops.csv").read_bytes()
+    with pytest.raises(ValueError, match="Remove them, apply the delta"):
+        ingest_delta(_batch(dataset_dir), refresher, dataset_dir, partition_root=dataset_dir / "partitions")
+    assert refresher.current() is before
+    assert (dataset_dir / "workshops.csv").read_bytes() == csv_before
+
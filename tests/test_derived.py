@@ -0,0 +1,50 @@
+import pandas as pd
+
+from src.derived import add_derived_columns, period_column, table_stats
+from src.refresh import DatasetRefresher
+
+
+def _tables():
+    dates = pd.to_datetime(["2024-06-30", "2024-07-01", "2024-12-31", None])
+    return {
+        "workshops": pd.DataFrame({"workshop_id": ["W1", "W2", "W3", "W4"], "date": dates}),
+        "participants": pd.DataFrame({"participant_id": ["P1"], "last_attended_date": pd.to_datetime(["2024-01-15"])}),
+        "departments": pd.DataFrame({"department_id": ["D1"]}),
+    }
+
+
+def test_derived_keys():
+    tables = _tables()
+    workshops = add_derived_columns(tables)["workshops"]
+    assert "month" not in tables["workshops"].columns
+    assert workshops["month"].dt.strftime("%Y-%m-%d").tolist()[:3] == ["2024-06-01", "2024-07-01", "2024-12-01"]
+    assert workshops["term"].dt.strftime("%Y-%m-%d").tolist()[:3] == ["2024-01-01", "2024-06-01", "2024-08-01"]
+    assert workshops["fiscal_year"].tolist()[:3] == [2024, 2025, 2025]
+    assert workshops["iso_week"].dt.strftime("%Y-%m-%d").tolist()[:3] == ["2024-06-24", "2024-07-01", "2024-12-30"]
+    assert workshops["day_number"].tolist()[:3] == [19904, 19905, 20088]
+    assert workshops.iloc[3][["month", "fiscal_year", "day_number"]].isna().all()
+
+    participants = add_derived_columns(tables)["participants"]
+    assert participants["last_attended_month"].iloc[0] == pd.Timestamp("2024-01-01")
+    assert "month" not in participants.columns
+
+
+def test_period_column_prefers_the_precomputed_key():
+    tables = _tables()
+    prepared = add_derived_columns(tables)["workshops"]
+    pd.testing.assert_series_equal(
+        period_column(tables["workshops"], "term"), period_column(prepared, "term"), check_names=False
+    )
+    assert period_column(prepared, "month") is not None
+    assert add_derived_columns({"workshops": prepared})["workshops"] is prepared
+
+
+def test_table_stats_and_snapshot():
+    stats = table_stats(_tables())
+    assert stats["workshops"].rows == 4
+    assert (stats["workshops"].min_date, stats["workshops"].max_date) == (pd.Timestamp("2024-06-30"), pd.Timestamp("2024-12-31"))
+    assert stats["departments"].min_date is None
+
+    snapshot = DatasetRefresher(_tables, lambda: "v1").current()
+    assert snapshot.stats["participants"].rows == 1
+    assert "day_number" in snapshot.tables["workshops"].columns
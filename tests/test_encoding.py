@@ -0,0 +1,42 @@
+import pandas as pd
+
+from src.data_loader import load_all_data
+from src.encoding import ID_COLUMNS, decode_ids, domain_categories, encode_ids, lookup_positions
+
+
+def test_loaded_ids_share_one_dictionary_per_domain():
+    data = load_all_data()
+    for column in ID_COLUMNS:
+        dtypes = {str(df[column].dtype.categories.tolist()) for df in data.values() if column in df.columns}
+        assert len(dtypes) == 1
+        assert all(isinstance(df[column].dtype, pd.CategoricalDtype) for df in data.values() if column in df.columns)
+    merged = data["reflections"].merge(data["participants"][["participant_id", "role"]], on="participant_id")
+    assert isinstance(merged["participant_id"].dtype, pd.CategoricalDtype)
+    assert len(merged) == len(data["reflections"])
+
+
+def test_encode_covers_every_table_and_round_trips():
+    tables = {
+        "departments": pd.DataFrame({"department_id": ["D2", "D1"]}),
+        "participants": pd.DataFrame({"participant_id": ["P1", "P2"], "department_id": ["D1", "D3"]}),
+    }
+    encoded = encode_ids(tables)
+    assert list(domain_categories(tables, "department_id")) == ["D1", "D2", "D3"]
+    assert encoded["participants"]["department_id"].cat.codes.tolist() == [0, 2]
+    assert not isinstance(tables["participants"]["department_id"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(decode_ids(encoded["participants"]), tables["participants"], check_dtype=False)
+    assert encode_ids(encoded)["departments"] is encoded["departments"]
+
+
+def test_lookup_positions_on_codes_matches_index_lookup():
+    tables = encode_ids(
+        {
+            "participants": pd.DataFrame({"participant_id": ["P3", "P1", "P2"]}),
+            "reflections": pd.DataFrame({"participant_id": ["P2", None, "P9", "P3"]}),
+        }
+    )
+    keys, values = tables["participants"]["participant_id"], tables["reflections"]["participant_id"]
+    expected = pd.Index(decode_ids(tables["participants"])["participant_id"]).get_indexer(
+        decode_ids(tables["reflections"])["participant_id"]
+    )
+    assert lookup_positions(keys, values).tolist() == expected.tolist()
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from src import enrichment
+from src.data_loader import DATA_DIR, prepare_reflections, validate_dataframe
+
+
+def _raw_reflections():
+    return pd.read_csv(DATA_DIR / "reflections.csv")
+
+
+def test_unlabeled_export_passes_schema_after_enrichment():
+    raw = _raw_reflections().drop(columns=["sentiment", "theme"])
+    enriched = prepare_reflections(raw)
+    validate_dataframe(enriched, "reflections_schema.json")
+    assert set(enriched["sentiment"]) <= {"positive", "neutral", "negative"}
+
+
+def test_existing_labels_are_kept():
+    raw = _raw_reflections()
+    raw.loc[0, "sentiment"] = None
+    enriched = enrichment.enrich_reflections(raw, cache=enrichment.LabelCache())
+    assert enriched["sentiment"].notna().all()
+    pd.testing.assert_series_equal(enriched["theme"], raw["theme"].astype(object))
+
+
+def test_cached_texts_are_not_rescored(monkeypatch):
+    raw = _raw_reflections().drop(columns=["sentiment", "theme"])
+    cache = enrichment.LabelCache()
+    scored_rows = []
+    original = enrichment.classify_texts
+
+    def counting_classifier(texts):
+        scored_rows.append(len(texts))
+        return original(texts)
+
+    monkeypatch.setattr(enrichment, "classify_texts", counting_classifier)
+    first = enrichment.enrich_reflections(raw, batch_size=100, cache=cache)
+    second = enrichment.enrich_reflections(raw, batch_size=100, cache=cache)
+    assert sum(scored_rows) == raw["reflection_text"].nunique()
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_cache_keeps_the_newest_entries_up_to_its_size():
+    cache = enrichment.LabelCache(max_entries=3)
+    labels = pd.DataFrame({"sentiment": ["positive"] * 5, "theme": ["assessment"] * 5})
+    cache.store(np.arange(5, dtype="uint64"), labels)
+    assert len(cache) == 3
+    found = cache.get(np.arange(5, dtype="uint64"))
+    assert found["sentiment"].isna().tolist() == [True, True, False, False, False]
+
+
+def test_evicted_labels_still_fill_the_batch_that_scored_them():
+    raw = _raw_reflections().drop(columns=["sentiment", "theme"])
+    enriched = enrichment.enrich_reflections(raw, batch_size=100, cache=enrichment.LabelCache(max_entries=10))
+    expected = enrichment.enrich_reflections(raw, cache=enrichment.LabelCache())
+    pd.testing.assert_frame_equal(enriched, expected)
@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+from src.data_loader import load_all_data
+from src.filters import FilterContext, filter_by_date_range, filter_by_departments, filter_by_roles
+
+
+@pytest.fixture(scope="module")
+def data():
+    return load_all_data()
+
+
+def _same_rows(actual, expected):
+    pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected.reset_index(drop=True))
+
+
+def test_context_matches_the_filter_functions(data):
+    depts = list(data["departments"]["department_id"][:4])
+    context = FilterContext(data, depts, ["faculty", "staff"], "2024-01-01", "2024-06-30")
+    _same_rows(
+        context.rows("workshops"),
+        filter_by_departments(filter_by_date_range(data["workshops"], "date", "2024-01-01", "2024-06-30"), "department_id", depts),
+    )
+    _same_rows(
+        context.rows("participants"),
+        filter_by_roles(filter_by_departments(data["participants"], "department_id", depts), "role", ["faculty", "staff"]),
+    )
+    _same_rows(context.rows("departments"), filter_by_departments(data["departments"], "department_id", depts))
+
+    merged = filter_by_date_range(data["reflections"], "date", "2024-01-01", "2024-06-30").merge(
+        data["participants"][["participant_id", "department_id", "role"]], on="participant_id", how="left"
+    )
+    expected = filter_by_roles(filter_by_departments(merged, "department_id", depts), "role", ["faculty", "staff"])
+    assert list(context.rows("reflections_by_participant")["reflection_id"]) == list(expected["reflection_id"])
+
+
+def test_masks_are_computed_once_and_unfiltered_tables_are_not_copied(data):
+    context = FilterContext(data)
+    assert context.mask("participants") is None
+    assert context.rows("participants") is data["participants"]
+    assert context.rows("reflections_by_participant") is data["reflections"]
+
+    context = FilterContext(data, roles=["faculty"])
+    mask = context.mask("participants")
+    assert context.mask("participants") is mask
+    assert context.rows("participants") is context.rows("participants")
+    assert (context.rows("participants")["role"] == "faculty").all()
@@ -0,0 +1,44 @@
+import gc
+
+import numpy as np
+import pandas as pd
+
+from src.encoding import label_codes, label_table
+from src.frame_cache import FrameCache
+
+
+def test_entries_are_built_once_per_frame_and_key():
+    cache, builds = FrameCache(), []
+    left, right = pd.DataFrame({"a": [1]}), pd.DataFrame({"a": [1]})
+
+    def build(name):
+        builds.append(name)
+        return object()
+
+    first = cache.get_or_build((left, right), lambda: build("pair"))
+    assert cache.get_or_build((left, right), lambda: build("again")) is first
+    assert cache.get_or_build((left, right), lambda: build("other key"), "policy") is not first
+    assert cache.get_or_build((left,), lambda: build("left")) is not first
+    assert builds == ["pair", "other key", "left"]
+    # The first stored entry wins a race.
+    assert cache.store((left,), object()) is cache.get((left,))
+
+
+def test_entries_are_dropped_with_any_of_their_frames():
+    cache = FrameCache()
+    kept, dropped = pd.DataFrame({"a": [1]}), pd.DataFrame({"a": [2]})
+    cache.store((kept, dropped), "both")
+    cache.store((kept,), "kept")
+    assert len(cache) == 2
+    del dropped
+    gc.collect()
+    assert len(cache) == 1 and cache.get((kept,)) == "kept"
+
+
+def test_label_tables_ignore_missing_codes():
+    codes, labels = label_codes(pd.Series(["b", None, "a", "c"]))
+    assert list(labels) == ["a", "b", "c"] and codes.tolist() == [1, -1, 0, 2]
+    assert label_table(labels, []) is None
+    np.testing.assert_array_equal(label_table(labels, ["b", "z"])[codes], [True, False, False, False])
+    categorical = pd.Series(["b", "a"], dtype=pd.CategoricalDtype(["a", "b", "c"]))
+    assert label_codes(categorical)[0].tolist() == [1, 0]
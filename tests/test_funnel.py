@@ -0,0 +1,94 @@
+import pandas as pd
+import pytest
+
+from src.data_loader import load_all_data
+from src.derived import period_column
+from src.filters import FilterContext
+from src.funnel import BREAKDOWNS, STAGES, WorkshopFunnel, funnel_stages, workshop_funnel
+from src.ingestion import finalize
+from src.kpi_bundle import FilterSelection, compute_kpi_bundle
+
+
+@pytest.fixture(scope="module")
+def data():
+    return finalize(load_all_data())
+
+
+def _expected(data, department_ids, audiences, start_date, end_date):
+    """Stage totals grouped directly over the workshops the sidebar selects."""
+    workshops = FilterContext(data, department_ids, [], start_date, end_date).rows("workshops")
+    if audiences:
+        workshops = workshops[workshops["audience"].isin(audiences)]
+    workshops = workshops.assign(
+        completions=workshops["attendances"] * workshops["completion_rate"], month=period_column(workshops, "month")
+    )
+    return workshops, {
+        name: workshops.groupby(column, observed=True)[list(STAGES)].sum() for name, column in BREAKDOWNS.items()
+    }
+
+
+@pytest.mark.parametrize(
+    "department_ids, audiences, start_date, end_date",
+    [
+        ([], [], None, None),
+        (["D001", "D002", "D003"], ["faculty", "mixed"], "2023-09-01", "2024-03-15"),
+        ([], ["staff"], "2024-01-01", "2024-06-30"),
+        (["D006"], [], None, None),
+    ],
+)
+def test_funnel_matches_groupby_over_the_filtered_workshops(data, department_ids, audiences, start_date, end_date):
+    funnel = workshop_funnel(data["workshops"]).compute(department_ids, audiences, start_date, end_date)
+    workshops, expected = _expected(data, department_ids, audiences, start_date, end_date)
+    for name, totals in expected.items():
+        column = BREAKDOWNS[name]
+        result = funnel[name].set_index(column)[list(STAGES)]
+        pd.testing.assert_frame_equal(result, totals, check_dtype=False, check_names=False, check_index_type=False)
+    stages = funnel["stages"].set_index("stage")["count"]
+    assert stages["registrations"] == workshops["registrations"].sum()
+    assert stages["attendances"] == workshops["attendances"].sum()
+
+
+def test_completion_is_weighted_by_attendance():
+    workshops = pd.DataFrame(
+        {
+            "department_id": ["D1", "D1", "D2"],
+            "format": ["webinar", "webinar", "workshop"],
+            "audience": ["faculty", "faculty", "staff"],
+            "date": pd.to_datetime(["2024-01-05", "2024-01-20", "2024-02-10"]),
+            "registrations": [100, 20, 0],
+            "attendances": [90, 10, 0],
+            "completion_rate": [0.5, 1.0, 0.8],
+        }
+    )
+    funnel = WorkshopFunnel(workshops)
+    by_format = funnel.compute()["by_format"].set_index("format")
+    webinar = by_format.loc["webinar"]
+    assert webinar["completions"] == pytest.approx(55.0)
+    assert webinar["attendance_rate"] == pytest.approx(0.833)
+    # The unweighted mean of the two webinars would be 0.75.
+    assert webinar["completion_rate"] == pytest.approx(0.55)
+    assert webinar["conversion_rate"] == pytest.approx(0.458)
+    # A workshop nobody registered for has no rates rather than a division by zero.
+    assert by_format.loc["workshop", ["attendance_rate", "completion_rate", "conversion_rate"]].tolist() == [0.0, 0.0, 0.0]
+    assert len(funnel.compute(start_date="2024-02-01", end_date="2024-02-29")["by_month"]) == 1
+
+
+def test_funnel_stages_rates():
+    stages = funnel_stages(pd.Series({"registrations": 200, "attendances": 150, "completions": 120.0}))
+    assert stages["stage"].tolist() == list(STAGES)
+    assert stages["step_rate"].tolist() == [1.0, 0.75, 0.8]
+    assert stages["overall_rate"].tolist() == [1.0, 0.75, 0.6]
+    assert funnel_stages(pd.Series({"registrations": 0, "attendances": 0, "completions": 0.0}))["step_rate"].tolist() == [
+        0.0,
+        0.0,
+        0.0,
+    ]
+
+
+def test_bundle_carries_the_funnel(data):
+    selection = FilterSelection.from_sidebar(["D001", "D002"], ["faculty"], "2023-08-01", "2024-12-31")
+    funnel = compute_kpi_bundle(data, selection)["funnel"]
+    assert set(funnel) == {"stages", *BREAKDOWNS}
+    assert set(funnel["by_audience"]["audience"]) <= set(selection.audience_filter)
+    assert funnel["by_department"]["department_name"].notna().all()
+    assert workshop_funnel(data["workshops"]) is workshop_funnel(data["workshops"])
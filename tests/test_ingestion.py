@@ -0,0 +1,66 @@
+import io
+
+import pandas as pd
+import pytest
+
+from src import survey_pairing, text_index
+from src.data_loader import DATA_DIR, load_all_data
+from src.derived import add_derived_columns
+from src.data_sources import process_uploads
+from src.ingestion import TABLES, dtype_plan, ingest, ingest_table
+
+DEPARTMENTS = (
+    "department_id,department_name,division,baseline_readiness_score,current_readiness_score,training_coverage_rate\n"
+    "007,Economics,Social Science,0,1,1\n"
+)
+
+
+def test_dtype_plan_follows_the_schema():
+    plan = dtype_plan("workshops_schema.json")
+    assert plan.dates == ("date",)
+    assert plan.read["workshop_id"] is str and "registrations" not in plan.read
+    assert plan.casts["registrations"] == "int64"
+    assert plan.casts["completion_rate"] == "float64"
+
+
+def test_uploaded_table_is_typed_like_the_schema():
+    df = ingest_table(DEPARTMENTS.encode("utf-8"), TABLES["departments"])
+    # Numeric-looking ids stay strings, and whole-number scores are still numbers.
+    assert df["department_id"].tolist() == ["007"]
+    assert (df[["baseline_readiness_score", "current_readiness_score"]].dtypes == "float64").all()
+
+
+def test_validation_errors_name_the_file():
+    bad = DEPARTMENTS.replace(",0,1,1", ",0,2,1").encode("utf-8")
+    with pytest.raises(ValueError, match="departments.csv at row 0"):
+        ingest_table(bad, TABLES["departments"])
+
+
+def test_missing_table_is_reported():
+    sources = {name: DATA_DIR / spec.filename for name, spec in TABLES.items() if name != "reflections"}
+    with pytest.raises(ValueError, match="reflections.csv is required"):
+        ingest(sources)
+
+
+def test_valid_uploads_match_the_reference_loader():
+    files = {spec.filename: io.BytesIO((DATA_DIR / spec.filename).read_bytes()) for spec in TABLES.values()}
+    uploaded = process_uploads(files)
+    for key, df in add_derived_columns(load_all_data()).items():
+        pd.testing.assert_frame_equal(uploaded[key], df)
+
+
+def test_uploads_are_parsed_and_indexed(monkeypatch):
+    files = {spec.filename: io.BytesIO((DATA_DIR / spec.filename).read_bytes()) for spec in TABLES.values()}
+    uploaded = process_uploads(files)
+    assert pd.api.types.is_datetime64_any_dtype(uploaded["reflections"]["date"])
+    assert "month" in uploaded["workshops"].columns
+    # The indexes were built during ingestion: asking for them again does not rebuild anything.
+    builds = []
+    monkeypatch.setattr(survey_pairing, "SurveyPairIndex", lambda *args, **kwargs: builds.append("pairs"))
+    monkeypatch.setattr(text_index, "build_reflection_index", lambda *args: builds.append("text"))
+    surveys = (uploaded["confidence_pre"], uploaded["confidence_post"], uploaded["participants"])
+    pairs = survey_pairing.survey_pair_index(*surveys)
+    reflections = text_index.reflection_index(uploaded["reflections"])
+    assert pairs is not None and reflections is not None and builds == []
+    assert survey_pairing.survey_pair_index(*surveys) is pairs
+    assert text_index.reflection_index(uploaded["reflections"]) is reflections
@@ -0,0 +1,57 @@
+import io
+
+import pandas as pd
+import pytest
+
+from src.data_loader import DATA_DIR, load_all_data
+from src.encoding import decode_ids
+from src.data_sources import REQUIRED_FILES, process_uploads
+from src.integrity import IntegrityError, check_integrity, integrity_report, validate_integrity
+
+
+def test_reference_dataset_is_consistent():
+    assert check_integrity(load_all_data()) == []
+
+
+def test_orphans_and_duplicates_are_reported_with_samples():
+    data = load_all_data()
+    reflections = decode_ids(data["reflections"])
+    reflections.loc[reflections.index[:3], "participant_id"] = "P999"
+    workshops = pd.concat([data["workshops"], data["workshops"].head(2)], ignore_index=True)
+    issues = check_integrity({**data, "reflections": reflections, "workshops": workshops})
+
+    by_kind = {(i.kind, i.table, i.column): i for i in issues}
+    orphan = by_kind[("orphan", "reflections", "participant_id")]
+    assert orphan.count == 3
+    assert orphan.references == "participants.participant_id"
+    assert list(orphan.sample["participant_id"]) == ["P999"] * 3
+    assert by_kind[("duplicate_key", "workshops", "workshop_id")].count == 4
+    report = integrity_report(issues)
+    assert set(report["table"]) == {"reflections", "workshops"}
+
+
+def test_missing_tables_are_skipped():
+    data = load_all_data()
+    assert check_integrity({"reflections": data["reflections"]}) == []
+
+
+def test_uploads_with_orphans_are_rejected():
+    files = {}
+    for key, (filename, _) in REQUIRED_FILES.items():
+        content = (DATA_DIR / filename).read_text(encoding="utf-8")
+        if key == "departments":
+            # Drop the first department so participants and workshops reference an unknown id.
+            lines = content.splitlines()
+            content = "\n".join([lines[0], *lines[2:]]) + "\n"
+        files[filename] = io.BytesIO(content.encode("utf-8"))
+    with pytest.raises(IntegrityError) as excinfo:
+        process_uploads(files)
+    assert "departments.department_id" in str(excinfo.value)
+    assert {issue.table for issue in excinfo.value.issues} == {"participants", "workshops"}
+
+
+def test_validate_integrity_raises_value_error():
+    data = load_all_data()
+    surveys = data["confidence_pre"].assign(workshop_id="W999")
+    with pytest.raises(ValueError, match="confidence_pre.workshop_id"):
+        validate_integrity({**data, "confidence_pre": surveys})
@@ -0,0 +1,180 @@
+import os
+import threading
+import time
+
+import pytest
+
+from src import jobs
+from src.data_sources import reference_snapshot
+from src.kpi_bundle import BundleCache, FilterSelection, bundle_key, compute_kpi_bundle, get_kpi_bundle
+from src.jobs import JobTimeoutError, KpiJobPool, request_bundle, session_job
+from src.warmup import CacheWarmer
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    return reference_snapshot()
+
+
+def _selection(*departments):
+    return FilterSelection.from_sidebar(list(departments), ["faculty", "staff"], "2023-09-01", "2024-06-30")
+
+
+def _blocker(pool, release):
+    return pool.submit("blocker", release.wait, 30)
+
+
+def test_identical_requests_share_one_job():
+    pool = KpiJobPool(max_workers=2, executor="thread", cache=BundleCache())
+    release, calls = threading.Event(), []
+
+    def compute(name):
+        calls.append(name)
+        release.wait(30)
+        return name
+
+    first = pool.submit("key", compute, "a")
+    second = pool.submit("key", compute, "b")
+    assert second is first and first.waiters == 2 and pool.deduplicated == 1
+    release.set()
+    assert first.result() == "a" and calls == ["a"]
+    # Finished jobs leave the in-flight table; the next request starts a new one.
+    assert pool.inflight() == 0 and pool.submit("key", compute, "c").result() == "c"
+    pool.shutdown()
+
+
+def test_superseded_job_is_cancelled_and_bundles_are_cached(snapshot):
+    cache = BundleCache()
+    pool = KpiJobPool(max_workers=1, executor="thread", cache=cache)
+    release = threading.Event()
+    blocker = _blocker(pool, release)
+    state = {}
+    superseded = session_job(state, snapshot.tables, _selection("D001"), "v1", pool=pool)
+    # The same selection on a rerun keeps the session's job without joining it twice.
+    assert session_job(state, snapshot.tables, _selection("D001"), "v1", pool=pool) is superseded
+    current = session_job(state, snapshot.tables, _selection("D002"), "v1", pool=pool)
+    assert superseded.future.cancelled() and pool.cancelled == 1 and state["kpi_job"] is current
+    release.set()
+    blocker.result()
+    bundle = current.result()
+    assert bundle["adoption"].equals(compute_kpi_bundle(snapshot.tables, _selection("D002"))["adoption"])
+    assert cache.get(bundle_key("v1", _selection("D002"))) is bundle
+    assert bundle_key("v1", _selection("D001")) not in cache
+    # A cached selection comes back as a finished job without a submission.
+    submitted = pool.submitted
+    assert request_bundle(snapshot.tables, _selection("D002"), "v1", pool=pool).result() is bundle
+    assert pool.submitted == submitted
+    pool.shutdown()
+
+
+def test_failed_job_is_resubmitted_on_the_next_rerun(snapshot, monkeypatch):
+    pool = KpiJobPool(max_workers=1, executor="thread", cache=BundleCache())
+    state, calls = {}, []
+
+    def flaky(data, selection, backend=None):
+        calls.append(selection)
+        if len(calls) == 1:
+            raise RuntimeError("transient failure")
+        return {"ok": True}
+
+    monkeypatch.setattr(jobs, "compute_kpi_bundle", flaky)
+    failed = session_job(state, snapshot.tables, _selection("D001"), "v1", pool=pool)
+    with pytest.raises(RuntimeError):
+        failed.result()
+    retried = session_job(state, snapshot.tables, _selection("D001"), "v1", pool=pool)
+    assert retried is not failed and retried.result() == {"ok": True}
+    assert len(calls) == 2 and state["kpi_job"] is retried
+    # A successful job is reused without resubmitting.
+    assert session_job(state, snapshot.tables, _selection("D001"), "v1", pool=pool) is retried
+    pool.shutdown()
+
+
+def test_job_shared_with_another_session_survives_release():
+    pool = KpiJobPool(max_workers=1, executor="thread", cache=BundleCache())
+    release = threading.Event()
+    blocker = _blocker(pool, release)
+    job = pool.submit("key", lambda: "done")
+    pool.submit("key", lambda: "unused")
+    assert not pool.release(job) and not job.future.cancelled()
+    assert pool.release(job) and job.future.cancelled()
+    release.set()
+    blocker.result()
+    pool.shutdown()
+
+
+def test_jobs_time_out_at_their_deadline():
+    pool = KpiJobPool(max_workers=1, executor="thread", timeout_seconds=0.2, cache=BundleCache())
+    release = threading.Event()
+    job = _blocker(pool, release)
+    with pytest.raises(JobTimeoutError):
+        job.result()
+    assert job.expired
+    release.set()
+    pool.shutdown()
+
+
+def test_reference_bundles_run_in_worker_processes(snapshot):
+    cache = BundleCache()
+    pool = KpiJobPool(max_workers=1, executor="process", timeout_seconds=120, cache=cache)
+    selection = _selection("D003", "D004")
+    bundle = request_bundle(snapshot.tables, selection, snapshot.fingerprint, reference=True, pool=pool).result()
+    # Reference jobs go to the worker process, not a thread of this one.
+    assert pool.submit("pid", os.getpid, in_process=True).result() != os.getpid()
+    expected = compute_kpi_bundle(snapshot.tables, selection)
+    assert sorted(bundle) == sorted(expected)
+    assert bundle["adoption"].equals(expected["adoption"])
+    assert bundle["funnel"]["stages"].equals(expected["funnel"]["stages"])
+    assert cache.get(bundle_key(snapshot.fingerprint, selection)) is bundle
+    pool.shutdown()
+
+
+def test_background_jobs_wait_for_sessions_to_go_quiet():
+    pool = KpiJobPool(max_workers=2, executor="thread", cache=BundleCache())
+    assert pool.wait_until_idle(quiet_seconds=0.1, timeout=1)
+    release = threading.Event()
+    with pool.session_running():
+        assert not pool.wait_until_idle(quiet_seconds=0.0, timeout=0.1)
+    background = pool.submit("warm", release.wait, 30, background=True)
+    # Background work alone does not hold back other background work.
+    assert pool.wait_until_idle(quiet_seconds=0.1, timeout=1)
+    # A session joining a background job makes it session work until it finishes.
+    assert pool.submit("warm", release.wait, 30) is background
+    assert not pool.wait_until_idle(quiet_seconds=0.0, timeout=0.1)
+    release.set()
+    background.result()
+    assert pool.wait_until_idle(quiet_seconds=0.0, timeout=1)
+    pool.shutdown()
+
+
+def test_warmer_sessions_and_inline_requests_share_one_computation(snapshot, monkeypatch):
+    pool = KpiJobPool(max_workers=2, executor="thread", cache=BundleCache())
+    release, calls, inline = threading.Event(), [], []
+
+    def slow(data, selection, backend=None):
+        calls.append(selection)
+        release.wait(30)
+        return {"selection": selection}
+
+    monkeypatch.setattr(jobs, "compute_kpi_bundle", slow)
+    selection = _selection("D001")
+    warmer = CacheWarmer(snapshot.tables, "v1", [selection], pool=pool, quiet_seconds=0).start()
+    while not calls:
+        time.sleep(0.01)
+    # The session joins the warm-up's job, and an inline request (AIRE_KPI_JOBS=off, the API) waits on it too.
+    job = session_job({}, snapshot.tables, selection, "v1", pool=pool)
+    assert pool.deduplicated == 1 and job.waiters == 2
+    thread = threading.Thread(target=lambda: inline.append(get_kpi_bundle(snapshot.tables, selection, "v1", cache=pool.cache)))
+    thread.start()
+    release.set()
+    thread.join()
+    assert job.result() is inline[0] and warmer.wait(timeout=30).completed == 1
+    assert calls == [selection]
+    pool.shutdown()
+
+
+def test_reference_jobs_stay_in_process_without_worker_processes(snapshot, monkeypatch):
+    pool = KpiJobPool(max_workers=1, executor="thread", cache=BundleCache())
+    monkeypatch.setattr(jobs, "reference_bundle", lambda *args: pytest.fail("reloaded the dataset on a thread"))
+    bundle = request_bundle(snapshot.tables, _selection("D002"), "v1", reference=True, pool=pool).result()
+    assert bundle["adoption"].equals(compute_kpi_bundle(snapshot.tables, _selection("D002"))["adoption"])
+    pool.shutdown()
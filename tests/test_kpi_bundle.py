@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+
+from src.data_loader import load_all_data
+from src.kpi_bundle import BundleCache, FilterSelection, compute_kpi_bundle, get_kpi_bundle
+from src.kpi_calculations import compute_ai_adoption_index
+
+
+def _default_selection(data):
+    workshops = data["workshops"]
+    return FilterSelection.from_sidebar(
+        list(data["departments"]["department_id"]),
+        ["faculty", "staff", "graduate student", "mixed"],
+        workshops["date"].min().date(),
+        workshops["date"].max().date(),
+    )
+
+
+def test_selection_is_order_independent():
+    a = FilterSelection.from_sidebar(["D02", "D01"], ["staff", "faculty"], "2024-01-01", pd.Timestamp("2024-06-30"))
+    b = FilterSelection.from_sidebar(["D01", "D02"], ["faculty", "staff"], pd.Timestamp("2024-01-01").date(), "2024-06-30")
+    assert a == b and hash(a) == hash(b)
+    assert FilterSelection.from_sidebar([], ["mixed"], "2024-01-01", "2024-01-31").role_filter == [
+        "faculty",
+        "staff",
+        "graduate student",
+    ]
+
+
+def test_bundle_matches_direct_computation():
+    data = load_all_data()
+    selection = _default_selection(data)
+    bundle = compute_kpi_bundle(data, selection)
+    expected_df, expected_overall = compute_ai_adoption_index(
+        data["departments"], bundle["filtered_participants"], list(selection.department_ids)
+    )
+    pd.testing.assert_frame_equal(bundle["adoption"], expected_df)
+    assert bundle["adoption_overall"] == expected_overall
+    assert set(bundle["retention"]) == {"cohorts", "curve", "repeat_by_department", "repeat_by_role"}
+
+
+def test_bundle_cache_reuses_and_evicts():
+    data = load_all_data()
+    selection = _default_selection(data)
+    cache = BundleCache(max_entries=1)
+    first = get_kpi_bundle(data, selection, "v1", cache=cache)
+    assert get_kpi_bundle(data, selection, "v1", cache=cache) is first
+    assert cache.hits == 1
+    get_kpi_bundle(data, selection, "v2", cache=cache)
+    assert len(cache) == 1
+    assert get_kpi_bundle(data, selection, "v1", cache=cache) is not first
+    # Without a fingerprint (session uploads) nothing is cached.
+    assert get_kpi_bundle(data, selection, None, cache=cache) is not get_kpi_bundle(data, selection, None, cache=cache)
+
+
+def test_adoption_history_ends_at_the_bundles_adoption_index():
+    data = load_all_data()
+    departments = list(data["departments"]["department_id"])[:3]
+    selection = FilterSelection.from_sidebar(departments, ["faculty"], "2023-09-01", "2024-06-30")
+    bundle = compute_kpi_bundle(data, selection)
+    assert set(bundle["adoption_history"]) == {"month", "term"}
+    expected = bundle["adoption"].set_index("department_id")["adoption_index"].sort_index()
+    for history in bundle["adoption_history"].values():
+        assert set(history["department_id"]) <= set(departments)
+        final = history.sort_values("period").groupby("department_id")["adoption_index"].last().sort_index()
+        pd.testing.assert_series_equal(final, expected.loc[final.index], check_names=False, atol=1e-9)
+
+
+def test_failed_compute_is_not_cached():
+    cache = BundleCache()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("key", fail)
+    assert "key" not in cache and cache.get_or_compute("key", lambda: {"ok": True}) == {"ok": True}
@@ -2,12 +2,14 @@ import pandas as pd
 
 from src.data_loader import load_all_data
 from src.kpi_calculations import (
+    compute_adoption_index_history,
     compute_ai_adoption_index,
     compute_learning_impact,
     compute_readiness_matrix,
     compute_reflection_sentiment,
     compute_training_coverage,
     compute_workshop_engagement,
+    extend_adoption_index_history,
 )
 
 
@@ -69,3 +71,38 @@ def test_readiness_matrix_subset():
     dept_ids = data["departments"]["department_id"].tail(2).tolist()
     readiness = compute_readiness_matrix(data["departments"], dept_ids)
     assert set(readiness["department_id"]) == set(dept_ids)
+
+
+def test_adoption_history_ends_at_current_snapshot():
+    data = load_all_data()
+    history = compute_adoption_index_history(data["departments"], data["participants"], data["workshops"])
+    latest = history.sort_values("period").groupby("department_id").tail(1).set_index("department_id")
+    snapshot, _ = compute_ai_adoption_index(data["departments"], data["participants"])
+    pd.testing.assert_series_equal(
+        latest["adoption_index"].sort_index(),
+        snapshot.set_index("department_id")["adoption_index"].sort_index(),
+        check_names=False,
+    )
+    assert set(history.groupby("department_id")["period"].nunique()) == {history["period"].nunique()}
+
+
+def test_adoption_history_extends_incrementally():
+    data = load_all_data()
+    workshops, participants = data["workshops"], data["participants"]
+    cutoff = pd.Timestamp("2024-03-01")
+    for freq in ["month", "term"]:
+        full = compute_adoption_index_history(data["departments"], participants, workshops, freq=freq)
+        earlier = compute_adoption_index_history(
+            data["departments"],
+            participants[participants["last_attended_date"] < cutoff],
+            workshops[workshops["date"] < cutoff],
+            freq=freq,
+        )
+        extended = extend_adoption_index_history(
+            earlier,
+            data["departments"],
+            participants[participants["last_attended_date"] >= cutoff],
+            workshops[workshops["date"] >= cutoff],
+            freq=freq,
+        )
+        pd.testing.assert_frame_equal(extended, full, check_dtype=False)
@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from src.data_loader import load_all_data
+from src.filters import filter_by_date_range
+from src.partitions import PartitionedDataset, get_partitioned_dataset, write_partitions
+
+
+@pytest.fixture(scope="module")
+def data():
+    return load_all_data()
+
+
+@pytest.mark.parametrize("freq", ["term", "month"])
+def test_pruned_load_filters_like_flat_tables(tmp_path, data, freq):
+    write_partitions(data, tmp_path, freq, "v1")
+    dataset = PartitionedDataset(tmp_path)
+    start, end = "2024-01-01", "2024-05-31"
+    pruned = dataset.load(start, end)
+    for table, df in pruned.items():
+        pd.testing.assert_frame_equal(
+            filter_by_date_range(df, "date", start, end).reset_index(drop=True),
+            filter_by_date_range(data[table], "date", start, end).reset_index(drop=True),
+        )
+        assert len(df) < len(data[table])
+    full = dataset.load()
+    for table, df in full.items():
+        pd.testing.assert_frame_equal(df, data[table])
+    pd.testing.assert_frame_equal(dataset.dimensions()["departments"], data["departments"])
+
+
+def test_partitions_load_lazily_as_range_widens(tmp_path, data):
+    write_partitions(data, tmp_path, "term", "v1")
+    dataset = PartitionedDataset(tmp_path)
+    assert dataset.partitions_for("workshops", "2024-01-01", "2024-05-31") == ["2024-01-01"]
+    dataset.load("2024-01-01", "2024-05-31")
+    narrow_reads = dataset.partition_reads
+    assert narrow_reads == len(dataset.fact_tables)
+    dataset.load("2024-01-01", "2024-05-31")
+    assert dataset.partition_reads == narrow_reads
+    dataset.load("2023-08-01", "2024-05-31")
+    assert dataset.partition_reads == narrow_reads + dataset.partition_count("2023-08-01", "2023-12-31")
+    assert dataset.bounds() == (data["workshops"]["date"].min(), data["workshops"]["date"].max())
+
+
+def test_rewrite_swaps_manifest_and_reopens(tmp_path, data):
+    write_partitions(data, tmp_path, "term", "v1")
+    first = get_partitioned_dataset(tmp_path)
+    assert get_partitioned_dataset(tmp_path) is first
+    write_partitions(data, tmp_path, "month", "v2")
+    second = get_partitioned_dataset(tmp_path)
+    assert second is not first and second.freq == "month"
+    # The replaced version stays readable for sessions still using it.
+    assert len(first.load()["workshops"]) == len(data["workshops"])
+    assert get_partitioned_dataset(tmp_path / "missing") is None
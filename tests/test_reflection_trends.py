@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from src.data_loader import load_all_data
+from src.filters import FilterContext
+from src.ingestion import finalize
+from src.kpi_bundle import FilterSelection, compute_kpi_bundle
+from src.reflection_trends import TRENDS, ReflectionTrendIndex, reflection_trend_index
+
+
+@pytest.fixture(scope="module")
+def data():
+    return finalize(load_all_data())
+
+
+def _expected(data, department_ids, roles, start_date, end_date):
+    """The crosstabs as groupbys over the rows FilterContext selects."""
+    reflections = FilterContext(data, department_ids, roles, start_date, end_date).rows("reflections_by_participant")
+    with_department = reflections.merge(data["participants"][["participant_id", "department_id"]], on="participant_id")
+    sources = {"sentiment_by_month": reflections, "theme_by_month": reflections, "theme_by_department": with_department}
+    return {name: sources[name].groupby(list(dims), observed=True).size() for name, dims in TRENDS.items()}
+
+
+@pytest.mark.parametrize(
+    "department_ids, roles, start_date, end_date",
+    [
+        ([], [], None, None),
+        (["D001", "D002", "D003"], ["faculty"], "2023-09-01", "2024-03-15"),
+        ([], ["staff"], "2024-01-01", "2024-01-31"),
+        (["D006"], [], None, None),
+    ],
+)
+def test_crosstabs_match_groupby_over_the_filtered_rows(data, department_ids, roles, start_date, end_date):
+    index = reflection_trend_index(data["reflections"], data["participants"])
+    crosstabs = index.crosstabs(department_ids, roles, start_date, end_date)
+    for name, expected in _expected(data, department_ids, roles, start_date, end_date).items():
+        dims = list(TRENDS[name])
+        assert crosstabs[name].set_index(dims)["count"].to_dict() == expected[expected > 0].to_dict()
+
+
+def test_unmatched_and_undated_rows():
+    participants = pd.DataFrame({"participant_id": ["P1", "P2"], "department_id": ["D1", "D2"], "role": ["faculty", "staff"]})
+    reflections = pd.DataFrame(
+        {
+            "participant_id": ["P1", "P2", "P9", "P1"],
+            "date": pd.to_datetime(["2024-01-05", "2024-02-10", "2024-01-20", None]),
+            "sentiment": ["positive", "negative", "neutral", "positive"],
+            "theme": ["tools", "ethics", "tools", "ethics"],
+        }
+    )
+    index = ReflectionTrendIndex(reflections, participants)
+    everything = index.crosstabs()
+    # The undated reflection has no month but still counts for its department; the unmatched one has no department.
+    assert everything["sentiment_by_month"]["count"].sum() == 3
+    assert everything["theme_by_department"].set_index(["department_id", "theme"])["count"].to_dict() == {
+        ("D1", "ethics"): 1,
+        ("D1", "tools"): 1,
+        ("D2", "ethics"): 1,
+    }
+    january = index.crosstabs(roles=["faculty"], start_date="2024-01-01", end_date="2024-01-31")
+    assert january["theme_by_month"][["theme", "count"]].values.tolist() == [["tools", 1]]
+    assert index.crosstabs(start_date="2025-01-01", end_date="2025-12-31")["theme_by_month"].empty
+
+
+def test_bundle_carries_the_trends(data):
+    selection = FilterSelection.from_sidebar(["D001"], ["faculty", "staff"], "2023-08-01", "2024-12-31")
+    trends = compute_kpi_bundle(data, selection)["reflection_trends"]
+    assert set(trends) == set(TRENDS)
+    assert set(trends["theme_by_department"]["department_id"]) <= {"D001"}
+    assert trends["theme_by_department"]["department_name"].notna().all()
@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from src.data_loader import source_fingerprint
+from src.refresh import DatasetRefresher
+
+
+@pytest.fixture
+def drop_folder(tmp_path):
+    (tmp_path / "departments.csv").write_text("department_id\nD01\n", encoding="utf-8")
+    return tmp_path
+
+
+def _refresher(folder, **kwargs):
+    def loader():
+        return {"departments": pd.read_csv(folder / "departments.csv")}
+
+    return DatasetRefresher(loader, lambda: source_fingerprint(folder.glob("*.csv")), **kwargs)
+
+
+def _update(folder, text):
+    path = folder / "departments.csv"
+    path.write_text(text, encoding="utf-8")
+    # Bump the mtime explicitly so the change is visible on coarse-grained filesystems.
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_refresh_swaps_only_when_files_change(drop_folder):
+    refresher = _refresher(drop_folder)
+    first = refresher.current()
+    assert list(first.tables["departments"]["department_id"]) == ["D01"]
+    assert first.load_seconds >= 0
+    assert refresher.refresh() is False
+    assert refresher.current() is first
+
+    _update(drop_folder, "department_id\nD01\nD02\n")
+    assert refresher.refresh() is True
+    second = refresher.current()
+    assert second is not first
+    assert list(second.tables["departments"]["department_id"]) == ["D01", "D02"]
+    # Readers holding the old snapshot keep a consistent view.
+    assert list(first.tables["departments"]["department_id"]) == ["D01"]
+
+
+def test_failed_rebuild_keeps_previous_snapshot(drop_folder):
+    fail = threading.Event()
+    base = _refresher(drop_folder)
+
+    def loader():
+        if fail.is_set():
+            raise ValueError("Validation failed for departments.csv at row 0")
+        return base._loader()
+
+    refresher = DatasetRefresher(loader, base._fingerprint)
+    first = refresher.current()
+    fail.set()
+    _update(drop_folder, "department_id\nbroken\n")
+    assert refresher.refresh() is False
+    assert refresher.current() is first
+    assert "Validation failed" in refresher.last_error
+
+
+def test_poll_does_not_retry_a_failed_rebuild(drop_folder):
+    loads = []
+    base = _refresher(drop_folder)
+
+    def loader():
+        loads.append(1)
+        tables = base._loader()
+        if tables["departments"]["department_id"].iloc[0] == "broken":
+            raise ValueError("Validation failed for departments.csv at row 0")
+        return tables
+
+    refresher = DatasetRefresher(loader, base._fingerprint)
+    first = refresher.current()
+    _update(drop_folder, "department_id\nbroken\n")
+    assert refresher.poll() is False and refresher.poll() is False
+    assert len(loads) == 2 and refresher.last_error
+    assert not any(refresher.poll() for _ in range(3))
+    assert len(loads) == 2 and refresher.current() is first
+    # Fixed files are picked up as usual.
+    _update(drop_folder, "department_id\nD05\n")
+    assert refresher.poll() is False and refresher.poll() is True
+    assert list(refresher.current().tables["departments"]["department_id"]) == ["D05"]
+
+
+def test_poll_waits_for_a_stable_change(drop_folder):
+    refresher = _refresher(drop_folder)
+    first = refresher.current()
+    _update(drop_folder, "department_id\nD09\n")
+    assert refresher.poll() is False
+    assert refresher.current() is first
+    assert refresher.poll() is True
+    assert list(refresher.current().tables["departments"]["department_id"]) == ["D09"]
+
+
+def test_background_thread_picks_up_changes(drop_folder):
+    refresher = _refresher(drop_folder, interval_seconds=0.01)
+    first = refresher.current()
+    refresher.start()
+    try:
+        _update(drop_folder, "department_id\nD05\n")
+        deadline = time.monotonic() + 5
+        while refresher.current() is first and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        refresher.stop(timeout=5)
+    assert list(refresher.current().tables["departments"]["department_id"]) == ["D05"]
+
+
+def test_snapshot_tables_are_read_only(drop_folder):
+    tables = _refresher(drop_folder).current().tables
+    with pytest.raises(TypeError):
+        tables["departments"] = pd.DataFrame()
+    numbers = DatasetRefresher(lambda: {"workshops": pd.DataFrame({"attendances": [1, 2]})}, lambda: "v1").current()
+    workshops = numbers.tables["workshops"]
+    with pytest.raises(ValueError):
+        workshops.loc[0, "attendances"] = 5
+    assert workshops["attendances"].tolist() == [1, 2]
+    assert workshops.copy().assign(attendances=0)["attendances"].sum() == 0
+
+
+def test_invalidate_reloads_unchanged_files(drop_folder):
+    refresher = _refresher(drop_folder)
+    first = refresher.current()
+    assert refresher.current() is first
+    refresher.invalidate()
+    second = refresher.current()
+    assert second is not first and second.fingerprint == first.fingerprint
+    assert refresher.current() is second
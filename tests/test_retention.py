@@ -0,0 +1,51 @@
+import pandas as pd
+
+from src.data_loader import load_all_data
+from src.retention import attendance_events, compute_cohort_retention
+
+
+def _events(data):
+    return attendance_events(
+        data["workshops"], data["participants"], data["confidence_pre"], data["confidence_post"], data["reflections"]
+    )
+
+
+def test_cohort_counts_match_groupby():
+    data = load_all_data()
+    events = _events(data)
+    retention = compute_cohort_retention(events, data["participants"])
+
+    months = events["date"].dt.to_period("M")
+    first = months.groupby(events["participant_id"]).transform("min")
+    expected = (
+        pd.DataFrame(
+            {
+                "participant_id": events["participant_id"],
+                "cohort_month": first.dt.to_timestamp(),
+                "months_since": (months - first).map(lambda offset: offset.n),
+            }
+        )
+        .drop_duplicates(["participant_id", "months_since"])
+        .groupby(["cohort_month", "months_since"])
+        .size()
+    )
+    cohorts = retention["cohorts"].set_index(["cohort_month", "months_since"])["active_participants"]
+    pd.testing.assert_series_equal(
+        cohorts[cohorts > 0].sort_index(), expected.sort_index(), check_names=False, check_index_type=False
+    )
+    assert (retention["cohorts"].query("months_since == 0")["retention_rate"] == 1).all()
+
+
+def test_repeat_rates_respect_filters():
+    data = load_all_data()
+    dept_ids = data["departments"]["department_id"].head(2).tolist()
+    retention = compute_cohort_retention(_events(data), data["participants"], dept_ids, ["staff"])
+    assert set(retention["repeat_by_department"]["department_id"]) <= set(dept_ids)
+    assert set(retention["repeat_by_role"]["role"]) == {"staff"}
+    assert retention["repeat_by_role"]["repeat_rate"].between(0, 1).all()
+
+
+def test_empty_selection_returns_empty_frames():
+    data = load_all_data()
+    retention = compute_cohort_retention(_events(data), data["participants"], ["D999"])
+    assert all(df.empty for df in retention.values())
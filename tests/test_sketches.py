@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_loader import load_all_data
+from src.filters import FilterContext, filter_by_date_range
+from src.ingestion import finalize
+from src.kpi_bundle import FilterSelection, compute_kpi_bundle
+from src.kpi_calculations import compute_distinct_participants, compute_score_quantiles
+from src.retention import attendance_events
+from src.sketches import (
+    KpiSketchIndex,
+    hash_ids,
+    histogram_quantile,
+    hll_estimate,
+    hll_registers,
+    hll_slots,
+    kpi_sketch_index,
+)
+
+
+@pytest.fixture(scope="module")
+def data():
+    return finalize(load_all_data())
+
+
+def _registers(ids) -> np.ndarray:
+    index, rank = hll_slots(hash_ids(pd.Series(ids, dtype=object)))
+    return hll_registers(np.zeros(len(index), dtype=np.intp), 1, index, rank)
+
+
+@pytest.mark.parametrize("n", [0, 1, 50, 3_000, 12_000, 200_000])
+def test_hyperloglog_estimate_is_within_its_error_bound(n):
+    estimate, error = hll_estimate(_registers([f"P{i}" for i in range(n)]))
+    assert abs(estimate[0] - n) <= max(error[0], 0.5)
+
+
+def test_hyperloglog_merge_is_the_union():
+    left, right = [f"P{i}" for i in range(0, 6_000)], [f"P{i}" for i in range(4_000, 9_000)]
+    merged = np.maximum(_registers(left), _registers(right))
+    np.testing.assert_array_equal(merged, _registers(left + right))
+    # Duplicates never change a sketch.
+    np.testing.assert_array_equal(_registers(left + left), _registers(left))
+
+
+def test_hash_ids_agree_for_encoded_and_plain_ids():
+    plain = pd.Series(["P001", "P002", "P001"], dtype=object)
+    np.testing.assert_array_equal(hash_ids(plain), hash_ids(plain.astype("category")))
+
+
+def test_histogram_quantiles_match_numpy():
+    rng = np.random.default_rng(7)
+    for size in (1, 2, 5, 40, 301):
+        scores = rng.integers(1, 6, size)
+        counts = np.bincount(scores - 1, minlength=5)
+        for q in (0.1, 0.25, 0.5, 0.75, 1.0):
+            assert histogram_quantile(counts, q) == np.quantile(scores, q, method="inverted_cdf")
+    assert np.isnan(histogram_quantile(np.zeros(5, dtype=np.int64), 0.5))
+
+
+def _exact(data, department_ids, roles, start_date, end_date):
+    context = FilterContext(data, department_ids, roles, start_date, end_date)
+    participants = context.rows("participants")
+    events = attendance_events(
+        data["workshops"], data["participants"], data["confidence_pre"], data["confidence_post"], data["reflections"]
+    )
+    distinct = compute_distinct_participants(filter_by_date_range(events, "date", start_date, end_date), participants)
+    quantiles = compute_score_quantiles(
+        filter_by_date_range(data["confidence_pre"], "date", start_date, end_date),
+        filter_by_date_range(data["confidence_post"], "date", start_date, end_date),
+        participants,
+    )
+    return distinct, quantiles
+
+
+def _sorted(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.assign(department_id=df["department_id"].astype(str))
+    return df.sort_values(["department_id", "stage", "metric"]).reset_index(drop=True)
+
+
+@pytest.mark.parametrize(
+    "department_ids, roles, start_date, end_date",
+    [
+        ([], [], None, None),
+        (["D001", "D002", "D003"], ["faculty"], "2023-09-14", "2024-03-15"),
+        ([], ["staff", "graduate student"], "2024-01-01", "2024-06-30"),
+        (["D006"], [], "2024-02-10", "2024-02-20"),
+    ],
+)
+def test_sketches_match_exact_kpis(data, department_ids, roles, start_date, end_date):
+    index = kpi_sketch_index(
+        data["workshops"], data["participants"], data["confidence_pre"], data["confidence_post"], data["reflections"]
+    )
+    distinct, quantiles = _exact(data, department_ids, roles, start_date, end_date)
+    pd.testing.assert_frame_equal(
+        _sorted(index.score_quantiles(department_ids, roles, start_date, end_date)),
+        _sorted(quantiles),
+        check_dtype=False,
+    )
+    approximate = index.distinct_participants(department_ids, roles, start_date, end_date)
+    merged = distinct["by_department"].merge(
+        approximate["by_department"].astype({"department_id": "category"}), on="department_id", how="outer", suffixes=("", "_sketch")
+    )
+    assert ((merged["participants"] - merged["participants_sketch"]).abs() <= merged["error_sketch"]).all()
+    exact_total = distinct["overall"]["participants"].iloc[0]
+    assert abs(approximate["overall"]["participants"].iloc[0] - exact_total) <= approximate["overall"]["error"].iloc[0]
+
+
+def test_partial_months_are_read_from_rows():
+    participants = pd.DataFrame({"participant_id": ["P1", "P2", "P3"], "department_id": ["D1", "D1", "D2"], "role": ["staff"] * 3})
+    events = pd.DataFrame(
+        {
+            "participant_id": ["P1", "P2", "P3", "P1"],
+            "date": pd.to_datetime(["2024-01-31", "2024-02-01", "2024-02-29", "2024-03-01"]),
+        }
+    )
+    surveys = pd.DataFrame(
+        {
+            "participant_id": ["P1", "P2"],
+            "date": pd.to_datetime(["2024-01-15", "2024-02-15"]),
+            **{metric: [2, 4] for metric in ("confidence_score", "understanding_responsible_ai", "comfort_with_tools")},
+        }
+    )
+    index = KpiSketchIndex(events, surveys, surveys.iloc[:0], participants)
+    counts = lambda start, end: index.distinct_participants(start_date=start, end_date=end)["overall"]["participants"].iloc[0]
+    assert counts("2024-02-01", "2024-02-29") == 2
+    assert counts("2024-01-31", "2024-02-28") == 2
+    assert counts("2024-01-31", "2024-03-01") == 3
+    assert counts("2024-02-02", "2024-02-28") == 0
+    quantiles = index.score_quantiles(start_date="2024-01-10", end_date="2024-02-14")
+    assert quantiles["responses"].tolist() == [1, 1, 1]
+    assert quantiles["median"].tolist() == [2, 2, 2]
+
+
+def test_bundle_approximate_mode(data):
+    selection = FilterSelection.from_sidebar(["D001", "D002"], ["faculty", "staff"], "2023-08-01", "2024-12-31")
+    exact = compute_kpi_bundle(data, selection, approximate=False)
+    approximate = compute_kpi_bundle(data, selection, approximate=True)
+    assert (exact["participation"]["by_department"]["error"] == 0).all()
+    assert (approximate["participation"]["by_department"]["error"] > 0).all()
+    assert approximate["participation"]["by_department"]["department_name"].notna().all()
+    assert set(approximate["score_quantiles"]["department_id"]) <= {"D001", "D002"}
+    assert len(approximate["score_quantiles"]) == len(exact["score_quantiles"])
@@ -0,0 +1,88 @@
+import pandas as pd
+import pytest
+
+from src.data_loader import load_all_data
+from src.kpi_calculations import compute_learning_impact
+from src.survey_pairing import SurveyPairIndex, survey_pair_index
+
+
+def _surveys():
+    pre = pd.DataFrame(
+        {
+            "survey_id": ["S1", "S2", "S3", "S4"],
+            "participant_id": ["P1", "P1", "P2", "P3"],
+            "workshop_id": ["W1", "W1", "W1", "W1"],
+            "date": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-01", "2024-01-01"]),
+            "confidence_score": [1, 3, 2, 4],
+            "understanding_responsible_ai": [2, 2, 2, 2],
+        }
+    )
+    post = pd.DataFrame(
+        {
+            "survey_id": ["S5", "S6", "S7"],
+            "participant_id": ["P1", "P2", "P4"],
+            "workshop_id": ["W1", "W1", "W1"],
+            "date": pd.to_datetime(["2024-02-01", "2024-02-01", "2024-02-01"]),
+            "confidence_score": [5, 4, 3],
+            "understanding_responsible_ai": [4, 4, 4],
+        }
+    )
+    participants = pd.DataFrame(
+        {"participant_id": ["P1", "P2", "P3", "P4"], "department_id": ["D1", "D2", "D1", "D2"], "role": ["faculty"] * 4}
+    )
+    return pre, post, participants
+
+
+@pytest.mark.parametrize("policy, expected_pre", [("first", 1.0), ("last", 3.0), ("mean", 2.0)])
+def test_duplicate_policy_resolves_repeated_responses(policy, expected_pre):
+    pre, post, participants = _surveys()
+    index = SurveyPairIndex(pre, post, participants, duplicate_policy=policy)
+    assert len(index.pairs) == 2
+    p1 = index.pairs.set_index("participant_id").loc["P1"]
+    assert p1["confidence_score_pre"] == expected_pre
+    assert p1["confidence_score_post"] == 5
+    assert p1["department_id"] == "D1"
+    assert index.duplicate_pre == 1 and index.duplicate_post == 0
+
+
+def test_unmatched_responses_are_reported():
+    pre, post, participants = _surveys()
+    index = SurveyPairIndex(pre, post, participants)
+    assert list(index.unmatched_pre["participant_id"]) == ["P3"]
+    assert list(index.unmatched_post["participant_id"]) == ["P4"]
+    report = index.report().set_index("side")
+    assert report.loc["pre", "unmatched"] == 1 and report.loc["post", "duplicates_resolved"] == 0
+
+
+def test_select_applies_dates_departments_and_roles():
+    pre, post, participants = _surveys()
+    index = SurveyPairIndex(pre, post, participants)
+    assert list(index.select(department_ids=["D2"])["participant_id"]) == ["P2"]
+    assert index.select("2024-01-01", "2024-01-31").empty
+    assert len(index.select("2024-01-01", "2024-02-28", roles=["faculty"])) == 2
+    with pytest.raises(ValueError):
+        SurveyPairIndex(pre, post, participants, duplicate_policy="median")
+
+
+def test_duplicates_no_longer_multiply_pairs():
+    pre, post, participants = _surveys()
+    impact = compute_learning_impact(pre, post, participants)
+    summary = impact["summary"].set_index("metric")
+    assert summary.loc["confidence_score", "pre_mean"] == 1.5
+    assert summary.loc["confidence_score", "post_mean"] == 4.5
+
+
+def test_prebuilt_index_matches_filtering_frames_first():
+    data = load_all_data()
+    start, end = "2023-09-01", "2024-06-30"
+    index = survey_pair_index(data["confidence_pre"], data["confidence_post"], data["participants"])
+    assert survey_pair_index(data["confidence_pre"], data["confidence_post"], data["participants"]) is index
+    from_index = compute_learning_impact(
+        None, None, None, ["D001", "D002", "D003"], ["faculty"], bootstrap_resamples=0, pair_index=index, start_date=start, end_date=end
+    )
+    pre = data["confidence_pre"][data["confidence_pre"]["date"].between(start, end)]
+    post = data["confidence_post"][data["confidence_post"]["date"].between(start, end)]
+    direct = compute_learning_impact(pre, post, data["participants"], ["D001", "D002", "D003"], ["faculty"], bootstrap_resamples=0)
+    for key in ("summary", "by_department", "by_role"):
+        pd.testing.assert_frame_equal(from_index[key], direct[key])
+    assert index.report()["matched"].iloc[0] == len(index.pairs)
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from src.data_loader import load_all_data
+from src.kpi_calculations import compute_reflection_search
+from src.text_index import ReflectionTextIndex, build_reflection_index
+
+
+def _rows(texts, predicate):
+    return np.flatnonzero(texts.str.lower().map(predicate).to_numpy())
+
+
+def test_single_term_matches_substring_scan():
+    reflections = load_all_data()["reflections"]
+    index = build_reflection_index(reflections)
+    expected = _rows(reflections["reflection_text"], lambda t: "courses" in t)
+    np.testing.assert_array_equal(index.search("courses"), expected)
+
+
+def test_boolean_and_phrase_queries():
+    texts = pd.Series(
+        [
+            "Data privacy was covered well.",
+            "Privacy of student data needs more time.",
+            "Great examples for courses.",
+            "More examples on data privacy, please.",
+        ]
+    )
+    index = ReflectionTextIndex(texts)
+    np.testing.assert_array_equal(index.search('"data privacy"'), [0, 3])
+    np.testing.assert_array_equal(index.search("privacy data"), [0, 1, 3])
+    np.testing.assert_array_equal(index.search("courses OR time"), [1, 2])
+    np.testing.assert_array_equal(index.search('examples -"data privacy"'), [2])
+    np.testing.assert_array_equal(index.search("NOT privacy"), [2])
+    assert index.search("unknown").size == 0
+
+
+def test_phrases_do_not_span_rows():
+    texts = pd.Series(["policy academic", "integrity matters", "academic integrity policy"])
+    index = ReflectionTextIndex(texts)
+    np.testing.assert_array_equal(index.search('"academic integrity"'), [2])
+    np.testing.assert_array_equal(index.search('"academic integrity policy"'), [2])
+    updated = index.updated(pd.Series(["policy academic", "integrity matters", "policy only"]), np.array([2]))
+    assert updated.search('"academic integrity"').size == 0
+
+
+def test_term_frequencies_respect_row_selection():
+    texts = pd.Series(["ai tools tools", "ai policy", "policy review"])
+    index = ReflectionTextIndex(texts)
+    frequencies = index.term_frequencies(np.array([0, 1]), top_n=None).set_index("term")["reflections"]
+    assert frequencies.to_dict() == {"ai": 2, "policy": 1, "tools": 1}
+
+
+def test_reflection_search_breakdowns():
+    data = load_all_data()
+    index = build_reflection_index(data["reflections"])
+    results = compute_reflection_search(
+        data["reflections"], data["participants"], index, "examples", filtered_roles=["faculty"]
+    )
+    assert set(results.keys()) == {"matches", "by_department", "by_role", "by_month", "terms"}
+    assert set(results["by_role"]["role"]) == {"faculty"}
+    assert results["by_department"]["count"].sum() == len(results["matches"])
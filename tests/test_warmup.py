@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from src import jobs
+from src.data_loader import load_all_data
+from src.jobs import KpiJobPool
+from src.kpi_bundle import BundleCache, FilterSelection, bundle_key
+from src.warmup import CacheWarmer, common_selections
+
+
+def _pool(max_workers=3):
+    return KpiJobPool(max_workers=max_workers, executor="thread", cache=BundleCache())
+
+
+def test_common_selections_cover_presets():
+    data = load_all_data()
+    selections = common_selections(data)
+    n_departments = len(data["departments"])
+    assert len(selections) == 1 + n_departments + 4
+    workshops = data["workshops"]
+    # The dashboard's default sidebar state maps onto the first preset.
+    default = FilterSelection.from_sidebar(
+        list(data["departments"]["department_id"]),
+        ["faculty", "staff", "graduate student", "mixed"],
+        workshops["date"].min().date(),
+        workshops["date"].max().date(),
+    )
+    assert selections[0] == default
+
+
+def test_warmer_fills_the_bundle_cache_through_the_job_pool():
+    data = load_all_data()
+    selections = common_selections(data)[:3]
+    pool = _pool()
+    warmer = CacheWarmer(data, "v1", selections, max_workers=4, pool=pool)
+    # One pool worker is always left to sessions.
+    assert warmer.max_workers == 2
+    progress = warmer.start().wait(timeout=120)
+    assert not progress.running
+    assert (progress.completed, progress.failed, progress.coverage) == (3, 0, 1.0)
+    assert all(bundle_key("v1", selection) in pool.cache for selection in selections)
+    assert pool.submitted == 3 and pool.inflight() == 0
+    pool.shutdown()
+
+
+def test_warmer_reports_failures(monkeypatch):
+    data = load_all_data()
+    selections = common_selections(data)[:2]
+
+    def broken(data, selection, backend=None):
+        raise RuntimeError("bundle failed")
+
+    monkeypatch.setattr(jobs, "compute_kpi_bundle", broken)
+    pool = _pool()
+    progress = CacheWarmer(data, "v1", selections, pool=pool).start().wait(timeout=120)
+    assert (progress.completed, progress.failed) == (0, 2)
+    assert progress.coverage == 0
+    pool.shutdown()
+
+
+def test_sql_backend_is_shared_by_warmup_threads():
+    from src.sql_backend import SqlKpiBackend
+
+    backend = SqlKpiBackend()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        adoption = list(pool.map(lambda _: backend.compute_ai_adoption_index()[1], range(8)))
+        completion = list(pool.map(lambda _: backend.compute_workshop_engagement()["completion"]["value"].iloc[0], range(8)))
+    assert len(set(adoption)) == 1 and len(set(completion)) == 1
+
+    data = load_all_data()
+    pool = _pool(max_workers=5)
+    progress = CacheWarmer(data, "v1", common_selections(data)[:6], backend=backend, max_workers=4, pool=pool).start().wait(
+        timeout=120
+    )
+    assert (progress.completed, progress.failed) == (6, 0)
+    pool.shutdown()
+
+
+def test_warmer_waits_while_a_session_is_running():
+    data = load_all_data()
+    pool = _pool()
+    with pool.session_running():
+        warmer = CacheWarmer(data, "v1", common_selections(data)[:1], pool=pool, quiet_seconds=0.1).start()
+        progress = warmer.wait(timeout=0.5)
+        assert progress.running and progress.completed == 0 and pool.submitted == 0
+    assert warmer.wait(timeout=120).completed == 1
+    pool.shutdown()